@@ -1,9 +1,95 @@
+import argparse
+import os
+import sys
+import time
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Marp Editor")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the headless render service instead of the editor")
+    parser.add_argument("--host", default="127.0.0.1", help="service address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="service port (default: 8765)")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+                        help="render workers, each with its own browser")
+    parser.add_argument("--queue-size", type=int, default=16, help="jobs that may wait before requests are refused")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds a job may take, including queueing")
+    parser.add_argument("--assets", default=".", help="folder that relative image paths are resolved against")
+    parser.add_argument("--watch", nargs="+", metavar="PATH",
+                        help="keep the exports of these Markdown files (or folders of them) up to date instead of "
+                             "running the editor")
+    parser.add_argument("--out", default="build", help="watch mode output folder (default: build)")
+    parser.add_argument("--formats", default="html,png,pdf", help="watch mode outputs (default: html,png,pdf)")
+    parser.add_argument("--theme", help="watch mode theme for decks without a theme directive")
+    parser.add_argument("--aspect", choices=["16:9", "4:3"], default="16:9",
+                        help="watch mode slide size for decks without a size directive")
+    parser.add_argument("--interval", type=float, default=0.5, help="watch mode polling interval in seconds")
+    return parser.parse_args(argv)
+
+
+def run_render_service(args: argparse.Namespace) -> None:
+    from pathlib import Path
+    from src.services.marp_engine import MarpEngine
+    from src.services.render_service import RenderService, RenderServiceServer
+
+    marp_engine = MarpEngine()
+    marp_engine.asset_resolver.base_dir = Path(args.assets).resolve()
+    service = RenderService(marp_engine, workers=args.workers, queue_size=args.queue_size, job_timeout=args.timeout)
+    server = RenderServiceServer(service, host=args.host, port=args.port, unix_socket=args.socket)
+    service.start()
+    print(f"Render service listening on {server.address} ({args.workers} workers)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        service.stop()
+
+
+def run_watch(args: argparse.Namespace) -> None:
+    from pathlib import Path
+    from src.services.deck_watcher import DeckWatcher
+    from src.services.file_manager import FileManager
+    from src.services.marp_engine import MarpEngine
+
+    formats = [name.strip() for name in args.formats.split(",") if name.strip()]
+    try:
+        watcher = DeckWatcher(MarpEngine(), FileManager(), [Path(path) for path in args.watch], Path(args.out),
+                              formats=formats, theme_name=args.theme, aspect_ratio=args.aspect)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return
+    print(f"Watching {', '.join(args.watch)} -> {watcher.output_dir} ({', '.join(formats)})", file=sys.stderr)
+    try:
+        while True:
+            for report in watcher.poll():
+                for error in report.errors:
+                    print(f"{report.path.name}: {error}", file=sys.stderr)
+                if report.errors and not report.written:
+                    continue
+                outputs = ", ".join(path.name for path in report.written) or "nothing changed"
+                print(f"{report.path.name}: {len(report.rendered_slides)} of {report.slide_count} slides rendered, "
+                      f"wrote {outputs} in {report.elapsed:.2f} s", file=sys.stderr)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
 
-import customtkinter as ctk
-from src.controllers.app_controller import AppController
-from src.views.main_app_view import MainAppView
 
 if __name__ == "__main__":
-    app_controller = AppController()
-    app_view = MainAppView(app_controller)
-    app_view.mainloop()
+    arguments = parse_arguments()
+    if arguments.serve:
+        run_render_service(arguments)
+    elif arguments.watch:
+        run_watch(arguments)
+    else:
+        # The GUI modules import Tk, which the service must not need.
+        from src.controllers.app_controller import AppController
+        from src.views.main_app_view import MainAppView
+
+        app_controller = AppController()
+        app_view = MainAppView(app_controller)
+        app_view.mainloop()
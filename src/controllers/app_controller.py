@@ -1,13 +1,29 @@
 from typing import Optional, Any
 from pathlib import Path
-from threading import Timer
+from threading import Thread, Timer, current_thread
+from queue import Empty, Full, Queue
 from dataclasses import dataclass
+import itertools
+import time
 import tkinter.filedialog as filedialog
 
-from src.models.app_state import AppState
-from src.services.marp_engine import MarpEngine
-from src.services.file_manager import FileManager
-from typing import List # Add List
+from src.models.app_state import AppState, DocumentSession, SlideData, DocumentMetadata
+from src.models.encoded_image import Thumbnail
+from src.services.marp_engine import MarpEngine, ValidationError
+from src.services.file_manager import APP_DATA_DIR, FileManager
+from src.services.debounce_tuner import AdaptiveDebounceTuner
+from src.services.render_scheduler import LANE_EXPORT, LANE_PRESENTER, RenderScheduler
+from src.services.outline_index import OutlineIndex
+from src.services.preview_server import PreviewServer
+from src.services.parallel_renderer import ParallelSlideRenderer
+from src.services.slide_validator import SlideValidator
+from src.services.draft_renderer import DraftSlideRenderer
+from src.services.project_index import ProjectFileEntry, ProjectIndex
+from src.services.project_search import ProjectSearchIndex, SearchHit
+from src.services.theme_gallery import ThemeGallery
+from src.services.thumbnail_decoder import ThumbnailDecoder
+from src.services.directives import DirectiveResolver, slide_directives_of
+from typing import Dict, Iterable, List, Tuple # Add List
 
 # Placeholder for MainAppView, SettingsManager, ExportOptions
 class MainAppView: 
@@ -16,12 +32,41 @@ class MainAppView:
     def get_editor_content(self) -> str: pass
     # def update_previews_panel(self, image_data: List[bytes], aspect_ratio: str): pass # Method removed from MainAppView
     def update_theme_selection(self, themes: list, selected_theme: str): pass
-    def update_slide_list(self, slides: list, current_slide_index: int, slide_images: List[bytes]): pass # Added slide_images
+    def update_slide_list(self, slides: list, current_slide_index: int, slide_thumbnails: List[Optional[Thumbnail]]): pass
+    def update_slide_image(self, slide_index: int, thumbnail: Thumbnail, current_slide_index: int): pass
+    def update_slide_entry(self, slide: SlideData, current_slide_index: int): pass
+    def select_slide(self, current_slide_index: int): pass
+    def show_diagnostics(self, diagnostics: List[Tuple[int, str, str]]): pass
+    def update_slide_diagnostics(self, severities: Dict[int, str]): pass
+    def update_outline(self, outline_index: OutlineIndex): pass
+    def update_project_files(self, root: Optional[Path], entries: List[ProjectFileEntry], is_scanning: bool): pass
+    def update_recent_files(self, recent_files: List[Path]): pass
+    def update_search_results(self, hits: List[SearchHit], summary: str): pass
+    def update_theme_preview(self, theme_name: str, image: Thumbnail): pass
+    def refresh_outline_selection(self): pass
+    def scroll_editor_to_line(self, line: int): pass
+    def get_thumbnail_pixel_width(self) -> int: pass
+    def get_cursor_offset(self) -> int: pass
+    def set_cursor_offset(self, offset: int): pass
+    def update_document_tabs(self, sessions: List[DocumentSession], active_session_id: int): pass
+    def get_visible_slide_indices(self) -> List[int]: pass
     def enter_presentation_mode(self): pass
     def exit_presentation_mode(self): pass
     def open_popup_window(self, html_content: str): pass
     def close_popup_window(self): pass
     def update_popup_window_content(self, html_content: str): pass
+    def update_presentation_view(self, html_content: str): pass
+    def begin_editor_stream(self, expected_chars: int = 0): pass
+    def get_editor_pending_chars(self) -> int: pass
+    def append_editor_content(self, text: str): pass
+    def end_editor_stream(self): pass
+    def show_presentation_slide(self, hidden_section_id: str, visible_section_id: str) -> bool: pass
+    def patch_presentation_slide(self, section_id: str, section_class: str, section_style: str, fragment_html: str) -> bool: pass
+    def open_presenter_view(self): pass
+    def close_presenter_view(self): pass
+    def update_presenter_view(self, current_slide_index: int, slide_count: int, notes: Optional[str],
+                              current_image: Optional[Thumbnail], next_image: Optional[Thumbnail], has_next: bool): pass
+    def get_presenter_pixel_width(self) -> int: pass
 
 class SettingsManager: pass
 
@@ -30,15 +75,71 @@ class ExportOptions:
     pass
 
 class AppController:
+    EDIT_COALESCE_MS = 16  # Edits arriving within one frame are processed together
+    STREAMING_LOAD_BYTES = 1024 * 1024  # Files at least this large are streamed in chunk by chunk
+    LOAD_CHUNK_SIZE = 1024 * 1024
+    LOAD_QUEUE_SIZE = 4  # Decoded chunks in flight between the loader thread and the Tk thread
+    PRESENTER_PREFETCH_OFFSETS = (0, 1, -1, 2)  # Current, next, previous, then the one after next
+    OVERFLOW_TOLERANCE_PX = 2  # Sub-pixel rounding is not reported as overflow
+    DRAFT_LIMIT = 8  # Changed slides drafted per preview update, highest priority first
+    RECENT_FILES_LIMIT = 10
+    SESSION_FILE = APP_DATA_DIR / 'session.json'  # Recent files and the open project
+    MAX_WARM_SESSIONS = 3  # Tabs, including the active one, that keep their thumbnails in memory
+    # Per-document values that live on AppState / the controller while the document's tab is active.
+    SESSION_STATE_FIELDS = ("document", "markdown_content", "current_file_path", "is_document_modified",
+                            "document_encoding", "slide_count", "current_slide_index", "slides_data",
+                            "document_metadata")
+    SESSION_CONTROLLER_FIELDS = ("outline_index", "slide_thumbnails", "slide_thumbnail_sources",
+                                 "validation_errors", "slide_overflow")
+
     def __init__(self):
         self.state = AppState()
         self.view: Optional[MainAppView] = None
         self.marp_engine = MarpEngine()
+        block_renderer = self.marp_engine.block_renderer
+        block_renderer.ui_thread = current_thread()  # Diagrams and formulas are never typeset while Tk waits
+        block_renderer.on_rendered = self._on_blocks_rendered
+        block_renderer.on_renderer_missing = self._on_renderer_missing
         self.file_manager = FileManager()
         self.settings_manager = SettingsManager()
         self.auto_save_timer: Optional[Timer] = None
         self.preview_update_timer: Optional[Timer] = None
-        self.last_rendered_slide_images: List[bytes] = []
+        self.slide_thumbnails: List[Optional[Thumbnail]] = []
+        self.slide_thumbnail_sources: List[Optional[SlideData]] = []  # The slide each thumbnail (or draft) shows
+        self._render_job_slides: List[SlideData] = []
+        self.debounce_tuner = AdaptiveDebounceTuner()
+        self.render_scheduler = RenderScheduler(self.marp_engine)
+        self.draft_renderer = DraftSlideRenderer(self.marp_engine)
+        self.thumbnail_decoder = ThumbnailDecoder()  # Decodes thumbnails for the view off the Tk thread
+        self.outline_index = OutlineIndex(self.marp_engine)
+        self.presenter_images: Dict[int, Thumbnail] = {}  # 0-based slide position -> presenter-size image
+        self._edit_flush_job: Optional[str] = None
+        self._load_generation = 0  # Incremented to abandon an in-progress streaming load
+        self._load_directives: Optional[DirectiveResolver] = None  # Directives of the slides streamed in so far
+        self._presentation_deck: Optional[List[SlideData]] = None  # Slides as loaded into the presentation frame
+        self._presentation_deck_theme: Optional[str] = None
+        self._presentation_visible_position = 0
+        self.preview_server = PreviewServer(self.marp_engine)
+        self.slide_validator = SlideValidator(self.marp_engine)
+        self.validation_errors: List[ValidationError] = []  # Static checks of the whole document
+        self.slide_overflow: Dict[int, ValidationError] = {}  # 0-based slide position -> overflow measured while rendering
+        self._diagnostics_job: Optional[str] = None
+        self.project_index = ProjectIndex(self.marp_engine, self.draft_renderer, self.file_manager)
+        self.project_search = ProjectSearchIndex(self.marp_engine, self.file_manager)
+        self._pending_search_hit: Optional[SearchHit] = None
+        self.theme_gallery = ThemeGallery(self.marp_engine, self.render_scheduler)
+        self._theme_gallery_request: Optional[Tuple[SlideData, str, int]] = None  # (slide, aspect ratio, width) last submitted
+        self._image_export_dir: Optional[Path] = None  # Set while the render worker exports slide images
+        self._image_export_total = 0
+        self._image_export_generation = 0  # Scheduler export generation of the running image export
+        self._session_ids = itertools.count(1)
+        session = DocumentSession(next(self._session_ids), last_active=time.monotonic())
+        self.state.sessions = [session]
+        self.state.active_session_id = session.session_id
+        self._stash_active_session()
+        self._load_session()
+        if self.state.is_parallel_rendering_enabled:
+            self.marp_engine.parallel_renderer = ParallelSlideRenderer()
         
         # Initialize available themes from MarpEngine
         self.state.available_themes = self.marp_engine.get_available_themes()
@@ -49,29 +150,190 @@ class AppController:
         if self.state.is_document_modified:
             if not self._confirm_save():
                 return False
+        self._load_generation += 1
+        self._pending_search_hit = None
+        self.state.is_loading_document = False
         self.state.markdown_content = ""
+        self.state.document.set_text("")
+        self.state.document.take_slide_changes()
         self.state.html_content = ""
         self.state.current_file_path = None
+        self.marp_engine.asset_resolver.set_document_path(None)
         self.state.is_document_modified = False
         self.state.status_message = "New document created."
         self.state.slide_count = 0
         self.state.current_slide_index = 1 # Should be 0 or 1, ensure consistency later
         self.state.slides_data = []
-        self.last_rendered_slide_images = []
+        self.state.document_metadata = DocumentMetadata()
+        self.slide_thumbnails = []
+        self.presenter_images = {}
+        self.validation_errors = []
+        self.slide_overflow = {}
+        self.outline_index.rebuild(self.state.slides_data)
         if self.view:
             self.view.set_editor_content("")
+            self._show_diagnostics()
+            self.view.update_outline(self.outline_index)
             # self.view.update_previews_panel([], self.state.aspect_ratio) # Removed
             self.view.update_status(self.state.status_message, 0, 0)
-            self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, self.last_rendered_slide_images)
+            self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, self.slide_thumbnails)
             if self.state.is_popup_window_open: # Close popup if open
                 self.view.close_popup_window()
+            self._update_presenter_view()
+            self._update_document_tabs()
         return True
-    
-    def open_document(self, file_path: Optional[Path] = None) -> bool:
-        if self.state.is_document_modified:
-            if not self._confirm_save():
-                return False
 
+    def new_tab(self) -> bool:
+        """空の文書を新しいタブで開く"""
+        if not self._can_switch_documents():
+            return False
+        self._open_tab()
+        self.state.status_message = "New document created."
+        self._update_status_counts()
+        return True
+
+    def switch_document(self, session_id: int) -> bool:
+        """指定したタブの文書に切り替える"""
+        if session_id == self.state.active_session_id:
+            return True
+        session = self._find_session(session_id)
+        if session is None or not self._can_switch_documents():
+            return False
+        self._suspend_active_session()
+        self._activate_session(session)
+        self.state.status_message = f"Switched to: {session.display_name}"
+        self._update_status_counts()
+        return True
+
+    def close_tab(self, session_id: int) -> bool:
+        """タブを閉じる（保存確認含む）。最後のタブを閉じると空の文書を開く"""
+        session = self._find_session(session_id)
+        if session is None:
+            return False
+        is_active = session_id == self.state.active_session_id
+        if is_active:
+            self._suspend_active_session()
+        if session.is_document_modified and not self._confirm_save():
+            if is_active:
+                self._schedule_preview_update(force=True)  # Resume the renders the suspension cancelled
+            return False
+        position = self.state.sessions.index(session)
+        self.state.sessions.remove(session)
+        self.render_scheduler.drop_cache(session_id)
+        self.state.status_message = f"Closed: {session.display_name}"
+        if not is_active:
+            self._update_document_tabs()
+            self._update_status_counts()
+            return True
+        self._load_generation += 1  # Abandons a streaming load of the closed document
+        self.state.is_loading_document = False
+        if not self.state.sessions:
+            self.state.sessions.append(DocumentSession(next(self._session_ids), outline_index=OutlineIndex(self.marp_engine)))
+        self._activate_session(self.state.sessions[min(position, len(self.state.sessions) - 1)])
+        self._update_status_counts()
+        return True
+
+    def _find_session(self, session_id: int) -> Optional[DocumentSession]:
+        return next((session for session in self.state.sessions if session.session_id == session_id), None)
+
+    def _find_session_by_path(self, file_path: Path) -> Optional[DocumentSession]:
+        self._stash_active_session()
+        return next((session for session in self.state.sessions if session.current_file_path == file_path), None)
+
+    def _can_switch_documents(self) -> bool:
+        # Streamed chunks are appended to whichever document is active, so the load has to finish first.
+        if not self.state.is_loading_document:
+            return True
+        self.state.status_message = "Wait until the document has finished loading."
+        if self.view:
+            self.view.update_status(self.state.status_message)
+        return False
+
+    def _open_tab(self) -> None:
+        """空の文書を作り、現在のタブの後ろに追加してアクティブにする"""
+        self._suspend_active_session()
+        session = DocumentSession(next(self._session_ids), outline_index=OutlineIndex(self.marp_engine))
+        position = self.state.sessions.index(self._find_session(self.state.active_session_id))
+        self.state.sessions.insert(position + 1, session)
+        self._activate_session(session)
+
+    def _prepare_tab_for_load(self) -> None:
+        # A blank, untouched tab is reused; anything else keeps its tab and the file opens in a new one.
+        if not self._stash_active_session().is_blank:
+            self._open_tab()
+
+    def _stash_active_session(self) -> DocumentSession:
+        """アクティブな文書の値を DocumentSession に書き戻す（値は参照のままで複製しない）"""
+        session = self._find_session(self.state.active_session_id)
+        for name in self.SESSION_STATE_FIELDS:
+            setattr(session, name, getattr(self.state, name))
+        for name in self.SESSION_CONTROLLER_FIELDS:
+            setattr(session, name, getattr(self, name))
+        return session
+
+    def _suspend_active_session(self) -> None:
+        """アクティブな文書の保留中の編集を反映し、その文書のための描画・検証を止めて退避する"""
+        if self.view and self._edit_flush_job is not None:
+            self.view.after_cancel(self._edit_flush_job)
+            self._flush_text_edits()
+        if self.preview_update_timer:
+            self.preview_update_timer.cancel()
+        # Results still in flight belong to this document; the generation bump makes them stale.
+        self.render_scheduler.cancel()
+        self.render_scheduler.cancel(LANE_PRESENTER)
+        self.slide_validator.cancel()
+        session = self._stash_active_session()
+        if self.view:
+            session.cursor_offset = self.view.get_cursor_offset()
+
+    def _activate_session(self, session: DocumentSession) -> None:
+        """タブの文書を AppState とコントローラーに戻し、エディタ・一覧・プレビューを切り替える"""
+        self.state.active_session_id = session.session_id
+        session.last_active = time.monotonic()
+        session.is_demoted = False
+        for name in self.SESSION_STATE_FIELDS:
+            setattr(self.state, name, getattr(session, name))
+        for name in self.SESSION_CONTROLLER_FIELDS:
+            setattr(self, name, getattr(session, name))
+        if self.outline_index is None:
+            self.outline_index = session.outline_index = OutlineIndex(self.marp_engine)
+            self.outline_index.rebuild(self.state.slides_data)
+        self.state.html_content = ""
+        self.presenter_images = {}
+        self._presentation_deck = None
+        self._pending_search_hit = None
+        self._theme_gallery_request = None
+        self.marp_engine.asset_resolver.set_document_path(self.state.current_file_path)
+        self._demote_background_sessions()
+        if self.view:
+            self.view.set_editor_content(self.state.markdown_content)
+            if session.cursor_offset is not None:
+                self.view.set_cursor_offset(session.cursor_offset)
+            self._show_diagnostics()
+            self.view.update_outline(self.outline_index)
+            self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, self.slide_thumbnails)
+            self._update_document_tabs()
+            self._schedule_preview_update(force=True) # Cached thumbnails come straight back from the render cache
+
+    def _demote_background_sessions(self) -> None:
+        # Only the most recently shown tabs keep their thumbnails. The others get theirs back from the
+        # shared render cache, or drawn again if it has evicted them, when they are shown next.
+        background = sorted((session for session in self.state.sessions
+                             if session.session_id != self.state.active_session_id),
+                            key=lambda session: session.last_active, reverse=True)
+        for session in background[self.MAX_WARM_SESSIONS - 1:]:
+            if not session.is_demoted:
+                session.slide_thumbnails = []
+                session.slide_thumbnail_sources = []
+                session.is_demoted = True
+
+    def _update_document_tabs(self) -> None:
+        if self.view:
+            self._stash_active_session()  # The active tab's label follows its file name and unsaved changes
+            self.view.update_document_tabs(self.state.sessions, self.state.active_session_id)
+
+    def open_document(self, file_path: Optional[Path] = None) -> bool:
+        """ファイルを新しいタブで開く（開いているファイルならそのタブに切り替える）"""
         if not file_path:
             file_path_str = filedialog.askopenfilename(
                 defaultextension=".md",
@@ -81,22 +343,46 @@ class AppController:
                 return False
             file_path = Path(file_path_str)
 
+        existing = self._find_session_by_path(file_path)
+        if existing is not None:
+            return self.switch_document(existing.session_id)
+        if not self._can_switch_documents():
+            return False
+
+        try:
+            file_size = file_path.stat().st_size
+        except OSError:
+            file_size = 0
+        if self.view and file_size >= self.STREAMING_LOAD_BYTES:
+            return self._start_streaming_load(file_path)
+
+        self._load_generation += 1
+        self._pending_search_hit = None
+        self.state.is_loading_document = False
         content = self.file_manager.read_file(file_path)
         if content is not None:
+            self._prepare_tab_for_load()
             self.state.markdown_content = content
+            self.state.document.set_text(content)
             self.state.current_file_path = file_path
+            self.marp_engine.asset_resolver.set_document_path(file_path)
             self.state.is_document_modified = False
             self.state.status_message = f"Opened: {file_path.name}"
+            self._remember_recent_file(file_path)
             
-            self.state.slides_data = self.marp_engine.extract_slides(self.state.markdown_content)
-            self.state.slide_count = len(self.state.slides_data)
+            self._sync_slides_with_document()
             self.state.current_slide_index = 1
-            self.last_rendered_slide_images = []
+            self.slide_thumbnails = []
+            self.presenter_images = {}
+            self.validation_errors = []
+            self.slide_overflow = {}
 
             if self.view:
                 self.view.set_editor_content(content)
+                self._show_diagnostics()
                 self._schedule_preview_update(force=True) # This will also update slide list and popup
-                self.view.update_status(self.state.status_message, len(content), content.count('\n') + 1)
+                self._update_status_counts()
+                self._update_document_tabs()
             return True
         else:
             self.state.status_message = f"Failed to open: {file_path.name}"
@@ -104,6 +390,158 @@ class AppController:
                 self.view.update_status(self.state.status_message)
             return False
     
+    def _start_streaming_load(self, file_path: Path) -> bool:
+        """大きなファイルを断片ごとに読み込む
+
+        読み込みは別スレッドで行い、デコード済みの断片を上限付きのキューで受け取って
+        Tkスレッドでエディタと DocumentBuffer に追記する。読み終わったスライドから
+        順に一覧・ナビゲーション・描画の対象になる。
+        """
+        try:
+            encoding = self.file_manager.detect_encoding(file_path)
+        except OSError as e:
+            print(f"Error reading file {file_path}: {e}")
+            self.state.status_message = f"Failed to open: {file_path.name}"
+            self.view.update_status(self.state.status_message)
+            return False
+
+        self._prepare_tab_for_load()
+        self._load_generation += 1
+        self._pending_search_hit = None
+        generation = self._load_generation
+        chunks: Queue = Queue(maxsize=self.LOAD_QUEUE_SIZE)
+        Thread(target=self._read_document_chunks, args=(file_path, encoding, generation, chunks),
+               name="document-loader", daemon=True).start()
+
+        self.state.document.set_text("")
+        self.state.document.take_slide_changes()
+        self.state.markdown_content = ""
+        self.state.document_encoding = encoding
+        self.state.current_file_path = file_path
+        self.marp_engine.asset_resolver.set_document_path(file_path)
+        self.state.is_document_modified = False
+        self.state.is_loading_document = True
+        self.state.slides_data = []
+        self.state.slide_count = 0
+        self.state.current_slide_index = 1
+        self.state.document_metadata = DocumentMetadata()
+        self.slide_thumbnails = []
+        self.presenter_images = {}
+        self.validation_errors = []
+        self.slide_overflow = {}
+        self.outline_index.rebuild(self.state.slides_data)
+        self.state.status_message = f"Loading: {file_path.name}..."
+        self._remember_recent_file(file_path)
+
+        self.view.begin_editor_stream(file_path.stat().st_size)
+        self._show_diagnostics()
+        self.view.update_outline(self.outline_index)
+        self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, self.slide_thumbnails)
+        self.view.update_status(self.state.status_message)
+        self._update_document_tabs()
+        self.view.after(0, lambda: self._drain_loaded_chunks(generation, chunks, file_path))
+        return True
+
+    def _read_document_chunks(self, file_path: Path, encoding: str, generation: int, chunks: Queue) -> None:
+        # Runs on the loader thread. put() blocks while the queue is full, which bounds memory.
+        def put(item) -> bool:
+            while generation == self._load_generation:
+                try:
+                    chunks.put(item, timeout=0.5)
+                    return True
+                except Full:
+                    pass
+            return False
+
+        try:
+            for chunk in self.file_manager.iter_text_chunks(file_path, encoding, self.LOAD_CHUNK_SIZE):
+                if not put(chunk):
+                    return
+        except Exception as e:
+            print(f"Error reading file {file_path}: {e}")
+            put(e)
+            return
+        put(None)
+
+    def _drain_loaded_chunks(self, generation: int, chunks: Queue, file_path: Path) -> None:
+        if generation != self._load_generation or not self.view:
+            return
+        if self.view.get_editor_pending_chars() > 2 * self.LOAD_CHUNK_SIZE:
+            # Let the editor catch up before decoding more, so text is not buffered twice.
+            self.view.after(10, lambda: self._drain_loaded_chunks(generation, chunks, file_path))
+            return
+        try:
+            item = chunks.get_nowait()
+        except Empty:
+            self.view.after(10, lambda: self._drain_loaded_chunks(generation, chunks, file_path))
+            return
+        if isinstance(item, Exception):
+            self.state.is_loading_document = False
+            self.state.status_message = f"Failed to open: {file_path.name}"
+            self.view.end_editor_stream()
+            self._update_status_counts()
+            return
+        if item is None:
+            self._finish_streaming_load(file_path)
+            return
+        self._append_loaded_text(item)
+        self.state.status_message = f"Loading: {file_path.name}... {self.state.slide_count} slides"
+        self._update_status_counts()
+        # One chunk per event-loop turn keeps the window responsive during the load.
+        self.view.after(1, lambda: self._drain_loaded_chunks(generation, chunks, file_path))
+
+    def _append_loaded_text(self, text: str) -> None:
+        document = self.state.document
+        had_front_matter = document.has_front_matter
+        document.apply_edit(document.char_count, 0, text)
+        document.take_slide_changes()
+        self.state.markdown_content = document.text
+        self.view.append_editor_content(text)
+
+        # Only the last slide can have grown; everything after it is new.
+        previous_slides = self.state.slides_data
+        first = 0 if document.has_front_matter != had_front_matter else max(0, len(previous_slides) - 1)
+        slides = previous_slides[:first] + [self._build_document_slide(position)
+                                            for position in range(first, document.slide_count)]
+        if first == 0 or self._load_directives is None:
+            self._load_directives = DirectiveResolver(document.front_matter())
+        # Every slide but the last is complete, so its directives are resolved once; the last one
+        # is resolved provisionally until the next chunk (or the end of the file) completes it.
+        resolver = self._load_directives
+        resolved = resolver.slide_count
+        for position, directives in enumerate(resolver.extend(slides[resolved:len(slides) - 1]), resolved):
+            if slides[position].directives != directives:
+                slides[position] = slides[position].with_directives(directives)
+        if slides:
+            directives = resolver.peek(slides[-1])
+            if slides[-1].directives != directives:
+                slides[-1] = slides[-1].with_directives(directives)
+        self.state.document_metadata = resolver.metadata
+        self._rebase_slides(slides)
+        self.state.slides_data = slides
+        self.state.slide_count = len(slides)
+        self.outline_index.replace_tail(slides, first)
+        self.view.update_outline(self.outline_index)
+        if not previous_slides:
+            # Make the first slides visible and renderable right away.
+            self._schedule_preview_update(force=True) # This will also update slide list
+
+    def _finish_streaming_load(self, file_path: Path) -> None:
+        self.state.is_loading_document = False
+        self.state.markdown_content = self.state.document.text
+        # Global directives found late in the file apply to the slides before them too.
+        self._load_directives = None
+        slides = list(self.state.slides_data)
+        self.state.document_metadata = self.marp_engine.apply_directives(self.state.document.front_matter(), slides)
+        self.state.slides_data = slides
+        self.state.status_message = f"Opened: {file_path.name}"
+        self.view.end_editor_stream()
+        self._schedule_preview_update(force=True) # This will also update slide list and popup
+        self._update_status_counts()
+        if self._pending_search_hit is not None:
+            hit, self._pending_search_hit = self._pending_search_hit, None
+            self.navigate_to_outline_entry(hit.slide_index, hit.line)
+
     def save_document(self, file_path: Optional[Path] = None) -> bool:
         if not file_path and self.state.current_file_path:
             file_path = self.state.current_file_path
@@ -121,10 +559,18 @@ class AppController:
             success = self.file_manager.write_file(file_path, self.state.markdown_content)
             if success:
                 self.state.current_file_path = file_path
+                if self.marp_engine.asset_resolver.base_dir != file_path.parent:
+                    # Relative image paths now resolve against a different folder.
+                    self.marp_engine.asset_resolver.set_document_path(file_path)
+                    self._schedule_preview_update(force=True)
                 self.state.is_document_modified = False
                 self.state.status_message = f"Saved: {file_path.name}"
+                self._remember_recent_file(file_path)
+                if self.project_index.relative_key(file_path) is not None:
+                    self.project_index.refresh()  # Re-indexes just the saved file
                 if self.view:
-                    self.view.update_status(self.state.status_message, len(self.state.markdown_content), self.state.markdown_content.count('\n') + 1)
+                    self._update_status_counts()
+                    self._update_document_tabs()
                 return True
             else:
                 self.state.status_message = f"Failed to save: {file_path.name}"
@@ -133,6 +579,96 @@ class AppController:
                 return False
         return False
     
+    def _load_session(self) -> None:
+        data = self.file_manager.read_json(self.SESSION_FILE)
+        if not isinstance(data, dict):
+            return
+        self.state.recent_files = [Path(path) for path in data.get("recent_files", []) if isinstance(path, str)]
+        project_root = data.get("project_root")
+        self.state.project_root = Path(project_root) if isinstance(project_root, str) else None
+
+    def _save_session(self) -> None:
+        self.file_manager.write_json(self.SESSION_FILE, {
+            "recent_files": [str(path) for path in self.state.recent_files],
+            "project_root": str(self.state.project_root) if self.state.project_root else None,
+        })
+
+    def restore_session(self) -> None:
+        """前回の最近使用したファイルとプロジェクトをビューに反映する（ビューの作成後に呼ぶ）"""
+        if not self.view:
+            return
+        self.view.update_recent_files(self.state.recent_files)
+        if self.state.project_root and self.state.project_root.is_dir():
+            self.open_project(self.state.project_root)
+
+    def _remember_recent_file(self, file_path: Path) -> None:
+        recent_files = [path for path in self.state.recent_files if path != file_path]
+        self.state.recent_files = [file_path] + recent_files[:self.RECENT_FILES_LIMIT - 1]
+        self._save_session()
+        if self.view:
+            self.view.update_recent_files(self.state.recent_files)
+
+    def open_project(self, directory: Optional[Path] = None) -> bool:
+        """ディレクトリをプロジェクトとして開き、Markdown ファイルの索引を作る（保存済みの索引はすぐに表示する）"""
+        if not directory:
+            directory_str = filedialog.askdirectory(mustexist=True)
+            if not directory_str:
+                return False
+            directory = Path(directory_str)
+        if not directory.is_dir():
+            self.state.status_message = f"Folder not found: {directory}"
+            if self.view: self.view.update_status(self.state.status_message)
+            return False
+        self.state.project_root = directory
+        self._save_session()
+        self.project_search.open(directory)
+        self.project_index.open(directory, self._on_project_updated)
+        return True
+
+    def refresh_project(self) -> None:
+        """プロジェクトを再走査する（変更されたファイルだけ解析し直す）"""
+        self.project_index.refresh()
+
+    def open_project_file(self, entry: ProjectFileEntry) -> bool:
+        """プロジェクトの一覧で選んだファイルを開く"""
+        return self.open_document(self.project_index.absolute_path(entry))
+
+    def _on_project_updated(self, generation: int, entries: List[ProjectFileEntry], is_scanning: bool) -> None:
+        # Called from the scanner thread (and once from open_project); hand the result over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._apply_project_entries(generation, entries, is_scanning))
+
+    def _apply_project_entries(self, generation: int, entries: List[ProjectFileEntry], is_scanning: bool) -> None:
+        if generation != self.project_index.generation or not self.view:
+            return
+        self.view.update_project_files(self.project_index.root, entries, is_scanning)
+        if not is_scanning:
+            self.project_search.sync(entries)  # Re-reads only the files whose mtime or size changed
+
+    def search_project(self, query: str) -> List[SearchHit]:
+        """プロジェクト内の全ファイルを全文検索し、結果をビューに表示する"""
+        if self.project_search.root is None:
+            hits, summary = [], "Open a folder to search its decks."
+        elif not query.strip():
+            hits, summary = [], ""
+        else:
+            started = time.perf_counter()
+            hits = self.project_search.search(query)
+            summary = f"{len(hits)} hits in {(time.perf_counter() - started) * 1000:.0f} ms"
+        if self.view:
+            self.view.update_search_results(hits, summary)
+        return hits
+
+    def open_search_hit(self, hit: SearchHit) -> bool:
+        """検索結果のファイルを開き、ヒットしたスライドと行へ移動する"""
+        file_path = self.project_search.root / hit.path
+        if file_path != self.state.current_file_path and not self.open_document(file_path):
+            return False
+        if self.state.is_loading_document:
+            self._pending_search_hit = hit  # Navigated to once the streamed slides are all in
+            return True
+        return self.navigate_to_outline_entry(hit.slide_index, hit.line)
+
     def _confirm_save(self) -> bool:
         # Placeholder for a dialog asking user to save changes
         # For now, just return True to proceed without saving
@@ -140,39 +676,140 @@ class AppController:
 
     def close_document(self) -> bool:
         """ドキュメントを閉じる（保存確認含む）"""
-        return True
+        return self.close_tab(self.state.active_session_id)
     
     def import_document(self, file_path: Path, file_type: str) -> bool:
         """他形式からのインポート"""
         return True
 
     def on_content_changed(self, new_content: str) -> None:
-        """エディタ内容変更時の処理"""
-        self.state.markdown_content = new_content
-        self.state.is_document_modified = True
-
-        new_slides_data = self.marp_engine.extract_slides(self.state.markdown_content)
-        if new_slides_data != self.state.slides_data:
-            self.state.slides_data = new_slides_data
-            self.state.slide_count = len(self.state.slides_data)
-            if self.state.slide_count > 0 and self.state.current_slide_index > self.state.slide_count:
-                self.state.current_slide_index = self.state.slide_count
-            elif self.state.slide_count == 0:
-                self.state.current_slide_index = 0
+        """エディタ内容変更時の処理（本文全体を置き換えた場合）"""
+        self.state.document.set_text(new_content)
+        self._on_document_edited()
+
+    def on_text_edited(self, offset: int, removed_length: int, inserted_text: str) -> None:
+        """エディタでの1回の挿入/削除を反映する。同一フレーム内の編集はまとめて処理される"""
+        self.state.document.apply_edit(offset, removed_length, inserted_text)
+        if not self.view:
+            self._on_document_edited()
+        elif self._edit_flush_job is None:
+            self._edit_flush_job = self.view.after(self.EDIT_COALESCE_MS, self._flush_text_edits)
+
+    def _flush_text_edits(self) -> None:
+        self._edit_flush_job = None
+        self._on_document_edited()
 
+    def _on_document_edited(self) -> None:
+        self.state.markdown_content = self.state.document.text
+        was_modified, self.state.is_document_modified = self.state.is_document_modified, True
+
+        changed_slides = self._sync_slides_with_document()
+        if self.state.slide_count > 0 and self.state.current_slide_index > self.state.slide_count:
+            self.state.current_slide_index = self.state.slide_count
+        elif self.state.slide_count == 0:
+            self.state.current_slide_index = 0
+        self._publish_to_preview_server()
+
+        self.debounce_tuner.record_keystroke()
+        if self.state.is_adaptive_debounce_enabled:
+            self._refresh_effective_debounce_delay()
         if self.state.is_live_preview_enabled:
             if self.preview_update_timer:
                 self.preview_update_timer.cancel()
-            self.preview_update_timer = Timer(self.state.debounce_delay, self._schedule_preview_update)
+            self.preview_update_timer = Timer(self.state.effective_debounce_delay, self._schedule_preview_update)
             self.preview_update_timer.start()
         elif self.preview_update_timer:
             self.preview_update_timer.cancel()
 
+        # Overflow of edited slides is measured again by the next thumbnail render.
+        if changed_slides is None:
+            self.slide_overflow = {}
+        else:
+            for position in changed_slides:
+                self.slide_overflow.pop(position, None)
+
+        if self.state.is_presenter_view_open:
+            # Drop images of edited slides; the next preview update renders them again.
+            if changed_slides is None:
+                self.presenter_images = {}
+            else:
+                for position in changed_slides:
+                    self.presenter_images.pop(position, None)
+
         if self.view:
-            # Update slide list with metadata first (no images yet)
-            self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, [])
-            self.view.update_status(self.state.status_message, len(new_content), new_content.count('\n') + 1)
-        
+            if changed_slides is None:
+                # Slides were added or removed; show the list with metadata first (no images yet)
+                self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, [])
+            else:
+                for position in changed_slides:
+                    self.view.update_slide_entry(self.state.slides_data[position], self.state.current_slide_index)
+            self._update_status_counts()
+            if not was_modified:
+                self._update_document_tabs()
+
+    def _sync_slides_with_document(self) -> Optional[List[int]]:
+        """DocumentBuffer の変更を slides_data に反映する
+
+        変更されたスライドだけを作り直し、その位置のリストを返す。
+        スライドの追加・削除があった場合は全体を作り直して None を返す。
+        ディレクティブの解決は、フロントマターかいずれかのスライドのディレクティブが
+        変わった時だけ文書全体に対して行う。
+        """
+        document = self.state.document
+        restructured, dirty_slides, front_matter_changed = document.take_slide_changes()
+        previous_slides = self.state.slides_data
+        if restructured or len(previous_slides) != document.slide_count:
+            slides = [self._build_document_slide(position) for position in range(document.slide_count)]
+            self.state.document_metadata = self.marp_engine.apply_directives(document.front_matter(), slides)
+            self.state.slides_data = slides
+            self.state.slide_count = len(slides)
+            self.outline_index.rebuild(slides)
+            changed_slides = None
+        else:
+            slides = list(previous_slides)
+            needs_directive_resolution = front_matter_changed
+            whitespace_edited: List[int] = []
+            for position in dirty_slides:
+                previous = previous_slides[position]
+                slide = self._build_document_slide(position)
+                if slide.content_length == previous.content_length and slide.content == previous.content:
+                    whitespace_edited.append(position)
+                    continue
+                if slide_directives_of(slide).directive_items != slide_directives_of(previous).directive_items:
+                    needs_directive_resolution = True
+                else:
+                    slide.directives = previous.directives
+                slides[position] = slide
+            if needs_directive_resolution:
+                self.state.document_metadata = self.marp_engine.apply_directives(document.front_matter(), slides)
+            self._rebase_slides(slides, whitespace_edited)
+            changed_slides = [position for position, slide in enumerate(slides) if slide is not previous_slides[position]] \
+                if needs_directive_resolution else sorted(p for p in dirty_slides if slides[p] is not previous_slides[p])
+            self.state.slides_data = slides
+            self.outline_index.update(slides, changed_slides)
+        if self.view:
+            self.view.update_outline(self.outline_index)
+        return changed_slides
+
+    def _build_document_slide(self, position: int) -> SlideData:
+        document = self.state.document
+        return self.marp_engine.build_document_slide(position + 1, document.text, *document.slide_span(position))
+
+    def _rebase_slides(self, slides: List[SlideData], edited: Iterable[int] = ()) -> None:
+        # Slides kept from before the edit still point into an older copy of the text; moving them
+        # to the current one lets that copy be freed. Their contents are unchanged, so an offset
+        # shift is enough, except for edited slides whose change was only surrounding whitespace.
+        document = self.state.document
+        text = document.text
+        for position in edited:
+            slides[position].rebase(text, *document.slide_span(position))
+        for slide, start in zip(slides, document.slide_starts()):
+            slide.rebase(text, start)  # Already-current slides, including the edited ones, are skipped
+
+    def _update_status_counts(self) -> None:
+        if self.view:
+            self.view.update_status(self.state.status_message, self.state.document.char_count, self.state.document.line_count)
+
     def toggle_live_preview(self, enabled: bool) -> None:
         """ライブプレビューの有効/無効切り替え"""
         self.state.is_live_preview_enabled = enabled
@@ -184,12 +821,78 @@ class AppController:
         elif enabled:
             self._schedule_preview_update(force=True) # If enabled, force update preview
         
+    def set_large_file_mode(self, enabled: bool) -> None:
+        """大きなファイルでの分割読み込み・表示範囲のみのハイライトを有効にするかどうか"""
+        self.state.is_large_file_mode_enabled = enabled
+        if self.view: # Update settings UI
+            self.view.after(0, lambda: self.view.side_panel.update_settings_ui())
+
+    def set_draft_preview(self, enabled: bool) -> None:
+        """変更されたスライドの下書きサムネイルを先に表示するかどうか"""
+        self.state.is_draft_preview_enabled = enabled
+        if self.view: # Update settings UI
+            self.view.after(0, lambda: self.view.side_panel.update_settings_ui())
+
+    def set_parallel_rendering(self, enabled: bool) -> None:
+        """大きなデッキのHTML変換をプロセスプールで並列に行うかどうか"""
+        self.state.is_parallel_rendering_enabled = enabled
+        if enabled and self.marp_engine.parallel_renderer is None:
+            self.marp_engine.parallel_renderer = ParallelSlideRenderer()
+        elif not enabled and self.marp_engine.parallel_renderer is not None:
+            self.marp_engine.parallel_renderer.shutdown()
+            self.marp_engine.parallel_renderer = None
+        if self.view: # Update settings UI
+            self.view.after(0, lambda: self.view.side_panel.update_settings_ui())
+
+    def toggle_preview_server(self, enabled: bool) -> None:
+        """ブラウザ向けライブプレビューサーバーの起動/停止"""
+        if enabled:
+            try:
+                self.state.preview_server_url = self.preview_server.start()
+                self.state.status_message = f"Preview server running at {self.state.preview_server_url}"
+            except OSError as e:
+                print(f"Error starting preview server: {e}")
+                enabled = False
+                self.state.status_message = "Failed to start preview server."
+        else:
+            self.preview_server.stop()
+            self.state.preview_server_url = None
+            self.state.status_message = "Preview server stopped."
+        self.state.is_preview_server_enabled = enabled
+        self._publish_to_preview_server()
+        if self.view: # Update settings UI
+            self.view.after(0, lambda: self.view.side_panel.update_settings_ui())
+            self.view.after(0, self._update_status_counts)
+
+    def _publish_to_preview_server(self) -> None:
+        # Only the slides whose SlideData changed since the last call are rendered and pushed.
+        if self.preview_server.is_running:
+            self.preview_server.publish(self.state.slides_data, self._render_theme(), self.state.current_slide_index - 1)
+
     def set_debounce_delay(self, delay: float) -> None:
         """Sets the debounce delay for preview updates."""
         self.state.debounce_delay = delay
+        self.state.is_adaptive_debounce_enabled = False
+        self.state.effective_debounce_delay = delay
         if self.view: # Update settings UI
             self.view.after(0, lambda: self.view.side_panel.update_settings_ui())
 
+    def set_adaptive_debounce(self, enabled: bool) -> None:
+        """Enables the adaptive debounce mode that tunes the delay from measured render cost."""
+        self.state.is_adaptive_debounce_enabled = enabled
+        self._refresh_effective_debounce_delay()
+        if self.view: # Update settings UI
+            self.view.after(0, lambda: self.view.side_panel.update_settings_ui())
+
+    def _refresh_effective_debounce_delay(self) -> None:
+        previous_delay = self.state.effective_debounce_delay
+        if self.state.is_adaptive_debounce_enabled:
+            self.state.effective_debounce_delay = self.debounce_tuner.compute_delay(fallback=self.state.debounce_delay)
+        else:
+            self.state.effective_debounce_delay = self.state.debounce_delay
+        if self.view and self.state.effective_debounce_delay != previous_delay: # Update settings UI
+            self.view.after(0, lambda: self.view.side_panel.update_settings_ui())
+
     def _schedule_preview_update(self, force: bool = False) -> None:
         """Schedules the preview update to run on the main Tkinter thread."""
         if self.view:
@@ -208,36 +911,289 @@ class AppController:
             return
 
         if self.state.is_live_preview_enabled or force:
+            self._start_validation()
             if self.state.is_presentation_mode:
-                rendered_html = self.marp_engine.render_presentation(
-                    self.state.markdown_content,
-                    self.state.selected_theme,
-                    slide_index=self.state.current_slide_index - 1 if self.state.current_slide_index > 0 else None
-                )
-                if self.view and hasattr(self.view, 'presentation_html_frame') and self.view.presentation_html_frame:
-                    self.view.presentation_html_frame.load_html(rendered_html)
+                self._update_presentation_view()
             else:
-                image_data_list = self.marp_engine.render_slides_as_images(
-                    self.state.markdown_content,
-                    self.state.selected_theme,
-                    self.state.aspect_ratio
-                )
-                self.last_rendered_slide_images = image_data_list
-                if self.view:
-                    # self.view.update_previews_panel(self.last_rendered_slide_images, self.state.aspect_ratio) # Removed
-                    self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, self.last_rendered_slide_images)
+                self._presentation_deck = None # The presentation frame is gone; the next one loads the deck again
+                self._start_slide_image_render()
         else: # Not live preview enabled and not forced
             self.state.html_content = "" # Should this be cleared? If so, where is it used?
-            self.last_rendered_slide_images = [] # Clear images if preview is off
+            self.render_scheduler.cancel()
+            self.slide_thumbnails = [] # Clear images if preview is off
             if self.view:
                 if self.state.is_presentation_mode: # Clear presentation mode if it was active
                     if hasattr(self.view, 'presentation_html_frame') and self.view.presentation_html_frame:
                         self.view.presentation_html_frame.load_html("Live preview is disabled.")
                 # No main preview panel to clear
-                self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, self.last_rendered_slide_images) # Update slide list with no images
+                self.view.update_slide_list(self.state.slides_data, self.state.current_slide_index, self.slide_thumbnails) # Update slide list with no images
             # self.update_popup_window_if_open() # Update popup as well # This is already called at the end of the outer if/else
 
         self.update_popup_window_if_open() # Ensure popup is updated regardless of preview state if content changed
+        self._update_presenter_view()
+        self._publish_to_preview_server()
+
+    def _update_presentation_view(self) -> None:
+        if self.state.is_presentation_deck_enabled:
+            self._update_presentation_deck()
+            return
+        rendered_html = self.marp_engine.render_presentation(
+            self.state.markdown_content,
+            self._render_theme(),
+            slide_index=self.state.current_slide_index - 1 if self.state.current_slide_index > 0 else None
+        )
+        if self.view and hasattr(self.view, 'presentation_html_frame') and self.view.presentation_html_frame:
+            self.view.presentation_html_frame.load_html(rendered_html)
+
+    def set_presentation_deck_enabled(self, enabled: bool) -> None:
+        """プレゼンテーションモードで全スライドを1つの文書として読み込むかどうか"""
+        self.state.is_presentation_deck_enabled = enabled
+        self._presentation_deck = None
+        if self.state.is_presentation_mode:
+            self._schedule_preview_update(force=True)
+        if self.view: # Update settings UI
+            self.view.after(0, lambda: self.view.side_panel.update_settings_ui())
+
+    def _update_presentation_deck(self) -> None:
+        """単一文書のプレゼンテーションを更新する
+
+        読み込み済みの文書に対しては、編集されたスライドの section だけを差し替え、
+        スライド移動は表示の切り替えだけで行う（Markdownの再解析も再読み込みもしない）。
+        スライド構成・テーマ・style ディレクティブが変わった場合や、DOMを操作できなかった場合は
+        文書全体を読み込み直す。
+        """
+        if not self.view:
+            return
+        slides = self.state.slides_data
+        position = min(max(0, self.state.current_slide_index - 1), max(0, len(slides) - 1))
+        theme = self._render_theme()
+        loaded = self._presentation_deck
+        engine = self.marp_engine
+        if (loaded is not None and slides and len(loaded) == len(slides) and theme == self._presentation_deck_theme
+                and loaded[0].directives.get("style") == slides[0].directives.get("style")):
+            # Slides are rebuilt on edit, so identity tells which sections are stale.
+            is_patched = all(
+                self.view.patch_presentation_slide(engine.slide_section_id(p), *engine.slide_section_attributes(slide),
+                                                   engine.render_slide_fragment(slide))
+                for p, slide in enumerate(slides) if slide is not loaded[p]
+            )
+            if is_patched and self.view.show_presentation_slide(engine.slide_section_id(self._presentation_visible_position),
+                                                                engine.slide_section_id(position)):
+                self._presentation_deck = list(slides)
+                self._presentation_visible_position = position
+                return
+        self.view.update_presentation_view(engine.render_presentation_deck(slides, theme, position))
+        self._presentation_deck = list(slides)
+        self._presentation_deck_theme = theme
+        self._presentation_visible_position = position
+
+    def _start_slide_image_render(self) -> None:
+        """スライド画像の描画を優先度順にバックグラウンドで開始する
+
+        下書きが有効なら、変更されたスライドをまず PIL で粗く描いてすぐに表示し、
+        Chromium による正確な画像が届いた順に置き換える。
+        """
+        slides = self.state.slides_data
+        if len(self.slide_thumbnails) != len(slides):
+            # Keep the previous images while the deck shape is unchanged; they are replaced as slides finish.
+            self.slide_thumbnails = [None] * len(slides)
+            self.slide_thumbnail_sources = [None] * len(slides)
+        order = self._slide_render_priority()
+        thumbnail_width = self.view.get_thumbnail_pixel_width() if self.view else 128
+        if self.state.is_draft_preview_enabled:
+            self._render_draft_thumbnails(slides, order, thumbnail_width)
+        if self.view:
+            self.view.update_slide_list(slides, self.state.current_slide_index, self.slide_thumbnails)
+        if not slides:
+            self.render_scheduler.cancel()
+            return
+        self._render_job_slides = slides
+        self.render_scheduler.submit(
+            slides,
+            self._render_theme(),
+            self._render_aspect_ratio(),
+            order,
+            thumbnail_width,
+            on_slide_rendered=self._on_slide_image_rendered,
+            on_finished=self._on_slide_render_finished,
+            on_slide_measured=self._on_slide_measured,
+            cache_namespace=self.state.active_session_id
+        )
+        self._refresh_theme_gallery()
+
+    def _render_draft_thumbnails(self, slides: List[SlideData], order: List[int], thumbnail_width: int) -> None:
+        # Drafts cost a few milliseconds each on the Tk thread, so only the first few stale slides get one.
+        theme, aspect_ratio = self._render_theme(), self._render_aspect_ratio()
+        drafted = 0
+        for position in order:
+            if drafted == self.DRAFT_LIMIT:
+                break
+            if self.slide_thumbnail_sources[position] is slides[position]:
+                continue
+            try:
+                self.slide_thumbnails[position] = self.draft_renderer.render(slides[position], theme, aspect_ratio, thumbnail_width)
+            except Exception as e:
+                print(f"Error drafting slide {slides[position].index}: {e}")
+                continue
+            self.slide_thumbnail_sources[position] = slides[position]
+            drafted += 1
+
+    def _render_theme(self) -> str:
+        # A 'theme' global directive in the document takes precedence over the theme selector.
+        theme = self.state.document_metadata.theme
+        return theme if theme in self.state.available_themes else self.state.selected_theme
+
+    def _render_aspect_ratio(self) -> str:
+        size = self.state.document_metadata.size
+        return size if size in ("16:9", "4:3") else self.state.aspect_ratio
+
+    def _slide_render_priority(self) -> List[int]:
+        """Returns 0-based slide positions: cursor slide, current slide, visible slides, then the rest."""
+        slide_count = len(self.state.slides_data)
+        prioritized: List[int] = []
+        if self.view:
+            cursor_offset = self.view.get_cursor_offset()
+            if cursor_offset is not None:
+                prioritized.append(self.state.document.slide_at(cursor_offset) + 1)
+        prioritized.append(self.state.current_slide_index)
+        if self.view:
+            prioritized.extend(self.view.get_visible_slide_indices())
+
+        order: List[int] = []
+        seen = set()
+        for slide_index in prioritized + list(range(1, slide_count + 1)):
+            position = slide_index - 1
+            if 0 <= position < slide_count and position not in seen:
+                seen.add(position)
+                order.append(position)
+        return order
+
+    def _on_slide_image_rendered(self, generation: int, position: int, thumbnail: Thumbnail) -> None:
+        # Called from the render worker; hand the result over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._apply_slide_image(generation, position, thumbnail))
+
+    def _apply_slide_image(self, generation: int, position: int, thumbnail: Thumbnail) -> None:
+        if generation != self.render_scheduler.generation or position >= len(self.slide_thumbnails):
+            return
+        self.slide_thumbnails[position] = thumbnail
+        self.slide_thumbnail_sources[position] = self._render_job_slides[position]
+        if position == 0 and self.state.current_file_path and not self.state.is_document_modified:
+            # The project browser shows this in place of its draft of the file's first slide.
+            self.project_index.store_thumbnail(self.state.current_file_path, thumbnail)
+        if self.view:
+            self.view.update_slide_image(position + 1, thumbnail, self.state.current_slide_index)
+
+    def _on_slide_measured(self, generation: int, position: int, overflow_width: int, overflow_height: int) -> None:
+        # Called from the render worker; hand the result over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._apply_slide_overflow(generation, position, overflow_width, overflow_height))
+
+    def _apply_slide_overflow(self, generation: int, position: int, overflow_width: int, overflow_height: int) -> None:
+        if generation != self.render_scheduler.generation or position >= len(self.state.slides_data):
+            return
+        slide = self.state.slides_data[position]
+        overflow = [f"{overflow_height}px at the bottom" if overflow_height > self.OVERFLOW_TOLERANCE_PX else "",
+                    f"{overflow_width}px at the right" if overflow_width > self.OVERFLOW_TOLERANCE_PX else ""]
+        message = " and ".join(part for part in overflow if part)
+        previous = self.slide_overflow.get(position)
+        if not message:
+            if previous is None:
+                return
+            del self.slide_overflow[position]
+        else:
+            error = ValidationError(slide.index, 0, f"Content overflows the slide by {message}", "warning", "overflow")
+            if previous == error:
+                return
+            self.slide_overflow[position] = error
+        self._schedule_diagnostics_refresh()
+
+    def _start_validation(self) -> None:
+        """文書の検証をバックグラウンドで開始する（変更の無いスライドはキャッシュから返る）"""
+        if self.state.is_loading_document:
+            return
+        self.slide_validator.submit(self.state.slides_data, self.state.document.front_matter(), self._on_validation_finished)
+
+    def _on_validation_finished(self, generation: int, errors: List[ValidationError]) -> None:
+        # Called from the validation worker; hand the result over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._apply_validation(generation, errors))
+
+    def _apply_validation(self, generation: int, errors: List[ValidationError]) -> None:
+        if generation != self.slide_validator.generation or errors == self.validation_errors:
+            return
+        self.validation_errors = errors
+        self._schedule_diagnostics_refresh()
+
+    def _schedule_diagnostics_refresh(self) -> None:
+        # Overflow results arrive one slide at a time; retag the editor once per batch.
+        if self.view and self._diagnostics_job is None:
+            self._diagnostics_job = self.view.after(50, self._show_diagnostics)
+
+    def _show_diagnostics(self) -> None:
+        """検証結果とはみ出しをエディタの行とスライド一覧に表示する"""
+        self._diagnostics_job = None
+        if not self.view:
+            return
+        document = self.state.document
+        diagnostics: List[Tuple[int, str, str]] = []
+        severities: Dict[int, str] = {}
+        for error in sorted(self.validation_errors + list(self.slide_overflow.values()),
+                            key=lambda error: (error.slide_index, error.line)):
+            if error.slide_index == 0:
+                if not document.has_front_matter:
+                    continue
+                line, label = 2 + error.line, "Front matter"  # The front matter starts below its '---' line
+            else:
+                if error.slide_index > document.slide_count:
+                    continue  # Reported for a slide that has since been removed
+                line = document.line_at(document.slide_content_start(error.slide_index - 1)) + error.line
+                label = f"Slide {error.slide_index}"
+                if severities.get(error.slide_index) != "error":
+                    severities[error.slide_index] = error.severity
+            diagnostics.append((line, error.severity, f"{label}, line {line}: {error.message}"))
+        self.view.show_diagnostics(diagnostics)
+        self.view.update_slide_diagnostics(severities)
+
+    def on_thumbnail_width_changed(self) -> None:
+        """Slidesパネルの幅が変わったらサムネイルを描き直す"""
+        if self.state.slides_data and not self.state.is_presentation_mode:
+            self._start_slide_image_render()
+
+    def _on_slide_render_finished(self, generation: int, render_seconds: float, rendered_count: int) -> None:
+        # Called from the render worker; hand the result over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._record_render_cost(render_seconds, rendered_count))
+        else:
+            self._record_render_cost(render_seconds, rendered_count)
+
+    def _record_render_cost(self, render_seconds: float, rendered_count: int) -> None:
+        if rendered_count == 0:
+            return  # Everything came from the cache, which says nothing about what a render costs
+        self.debounce_tuner.record_render(render_seconds)
+        if self.state.is_adaptive_debounce_enabled:
+            self._refresh_effective_debounce_delay()
+
+    def _on_blocks_rendered(self) -> None:
+        # Called from the block worker; hand over to the Tk thread.
+        if self.view:
+            self.view.after(0, self._refresh_pending_blocks)
+
+    def _refresh_pending_blocks(self) -> None:
+        """Tkスレッドで描画待ちにした数式・ダイアグラムが揃ったら、それを表示するビューを描き直す"""
+        # Thumbnails are drawn on the render worker, which waits for the blocks, so only Tk-side views are stale.
+        if self.state.is_presentation_mode or self.state.is_popup_window_open:
+            self._presentation_deck = None  # Unchanged slides would otherwise keep showing the source
+            self._schedule_preview_update(force=True)
+
+    def _on_renderer_missing(self, renderer_name: str) -> None:
+        # Called from whichever thread first met the block; hand over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._show_renderer_missing(renderer_name))
+
+    def _show_renderer_missing(self, renderer_name: str) -> None:
+        self.state.status_message = f"{renderer_name} is not installed; those blocks are shown as code."
+        self.view.update_status(self.state.status_message)
 
     def set_aspect_ratio(self, aspect_ratio: str) -> None:
         self.state.aspect_ratio = aspect_ratio
@@ -246,11 +1202,63 @@ class AppController:
     def apply_theme(self, theme_name: str) -> None:
         """テーマの適用"""
         self.state.selected_theme = theme_name
+        self._reuse_theme_gallery_images()
         self._schedule_preview_update(force=True) # Force update preview with new theme, this will also update popup
         if self.view:
             # This UI update should also be scheduled if it's not already safe
             self.view.after(0, lambda: self.view.update_theme_selection(self.state.available_themes, self.state.selected_theme))
         
+    def _reuse_theme_gallery_images(self) -> None:
+        # Slides the gallery has already drawn in the new theme are shown at once and skipped by the next render.
+        if not self.view or self.state.is_presentation_mode:
+            return
+        theme, aspect_ratio = self._render_theme(), self._render_aspect_ratio()
+        thumbnail_width = self.view.get_thumbnail_pixel_width()
+        slides = self.state.slides_data
+        for position, slide in enumerate(slides[:len(self.slide_thumbnails)]):
+            cached = self.theme_gallery.cached_image(slide, theme, aspect_ratio, thumbnail_width)
+            if cached is None:
+                continue
+            image, overflow = cached
+            self.render_scheduler.store_image(slide, theme, aspect_ratio, thumbnail_width, image, overflow,
+                                              cache_namespace=self.state.active_session_id)
+            self.slide_thumbnails[position] = image
+            self.slide_thumbnail_sources[position] = slide
+            self.view.update_slide_image(position + 1, image, self.state.current_slide_index)
+
+    def set_theme_gallery_visible(self, visible: bool) -> None:
+        """Themesタブの表示状態の切り替え（表示中は現在のスライドを全テーマで描画する）"""
+        self.state.is_theme_gallery_visible = visible
+        if visible:
+            self._refresh_theme_gallery()
+        else:
+            self.theme_gallery.cancel()
+            self._theme_gallery_request = None
+
+    def _refresh_theme_gallery(self) -> None:
+        """現在のスライドが変わっていれば、テーマギャラリーの描画をバックグラウンドで開始する"""
+        slides = self.state.slides_data
+        if not self.view or not self.state.is_theme_gallery_visible or not slides:
+            return
+        slide = slides[min(max(self.state.current_slide_index, 1), len(slides)) - 1]
+        # Rendered at the thumbnail width so a theme switch can reuse the images for the slide list.
+        aspect_ratio, width = self._render_aspect_ratio(), self.view.get_thumbnail_pixel_width()
+        previous = self._theme_gallery_request
+        if previous is not None and previous[0] is slide and previous[1:] == (aspect_ratio, width):
+            return
+        self._theme_gallery_request = (slide, aspect_ratio, width)
+        self.theme_gallery.submit(slide, self.state.available_themes, aspect_ratio, width, self._on_theme_preview_rendered)
+
+    def _on_theme_preview_rendered(self, generation: int, theme_name: str, image: Thumbnail) -> None:
+        # Called from the render worker; hand the result over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._apply_theme_preview(generation, theme_name, image))
+
+    def _apply_theme_preview(self, generation: int, theme_name: str, image: Thumbnail) -> None:
+        if generation != self.theme_gallery.generation or not self.view:
+            return
+        self.view.update_theme_preview(theme_name, image)
+
     def insert_slide_break(self, position: int) -> None:
         """スライド区切りの挿入"""
         pass
@@ -259,7 +1267,9 @@ class AppController:
         """指定スライドへの移動"""
         if 1 <= slide_index <= self.state.slide_count:
             self.state.current_slide_index = slide_index
-            self._schedule_preview_update(force=True) # This will also update slide list and popup
+            self._show_current_slide()
+            if self.view:
+                self.view.refresh_outline_selection()
             return True
         elif self.state.slide_count == 0 and slide_index == 0: # Allow navigating to 0 if no slides
             self.state.current_slide_index = 0
@@ -267,6 +1277,34 @@ class AppController:
             return True
         return False
     
+    def _show_current_slide(self) -> None:
+        """スライドの移動を反映する
+
+        文書は変わっていないので検証も描画ジョブの投入もせず、実行中のサムネイル描画の順番だけを
+        新しいスライドの周りが先になるように変える。
+        """
+        if not self.view:
+            return
+        if self.state.is_presentation_mode:
+            self._update_presentation_view() # The deck only switches the visible section
+        else:
+            self.render_scheduler.reprioritize(self._slide_render_priority())
+            self.view.select_slide(self.state.current_slide_index)
+            self._refresh_theme_gallery()
+        self.update_popup_window_if_open()
+        self._update_presenter_view()
+        self._publish_to_preview_server()
+
+    def navigate_to_outline_entry(self, slide_index: int, line: Optional[int] = None) -> bool:
+        """アウトラインの項目へ移動（スライドを選択し、エディタを該当行へスクロール）"""
+        if not self.navigate_to_slide(slide_index):
+            return False
+        if self.view:
+            document = self.state.document
+            first_line = document.line_at(document.slide_content_start(slide_index - 1))
+            self.view.scroll_editor_to_line(first_line + (line or 0))
+        return True
+
     def navigate_slide(self, direction: str) -> bool:
         """スライドナビゲーション（'prev'/'next'）"""
         if direction == 'next':
@@ -286,8 +1324,71 @@ class AppController:
             self.view.exit_presentation_mode()
     
     def toggle_speaker_notes(self, visible: bool) -> None:
-        """スピーカーノートの表示切り替え"""
-        pass
+        """スピーカーノートの表示切り替え（発表者ビューの開閉）"""
+        if visible == self.state.is_presenter_view_open:
+            return
+        if visible:
+            self.presenter_images = {}
+            self.state.is_presenter_view_open = True
+            if self.view:
+                self.view.open_presenter_view()
+            self._update_presenter_view()
+        else:
+            self.render_scheduler.cancel(LANE_PRESENTER)
+            self.presenter_images = {}
+            self.state.is_presenter_view_open = False
+            if self.view:
+                self.view.close_presenter_view()
+
+    def _update_presenter_view(self) -> None:
+        """発表者ビューを現在のスライドで更新し、前後のスライドを先読みで描画する"""
+        if not self.state.is_presenter_view_open or not self.view:
+            return
+        self._show_presenter_slides()
+        slides = self.state.slides_data
+        position = self.state.current_slide_index - 1
+        # Already-rendered neighbours come straight back from the scheduler cache, so
+        # resubmitting on every navigation only renders what is actually missing. The presenter lane
+        # shares the slide list's worker and browser and is served before the thumbnails.
+        order = [position + offset for offset in self.PRESENTER_PREFETCH_OFFSETS if 0 <= position + offset < len(slides)]
+        if not order:
+            self.render_scheduler.cancel(LANE_PRESENTER)
+            return
+        self.render_scheduler.submit(
+            slides,
+            self._render_theme(),
+            self._render_aspect_ratio(),
+            order,
+            self.view.get_presenter_pixel_width(),
+            on_slide_rendered=self._on_presenter_slide_rendered,
+            cache_namespace=self.state.active_session_id,
+            lane=LANE_PRESENTER
+        )
+
+    def _show_presenter_slides(self) -> None:
+        slides = self.state.slides_data
+        position = self.state.current_slide_index - 1
+        current_slide = slides[position] if 0 <= position < len(slides) else None
+        self.view.update_presenter_view(
+            self.state.current_slide_index,
+            len(slides),
+            current_slide.notes if current_slide else None,
+            self.presenter_images.get(position),
+            self.presenter_images.get(position + 1),
+            has_next=position + 1 < len(slides)
+        )
+
+    def _on_presenter_slide_rendered(self, generation: int, position: int, image: Thumbnail) -> None:
+        # Called from the render worker; hand the result over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._apply_presenter_image(generation, position, image))
+
+    def _apply_presenter_image(self, generation: int, position: int, image: Thumbnail) -> None:
+        if not self.state.is_presenter_view_open or generation != self.render_scheduler.presenter_generation:
+            return
+        self.presenter_images[position] = image
+        if self.view and position - (self.state.current_slide_index - 1) in (0, 1):
+            self._show_presenter_slides()
 
     def export_html(self, output_path: Optional[Path] = None, options: Optional[ExportOptions] = None) -> bool:
         """HTMLファイルとしてエクスポート"""
@@ -302,10 +1403,18 @@ class AppController:
                 return False
             output_path = Path(file_path_str)
 
-        success = self.file_manager.write_file(output_path, self.state.html_content)
+        if self.state.is_loading_document:
+            self.state.status_message = "Cannot export while the document is still loading."
+            if self.view: self.view.update_status(self.state.status_message)
+            return False
+        title = self.state.document_metadata.title or (self.state.current_file_path.stem if self.state.current_file_path else "Marp Presentation")
+        # Streamed section by section from the engine's fragment cache; nothing is rendered twice.
+        chunks = self.marp_engine.iter_html_export(self.state.slides_data, self._render_theme(),
+                                                   self._render_aspect_ratio(), title)
+        success = self.file_manager.write_stream(output_path, chunks)
         if success:
             self.state.status_message = f"HTML exported to: {output_path.name}"
-            if self.view: self.view.update_status(self.state.status_message, len(self.state.markdown_content), self.state.markdown_content.count('\n') + 1)
+            if self.view: self._update_status_counts()
             return True
         else:
             self.state.status_message = f"Failed to export HTML to: {output_path.name}"
@@ -316,10 +1425,97 @@ class AppController:
         """PDFファイルとしてエクスポート"""
         return True
     
-    def export_images(self, output_dir: Path, options: ExportOptions) -> bool:
-        """画像ファイルとしてエクスポート""" 
+    def export_images(self, output_dir: Optional[Path] = None, options: Optional[ExportOptions] = None) -> bool:
+        """画像ファイルとしてエクスポート"""
+        if not output_dir:
+            dir_str = filedialog.askdirectory(mustexist=True)
+            if not dir_str:
+                self.state.status_message = "Image export cancelled."
+                if self.view: self.view.update_status(self.state.status_message)
+                return False
+            output_dir = Path(dir_str)
+
+        if self.state.is_loading_document:
+            self.state.status_message = "Cannot export while the document is still loading."
+            if self.view: self.view.update_status(self.state.status_message)
+            return False
+        if self._image_export_dir is not None:
+            self.state.status_message = "An image export is already running."
+            if self.view: self.view.update_status(self.state.status_message)
+            return False
+
+        # Full-resolution images are only produced here, on demand; the Slides panel keeps thumbnails only.
+        # The render worker screenshots them between thumbnails, so the UI stays responsive meanwhile.
+        slides = self.state.slides_data
+        self._image_export_dir = output_dir
+        self._image_export_total = len(slides)
+        self._image_export_generation = self.render_scheduler.export(
+            slides, self._render_theme(), self._render_aspect_ratio(),
+            on_slide_exported=self._on_slide_exported, on_finished=self._on_image_export_finished)
+        self.state.status_message = f"Exporting {len(slides)} images to: {output_dir.name}..."
+        if self.view: self.view.update_status(self.state.status_message)
         return True
-    
+
+    def cancel_image_export(self) -> None:
+        """実行中の画像エクスポートを中止する（書き出し済みのファイルはそのまま残す）"""
+        if self._image_export_dir is None:
+            return
+        self.render_scheduler.cancel(LANE_EXPORT)
+        output_dir = self._image_export_dir
+        self._clear_image_export()
+        self.state.status_message = f"Image export to {output_dir.name} cancelled."
+        if self.view: self.view.update_status(self.state.status_message)
+
+    def _clear_image_export(self) -> None:
+        self._image_export_dir = None
+        self._image_export_total = 0
+        self._image_export_generation = 0
+
+    def _is_image_export_current(self, generation: int) -> bool:
+        # A superseded or cancelled export is stale even though its dir may still be set.
+        return (self._image_export_dir is not None and generation == self._image_export_generation
+                and generation == self.render_scheduler.export_generation)
+
+    def _on_slide_exported(self, generation: int, position: int, png_data: bytes) -> None:
+        # Called from the render worker, which also writes the file; only the progress goes to the Tk thread.
+        output_dir = self._image_export_dir
+        if output_dir is None or not self._is_image_export_current(generation):
+            return
+        (output_dir / f"slide_{position + 1:03d}.png").write_bytes(png_data)
+        if self.view:
+            self.view.after(0, lambda: self._show_image_export_progress(generation, position + 1))
+
+    def _show_image_export_progress(self, generation: int, exported: int) -> None:
+        if not self._is_image_export_current(generation):
+            return
+        self.state.status_message = f"Exporting images to: {self._image_export_dir.name} ({exported}/{self._image_export_total})"
+        self.view.update_status(self.state.status_message)
+
+    def _on_image_export_finished(self, generation: int, exported: int, error: Optional[str]) -> None:
+        # Called from the render worker; hand the result over to the Tk thread.
+        if self.view:
+            self.view.after(0, lambda: self._finish_image_export(generation, exported, error))
+        else:
+            self._finish_image_export(generation, exported, error)
+
+    def _finish_image_export(self, generation: int, exported: int, error: Optional[str]) -> None:
+        output_dir = self._image_export_dir
+        if output_dir is None or generation != self._image_export_generation:
+            return  # Already cancelled, or the result of an earlier export
+        self._clear_image_export()
+        if generation != self.render_scheduler.export_generation:
+            # Superseded while the result was on its way to the Tk thread
+            self.state.status_message = f"Image export to {output_dir.name} cancelled."
+            if self.view: self.view.update_status(self.state.status_message)
+            return
+        if error is not None:
+            print(f"Error exporting images to {output_dir}: {error}")
+            self.state.status_message = f"Failed to export images to: {output_dir.name}"
+            if self.view: self.view.update_status(self.state.status_message)
+            return
+        self.state.status_message = f"{exported} images exported to: {output_dir.name}"
+        if self.view: self._update_status_counts()
+
     def export_pptx(self, output_path: Path, options: ExportOptions) -> bool:
         """PowerPointファイルとしてエクスポート"""
         return True
@@ -335,7 +1531,7 @@ class AppController:
             if self.state.slide_count > 0 and self.state.current_slide_index > 0:
                 html_content = self.marp_engine.render_presentation(
                     self.state.markdown_content,
-                    self.state.selected_theme,
+                    self._render_theme(),
                     slide_index=self.state.current_slide_index -1 # MarpEngine uses 0-based index
                 )
                 self.view.open_popup_window(html_content)
@@ -349,7 +1545,7 @@ class AppController:
             if self.state.slide_count > 0 and self.state.current_slide_index > 0:
                 html_content = self.marp_engine.render_presentation(
                     self.state.markdown_content,
-                    self.state.selected_theme,
+                    self._render_theme(),
                     slide_index=self.state.current_slide_index - 1 # MarpEngine uses 0-based index
                 )
                 self.view.update_popup_window_content(html_content)
@@ -1,15 +1,129 @@
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Mapping, Tuple
+import hashlib
+
+from src.models.document_buffer import DocumentBuffer
+
+_EMPTY_DIRECTIVES: Mapping[str, str] = MappingProxyType({})  # Shared by every slide without directives
+_UNPARSED = object()  # Notes not yet read from the content
+
 
-@dataclass
 class SlideData:
-    index: int
-    title: str
-    content: str
-    directives: Dict[str, str]
-    notes: Optional[str] = None
-    
+    """1枚のスライド
+
+    本文はコピーせず、文書全体の文字列への (文字列, 開始, 終了) の参照として持ち、
+    content を読んだ時に切り出す。ディレクティブの無いスライドは共有の空マッピングを、
+    ノートとタイトルは参照された時に求めた値を使う。本文のハッシュ (content_digest) は
+    一度だけ計算して保持するため、描画キャッシュのキーを作るたびに本文全体を読み直さない。
+    スライドが参照する文書文字列は rebase() で最新の版に付け替える。
+    """
+
+    __slots__ = ("index", "_title", "_span", "_directives", "_notes", "_digest")
+
+    def __init__(self, index: int, title: Optional[str] = None, content: str = "",
+                 directives: Optional[Dict[str, str]] = None, notes: Any = _UNPARSED):
+        self.index = index
+        self._title = title
+        # (text, raw start, start, end): one tuple, replaced as a whole, so render workers never see a
+        # half-updated reference. The raw start is where the slide's unstripped text begins.
+        self._span: Tuple[str, int, int, int] = (content, 0, 0, len(content))
+        self._directives = directives or None
+        self._notes = notes
+        self._digest: Optional[str] = None
+
+    @classmethod
+    def from_span(cls, index: int, source: str, start: int, end: int) -> 'SlideData':
+        """source[start:end] の前後の空白を除いた範囲を本文とするスライドを作る（本文はコピーしない）"""
+        slide = cls(index)
+        slide._span = (source, start, *_strip_bounds(source, start, end))
+        return slide
+
+    def rebase(self, source: str, raw_start: int, raw_end: Optional[int] = None) -> None:
+        """同じ本文を持つ新しい版の文書文字列に参照を付け替える（古い文書を解放できるようにする）
+
+        スライドの生テキストが変わっていなければ開始位置のずれだけで付け替える。
+        前後の空白だけが変わった場合は raw_end も渡して範囲を求め直す。
+        """
+        old_source, old_raw_start, start, end = self._span
+        if raw_end is not None:
+            self._span = (source, raw_start, *_strip_bounds(source, raw_start, raw_end))
+        elif old_source is not source:
+            shift = raw_start - old_raw_start
+            self._span = (source, raw_start, start + shift, end + shift)
+
+    def with_directives(self, directives: Optional[Dict[str, str]]) -> 'SlideData':
+        """ディレクティブだけが異なるスライドを作る（本文の参照とハッシュは共有する）"""
+        slide = SlideData(self.index, self._title, directives=directives, notes=self._notes)
+        slide._span, slide._digest = self._span, self._digest
+        return slide
+
+    @property
+    def content(self) -> str:
+        source, _, start, end = self._span
+        return source if start == 0 and end == len(source) else source[start:end]
+
+    @property
+    def content_length(self) -> int:
+        _, _, start, end = self._span
+        return end - start
+
+    @property
+    def content_digest(self) -> str:
+        """本文の SHA-1（16進）。キャッシュのキーに使う"""
+        if self._digest is None:
+            self._digest = hashlib.sha1(self.content.encode('utf-8')).hexdigest()
+        return self._digest
+
+    @property
+    def title(self) -> str:
+        return self._title if self._title is not None else f"Slide {self.index}"
+
+    @property
+    def directives(self) -> Mapping[str, str]:
+        return self._directives if self._directives is not None else _EMPTY_DIRECTIVES
+
+    @directives.setter
+    def directives(self, directives: Optional[Mapping[str, str]]) -> None:
+        self._directives = directives or None
+
+    @property
+    def notes(self) -> Optional[str]:
+        if self._notes is _UNPARSED:
+            from src.services.directives import slide_directives_of  # The services import this module
+            self._notes = slide_directives_of(self).notes
+        return self._notes
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, SlideData):
+            return NotImplemented
+        return (self.index == other.index and self.content_length == other.content_length
+                and self.content_digest == other.content_digest and self.title == other.title
+                and dict(self.directives) == dict(other.directives) and self.notes == other.notes)
+
+    def __hash__(self) -> int:
+        return hash((self.index, self.content_digest))
+
+    def __reduce__(self):
+        # Pickled (for the render process pool) with its own content, not the whole document it points into.
+        return SlideData, (self.index, self._title, self.content, self._directives, self.notes)
+
+    def __repr__(self) -> str:
+        return f"SlideData(index={self.index}, title={self.title!r}, content={self.content[:40]!r}...)"
+
+
+def _strip_bounds(source: str, start: int, end: int) -> Tuple[int, int]:
+    # Same bounds as source[start:end].strip(), found without copying the text.
+    while start < end and source[start].isspace():
+        start += 1
+    while end > start and source[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
 @dataclass
 class DocumentMetadata:
     title: Optional[str] = None
@@ -19,21 +133,66 @@ class DocumentMetadata:
     size: Optional[str] = None
     custom_directives: Dict[str, str] = field(default_factory=dict)
 
+@dataclass
+class DocumentSession:
+    """タブで開いている1つの文書
+
+    アクティブなタブの値は AppState とコントローラーが持ち、タブを切り替える時にここへ退避・復元する。
+    エンジン・描画ワーカー・ブラウザは全てのタブで共有し、文書ごとに持つのはスライドのモデルと
+    サムネイルなどの描画結果だけにする。
+    """
+    session_id: int
+    document: DocumentBuffer = field(default_factory=DocumentBuffer)
+    markdown_content: str = ""
+    current_file_path: Optional[Path] = None
+    is_document_modified: bool = False
+    document_encoding: str = "utf-8"
+    slide_count: int = 0
+    current_slide_index: int = 1
+    slides_data: List[SlideData] = field(default_factory=list)
+    document_metadata: DocumentMetadata = field(default_factory=DocumentMetadata)
+    cursor_offset: Optional[int] = None  # Editor insert position, restored when the tab is shown again
+    outline_index: Any = None  # OutlineIndex of this document (created by the controller)
+    slide_thumbnails: List[Any] = field(default_factory=list)  # EncodedImage (drafts: PIL images); dropped when the tab is demoted
+    slide_thumbnail_sources: List[Optional[SlideData]] = field(default_factory=list)
+    validation_errors: List[Any] = field(default_factory=list)  # ValidationError
+    slide_overflow: Dict[int, Any] = field(default_factory=dict)  # 0-based slide position -> ValidationError
+    last_active: float = 0.0  # time.monotonic() when the tab was last shown
+    is_demoted: bool = False  # Its thumbnails were released; they come back from the render cache or are redrawn
+
+    @property
+    def display_name(self) -> str:
+        name = self.current_file_path.name if self.current_file_path else "Untitled"
+        return f"{name} *" if self.is_document_modified else name
+
+    @property
+    def is_blank(self) -> bool:
+        """未保存・未編集の空の文書（ファイルを開くとこのタブに読み込む）"""
+        return self.current_file_path is None and not self.is_document_modified and self.document.char_count == 0
+
 @dataclass
 class AppState:
     # ドキュメント関連
     markdown_content: str = ""
+    document: DocumentBuffer = field(default_factory=DocumentBuffer)  # Incrementally indexed copy of markdown_content
     html_content: str = ""
     current_file_path: Optional[Path] = None
     is_document_modified: bool = False
     document_encoding: str = "utf-8"
-    
+    is_loading_document: bool = False  # A large file is still being streamed in
+    sessions: List[DocumentSession] = field(default_factory=list)  # Open tabs, in tab order
+    active_session_id: int = 0
+
     # プレゼンテーション関連
     slide_count: int = 0
     current_slide_index: int = 1
     slides_data: List[SlideData] = field(default_factory=list)
+    document_metadata: DocumentMetadata = field(default_factory=DocumentMetadata)  # Filled from front matter and global directives
     is_presentation_mode: bool = False # Added this line
+    is_presentation_deck_enabled: bool = True  # Load the whole deck once and navigate inside the page
     is_popup_window_open: bool = False
+    is_presenter_view_open: bool = False
+    is_theme_gallery_visible: bool = False  # The Themes tab is showing, so its previews follow the current slide
     
     # テーマ・設定関連
     selected_theme: str = "default"
@@ -41,15 +200,23 @@ class AppState:
     
     # UI状態
     is_live_preview_enabled: bool = True
+    is_large_file_mode_enabled: bool = True  # Chunked editor loading and viewport-only highlighting for big files
+    is_parallel_rendering_enabled: bool = True  # Render large decks' HTML in a process pool
+    is_draft_preview_enabled: bool = True  # Show quick PIL drafts of changed slides before the Chromium thumbnails
+    is_preview_server_enabled: bool = False  # Serve the deck to local browsers with live updates
+    preview_server_url: Optional[str] = None
     editor_font_size: int = 12
     preview_zoom_level: float = 1.0
     debounce_delay: float = 1.0  # Default debounce delay in seconds
     available_debounce_delays: List[float] = field(default_factory=lambda: [1.0, 3.0, 5.0])
+    is_adaptive_debounce_enabled: bool = False
+    effective_debounce_delay: float = 1.0  # Delay actually used for the next preview update
     aspect_ratio: str = "16:9" # Add aspect_ratio
     window_layout: Dict[str, Any] = field(default_factory=dict)
     
     # 最近使用したファイル
     recent_files: List[Path] = field(default_factory=list)
+    project_root: Optional[Path] = None  # Folder shown in the Files tab
     
     # エラー・メッセージ
     last_error: Optional[str] = None
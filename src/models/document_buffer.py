@@ -0,0 +1,253 @@
+from bisect import bisect_right
+from typing import Iterable, List, Set, Tuple
+import re
+
+SLIDE_DELIMITER = '\n---\n' # Marp slide delimiter
+FRONT_MATTER_OPENER = '---\n'
+_LEADING_WHITESPACE = re.compile(r'\s*')
+
+
+class _ShiftedOffsets:
+    """昇順の文字オフセット列（行頭やスライド区切りの位置）
+
+    編集位置より後ろの要素は編集の長さだけずれるが、それを全要素に書き込むことはせず、
+    「この番号以降は shift だけずれている」という保留値1つで表す。次の編集が別の場所なら
+    保留の境界をそこまで動かし、その間の要素にだけずれを反映する。連続した入力のように
+    近い場所への編集では、後続の行数によらず要素の書き換えは数個で済む。
+    """
+
+    __slots__ = ("_offsets", "_shift_index", "_shift")
+
+    def __init__(self, offsets: Iterable[int] = ()):
+        self._offsets: List[int] = list(offsets)
+        self._shift_index = len(self._offsets)  # Elements from here on are stored without _shift
+        self._shift = 0
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0:
+            index += len(self._offsets)
+        offset = self._offsets[index]
+        return offset + self._shift if index >= self._shift_index else offset
+
+    def bisect_right(self, value: int, low: int = 0) -> int:
+        """value 以下の要素の数（low より前は value 以下とみなす）"""
+        index = self._shift_index
+        if low < index:
+            position = bisect_right(self._offsets, value, low, index)
+            if position < index:
+                return position
+        return bisect_right(self._offsets, value - self._shift, max(low, index))
+
+    def replace(self, start: int, stop: int, offsets: List[int], delta: int) -> None:
+        """[start, stop) の要素を offsets に置き換え、stop 以降の要素を delta だけずらす"""
+        self._move_shift(stop)
+        self._offsets[start:stop] = offsets
+        self._shift_index = start + len(offsets)
+        self._shift += delta
+
+    def to_list(self) -> List[int]:
+        index, shift = self._shift_index, self._shift
+        return self._offsets[:index] + [offset + shift for offset in self._offsets[index:]]
+
+    def _move_shift(self, index: int) -> None:
+        # Costs the distance between the previous edit and this one, not the length of the list.
+        offsets, shift = self._offsets, self._shift
+        if shift:
+            for i in range(self._shift_index, index):
+                offsets[i] += shift
+            for i in range(index, self._shift_index):
+                offsets[i] -= shift
+        self._shift_index = index
+
+
+class DocumentBuffer:
+    """エディタ本文と、その行頭・スライド区切りのインデックス
+
+    編集は (offset, 削除文字数, 挿入文字列) の差分として適用し、行頭オフセットと
+    スライド区切りの位置は編集箇所の周辺だけを再計算する。文字数・行数・スライド数は
+    差分適用時点で確定しているため、参照のたびに全文を走査する必要はない。
+    後続の行頭・区切りのずれは保留値として持つため、1文字の編集で後ろの全行を書き換えることはない。
+    区切りの判定は str.split(SLIDE_DELIMITER) と同じく左から重ならないように行う。
+    文書が '---' 行で始まる場合、最初の区切りまではフロントマターとして扱い、
+    スライドの位置（0始まり）はフロントマターを除いて数える。
+    """
+
+    def __init__(self, text: str = ""):
+        self.text = ""
+        self._line_starts = _ShiftedOffsets([0])
+        self._slide_delimiters = _ShiftedOffsets()  # Offsets of each '\n---\n'
+        self.has_front_matter = False
+        self._dirty_slides: Set[int] = set()
+        self._slides_restructured = False
+        self._front_matter_changed = False
+        self.set_text(text)
+
+    def set_text(self, text: str) -> None:
+        self.text = text
+        self._line_starts = _ShiftedOffsets([0] + [m.end() for m in re.finditer('\n', text)])
+        delimiters = []
+        position = text.find(SLIDE_DELIMITER)
+        while position != -1:
+            delimiters.append(position)
+            position = text.find(SLIDE_DELIMITER, position + len(SLIDE_DELIMITER))
+        self._slide_delimiters = _ShiftedOffsets(delimiters)
+        self.has_front_matter = self._detect_front_matter()
+        self._dirty_slides.clear()
+        self._slides_restructured = True
+        self._front_matter_changed = True
+
+    def _detect_front_matter(self) -> bool:
+        return self.text.startswith(FRONT_MATTER_OPENER) and len(self._slide_delimiters) > 0
+
+    def apply_edit(self, offset: int, removed_length: int, inserted_text: str) -> None:
+        """offset から removed_length 文字を inserted_text で置き換える"""
+        old_end = offset + removed_length
+        new_end = offset + len(inserted_text)
+        delta = len(inserted_text) - removed_length
+        self.text = self.text[:offset] + inserted_text + self.text[old_end:]
+
+        first_line = self._line_starts.bisect_right(offset)
+        last_line = self._line_starts.bisect_right(old_end, first_line)
+        inserted_lines = [offset + m.end() for m in re.finditer('\n', inserted_text)]
+        self._line_starts.replace(first_line, last_line, inserted_lines, delta)
+
+        self._update_slide_delimiters(offset, old_end, new_end, delta)
+
+    def _update_slide_delimiters(self, offset: int, old_end: int, new_end: int, delta: int) -> None:
+        delimiter_length = len(SLIDE_DELIMITER)
+        delimiters = self._slide_delimiters
+        old_count = len(delimiters)
+        # Delimiters touching the edited range (d + length > offset and d < old_end) are re-detected.
+        first = delimiters.bisect_right(offset - delimiter_length)
+        last = first
+        while last < old_count and delimiters[last] < old_end:
+            last += 1
+
+        # Scan forward until the scan lands on a delimiter that was already known past
+        # the edit; from there on the left-to-right split is unchanged. Known delimiters
+        # past the edit (the tail) are read with the edit's delta added.
+        position = max(delimiters[first - 1] + delimiter_length if first > 0 else 0, offset - delimiter_length + 1)
+        found: List[int] = []
+        tail_end = last  # Known delimiters before this one are replaced by the scan
+        while True:
+            match = self.text.find(SLIDE_DELIMITER, position)
+            if match == -1:
+                tail_end = old_count
+                break
+            while tail_end < old_count and delimiters[tail_end] + delta < match:
+                tail_end += 1
+            if match >= new_end and tail_end < old_count and delimiters[tail_end] + delta == match:
+                break
+            found.append(match)
+            position = match + delimiter_length
+        delimiters.replace(first, tail_end, found, delta)
+
+        had_front_matter = self.has_front_matter
+        self.has_front_matter = self._detect_front_matter()
+        if len(delimiters) != old_count or had_front_matter != self.has_front_matter:
+            self._slides_restructured = True
+            self._front_matter_changed = True
+        else:
+            changed_end = max(new_end, found[-1] + delimiter_length) if found else new_end
+            first_raw = self._raw_slide_at(offset)
+            last_raw = self._raw_slide_at(changed_end)
+            skipped = int(self.has_front_matter)
+            if skipped and first_raw == 0:
+                self._front_matter_changed = True
+            self._dirty_slides.update(range(max(first_raw - skipped, 0), last_raw - skipped + 1))
+
+    # --- metrics ----------------------------------------------------------
+
+    @property
+    def char_count(self) -> int:
+        return len(self.text)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._line_starts)
+
+    @property
+    def slide_count(self) -> int:
+        return len(self._slide_delimiters) + 1 - int(self.has_front_matter)
+
+    @property
+    def line_starts(self) -> List[int]:
+        """全行の行頭オフセットの一覧（全行を走査するため、編集ごとの処理では line_start() を使う）"""
+        return self._line_starts.to_list()
+
+    @property
+    def slide_delimiters(self) -> List[int]:
+        """全てのスライド区切り '\\n---\\n' の位置の一覧"""
+        return self._slide_delimiters.to_list()
+
+    # --- slides -----------------------------------------------------------
+
+    def _raw_slide_at(self, offset: int) -> int:
+        return self._slide_delimiters.bisect_right(offset - len(SLIDE_DELIMITER))
+
+    def slide_at(self, offset: int) -> int:
+        """offset を含むスライドの位置（0始まり、フロントマター内なら先頭スライド）"""
+        return max(0, self._raw_slide_at(offset) - int(self.has_front_matter))
+
+    def _raw_slide_span(self, raw_position: int) -> Tuple[int, int]:
+        delimiters = self._slide_delimiters
+        start = delimiters[raw_position - 1] + len(SLIDE_DELIMITER) if raw_position > 0 else 0
+        end = delimiters[raw_position] if raw_position < len(delimiters) else len(self.text)
+        return start, end
+
+    def slide_span(self, position: int) -> Tuple[int, int]:
+        """スライド本文の [開始, 終了) オフセット（区切り行は含まない）"""
+        return self._raw_slide_span(position + int(self.has_front_matter))
+
+    def slide_starts(self) -> List[int]:
+        """全スライドの開始オフセット（slide_span(position)[0] の一覧）"""
+        delimiter_length = len(SLIDE_DELIMITER)
+        starts = [delimiter + delimiter_length for delimiter in self._slide_delimiters.to_list()]
+        return starts if self.has_front_matter else [0] + starts
+
+    def front_matter(self) -> str:
+        """フロントマターの本文（'---' 行を除く）。無ければ空文字列"""
+        if not self.has_front_matter:
+            return ""
+        _, end = self._raw_slide_span(0)
+        return self.text[len(FRONT_MATTER_OPENER):end]
+
+    def slide_content_start(self, position: int) -> int:
+        """slide_content() の先頭文字の文書内オフセット（先頭の空白を飛ばした位置）"""
+        start, end = self.slide_span(position)
+        return _LEADING_WHITESPACE.match(self.text, start, end).end()
+
+    def slide_content(self, position: int) -> str:
+        start, end = self.slide_span(position)
+        return self.text[start:end].strip()
+
+    def take_slide_changes(self) -> Tuple[bool, Set[int], bool]:
+        """前回以降の変更を (スライド構成が変わったか, 変更されたスライド位置, フロントマターが変わったか)
+        で返し、記録をリセットする"""
+        changes = (self._slides_restructured, self._dirty_slides, self._front_matter_changed)
+        self._slides_restructured = False
+        self._dirty_slides = set()
+        self._front_matter_changed = False
+        return changes
+
+    # --- coordinates ------------------------------------------------------
+
+    def line_at(self, offset: int) -> int:
+        """offset を含む行の番号（1始まり）"""
+        return self._line_starts.bisect_right(offset)
+
+    def line_start(self, line: int) -> int:
+        """行（1始まり）の行頭オフセット"""
+        return self._line_starts[min(max(1, line), len(self._line_starts)) - 1]
+
+    def offset_to_index(self, offset: int) -> str:
+        """文字オフセットを Tk の "行.桁" インデックスに変換する"""
+        line = self._line_starts.bisect_right(offset)
+        return f"{line}.{offset - self._line_starts[line - 1]}"
+
+    def index_to_offset(self, line: int, column: int) -> int:
+        """Tk の行（1始まり）・桁を文字オフセットに変換する"""
+        return min(len(self.text), self.line_start(line) + column)
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from typing import Tuple, Union
+import io
+import struct
+
+from PIL import Image
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """PNG などの圧縮されたままの画像
+
+    サムネイルはデコード済みの RGB 画像の数分の一の大きさで済むため、キャッシュにはこの形で置き、
+    画面に表示する時にだけ decode() する。
+    """
+    data: bytes
+    width: int
+    height: int
+
+    @classmethod
+    def from_png(cls, data: bytes) -> 'EncodedImage':
+        """PNG のヘッダーから大きさを読んで包む（画素はデコードしない）"""
+        if data[:8] != _PNG_SIGNATURE or data[12:16] != b"IHDR":
+            raise ValueError("Not a PNG image")
+        width, height = struct.unpack(">II", data[16:24])
+        return cls(data, width, height)
+
+    @classmethod
+    def encode(cls, image: Image.Image, format: str = "PNG") -> 'EncodedImage':
+        buffer = io.BytesIO()
+        image.save(buffer, format=format)
+        return cls(buffer.getvalue(), image.width, image.height)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def decode(self) -> Image.Image:
+        return Image.open(io.BytesIO(self.data)).convert("RGB")
+
+    def __repr__(self) -> str:
+        return f"EncodedImage({self.width}x{self.height}, {len(self.data)} bytes)"
+
+
+Thumbnail = Union[Image.Image, EncodedImage]  # Drafts are drawn with PIL; Chromium renders stay encoded
+
+
+def decode_image(image: Thumbnail) -> Image.Image:
+    """EncodedImage ならデコードし、デコード済みの画像はそのまま返す"""
+    return image.decode() if isinstance(image, EncodedImage) else image
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+import base64
+import io
+import mimetypes
+import re
+
+from PIL import Image
+
+_MARKDOWN_IMAGE_PATTERN = re.compile(r'!\[[^\]]*\]\(\s*<?([^)\s>]+)')
+_HTML_IMAGE_PATTERN = re.compile(r'<img\b[^>]*\bsrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+_CSS_URL_PATTERN = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+
+
+class AssetResolver:
+    """スライドが参照するローカル画像を文書ファイルの場所から解決し、data URI として埋め込む
+
+    画像はデコードして最大辺 max_dimension まで縮小し、再エンコードした結果を
+    (パス, 更新時刻, サイズ) をキーにキャッシュする。元が十分小さい画像はそのまま埋め込む。
+    Chromium の page.set_content には基準URLが無いため、相対パスの画像はこの埋め込みで表示される。
+    """
+
+    PASSTHROUGH_BYTES = 256 * 1024  # Files at most this large and within max_dimension are inlined as-is
+
+    def __init__(self, max_dimension: int = 1920, max_cache_bytes: int = 64 * 1024 * 1024, jpeg_quality: int = 85):
+        self.max_dimension = max_dimension
+        self.max_cache_bytes = max_cache_bytes
+        self.jpeg_quality = jpeg_quality
+        self.base_dir: Optional[Path] = None
+        self._cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = Lock()  # Used from the Tk thread and from render workers
+
+    def set_document_path(self, document_path: Optional[Path]) -> None:
+        """相対パスの基準となる文書ファイルを設定する（未保存の文書なら None）"""
+        self.base_dir = document_path.parent if document_path else None
+
+    def resolve(self, src: str) -> Optional[Path]:
+        """画像の参照先をローカルファイルのパスに解決する。リモートや data URI なら None"""
+        path = self._local_path(src)
+        return path if path is not None and path.is_file() else None
+
+    def _local_path(self, src: str) -> Optional[Path]:
+        # The path a local reference points to, whether or not the file exists yet.
+        parsed = urlparse(src)
+        if parsed.scheme == "file":
+            return Path(unquote(parsed.path))
+        if parsed.scheme and len(parsed.scheme) > 1:  # http:, data:, ... (a single letter is a Windows drive)
+            return None
+        path = Path(unquote(src))
+        if not path.is_absolute():
+            if self.base_dir is None:
+                return None
+            path = self.base_dir / path
+        return path
+
+    def _stat_key(self, path: Path) -> Optional[Tuple[str, int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return str(path), stat.st_mtime_ns, stat.st_size
+
+    def inline(self, src: str) -> Optional[str]:
+        """ローカル画像を data URI に変換する（解決できなければ None）"""
+        path = self.resolve(src)
+        key = self._stat_key(path) if path else None
+        if key is None:
+            return None
+        with self._lock:
+            data_uri = self._cache.get(key)
+            if data_uri is not None:
+                self._cache.move_to_end(key)
+                return data_uri
+        try:
+            data_uri = self._encode(path, key[2])
+        except Exception as e:
+            print(f"Error loading image {path}: {e}")
+            return None
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = data_uri
+                self._cache_bytes += len(data_uri)
+                while self._cache_bytes > self.max_cache_bytes and len(self._cache) > 1:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= len(evicted)
+        return data_uri
+
+    def _encode(self, path: Path, file_size: int) -> str:
+        mime_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if mime_type == "image/svg+xml" or not mime_type.startswith("image/"):
+            return self._data_uri(mime_type, path.read_bytes())
+        with Image.open(path) as image:
+            if file_size <= self.PASSTHROUGH_BYTES and max(image.size) <= self.max_dimension:
+                return self._data_uri(mime_type, path.read_bytes())
+            if getattr(image, "is_animated", False):
+                return self._data_uri(mime_type, path.read_bytes())  # Re-encoding would drop the animation
+            image.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+            output = io.BytesIO()
+            if image.mode in ("RGBA", "LA", "P") and (image.mode != "P" or "transparency" in image.info):
+                image.save(output, format="PNG", optimize=True)
+                return self._data_uri("image/png", output.getvalue())
+            image.convert("RGB").save(output, format="JPEG", quality=self.jpeg_quality, optimize=True)
+            return self._data_uri("image/jpeg", output.getvalue())
+
+    def _data_uri(self, mime_type: str, data: bytes) -> str:
+        return f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+
+    def inline_css_urls(self, css_value: str) -> str:
+        """CSSの値に含まれる url(...) のローカル画像を data URI に置き換える"""
+        def replace(match):
+            data_uri = self.inline(match.group(2))
+            return f'url("{data_uri}")' if data_uri else match.group(0)
+        return _CSS_URL_PATTERN.sub(replace, css_value)
+
+    def inline_html_images(self, html_content: str) -> str:
+        """生HTMLの <img src="..."> のローカル画像を data URI に置き換える"""
+        if '<img' not in html_content.lower():
+            return html_content
+        def replace(match):
+            data_uri = self.inline(match.group(1))
+            return match.group(0).replace(match.group(1), data_uri) if data_uri else match.group(0)
+        return _HTML_IMAGE_PATTERN.sub(replace, html_content)
+
+    def find_missing_images(self, slide_content: str) -> List[Tuple[int, str]]:
+        """参照先のローカルファイルが存在しない画像を (本文内のオフセット, 参照) で返す
+
+        相対パスは文書ファイルの場所が分かる時だけ判定する（未保存の文書では判定しない）。
+        """
+        if '![' not in slide_content and '<img' not in slide_content.lower():
+            return []
+        missing = []
+        for pattern in (_MARKDOWN_IMAGE_PATTERN, _HTML_IMAGE_PATTERN):
+            for match in pattern.finditer(slide_content):
+                src = match.group(1)
+                parsed = urlparse(src)
+                if parsed.scheme and parsed.scheme != "file" and len(parsed.scheme) > 1:
+                    continue  # Remote or data URI
+                if not parsed.scheme and self.base_dir is None and not Path(unquote(src)).is_absolute():
+                    continue
+                if self.resolve(src) is None:
+                    missing.append((match.start(1), src))
+        return sorted(missing)
+
+    def _image_sources(self, slide_content: str, background_image: str = "") -> List[str]:
+        if '![' not in slide_content and '<img' not in slide_content.lower() and not background_image:
+            return []
+        sources = _MARKDOWN_IMAGE_PATTERN.findall(slide_content) + _HTML_IMAGE_PATTERN.findall(slide_content)
+        return sources + [match[1] for match in _CSS_URL_PATTERN.findall(background_image)]
+
+    def referenced_paths(self, slide_content: str, background_image: str = "") -> List[Path]:
+        """スライドが参照するローカル画像のパス（まだ存在しないファイルも含む。変更の監視に使う）"""
+        paths = (self._local_path(src) for src in self._image_sources(slide_content, background_image))
+        return [path for path in paths if path is not None]
+
+    def fingerprint(self, slide_content: str, background_image: str = "") -> str:
+        """スライドが参照するローカル画像の更新時刻の要約（描画キャッシュのキーに使う）"""
+        sources = self._image_sources(slide_content, background_image)
+        parts = [str(self.base_dir)] if sources else []
+        for src in sources:
+            path = self.resolve(src)
+            key = self._stat_key(path) if path else None
+            if key:
+                parts.append(f"{key[0]}:{key[1]}:{key[2]}")
+        return "|".join(parts)
@@ -0,0 +1,234 @@
+from collections import OrderedDict
+from pathlib import Path
+from queue import Queue
+from threading import Lock, Thread, current_thread
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import hashlib
+import io
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+from src.services.file_manager import app_cache_dir
+
+# Fence languages rendered as diagrams, and the local command that renders each one to SVG
+DIAGRAM_COMMANDS: Dict[str, str] = {"mermaid": "mmdc", "dot": "dot", "graphviz": "dot", "plantuml": "plantuml"}
+MATH_FENCE_LANGUAGES = {"math", "latex", "tex"}
+BLOCK_PENDING = ""  # Returned on the UI thread while a block is rendered in the background
+# Renderers installed next to the app (e.g. `npm install --prefix tools @mermaid-js/mermaid-cli`, or a Graphviz /
+# PlantUML build copied to tools/bin) are found before the ones on PATH, so a deck renders the same everywhere.
+TOOLS_DIR = Path(__file__).parent.parent.parent / "tools"
+TOOL_SEARCH_PATH = os.pathsep.join(str(path) for path in (TOOLS_DIR / "bin", TOOLS_DIR / "node_modules" / ".bin"))
+RENDERER_NAMES = {"mmdc": "mermaid-cli (mmdc)", "dot": "Graphviz (dot)", "plantuml": "PlantUML",
+                  "matplotlib": "matplotlib"}
+
+_SVG_START_PATTERN = re.compile(r'<svg\b')
+_BLACK_FILL_PATTERN = re.compile(r'#000000\b')
+
+
+class BlockRenderer:
+    """数式とダイアグラムのブロックをローカルのレンダラーでSVGに変換する（ネットワークは使わない）
+
+    数式は matplotlib の mathtext、ダイアグラムは mmdc (mermaid-cli)・dot (Graphviz)・plantuml で
+    描画する。コマンドは tools/ 以下に同梱したものを PATH より先に探す。いずれもオプションで、
+    使えなければ None を返し、呼び出し側はコードとして表示する。見つからないレンダラーは
+    on_renderer_missing で1度だけ知らせる。結果はソースのハッシュをキーにメモリとディスクに
+    キャッシュするため、数式の多いデッキでも打鍵やエクスポートのたびに組版し直すことはない。
+    ui_thread から呼ばれた時はキャッシュに無いブロックを待たずに BLOCK_PENDING を返し、
+    描画は専用のワーカーで行って、終わったら on_rendered を呼ぶ。
+    """
+
+    COMMAND_TIMEOUT = 30.0  # Seconds; mmdc starts its own headless browser
+    MATH_FONT_SIZE = 12  # Points, i.e. the 16px body text of the slide
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_memory_entries: int = 2048):
+        self._cache_dir = cache_dir
+        self._is_cache_dir_ready = False
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, Optional[str]]" = OrderedDict()  # None records a failed render
+        self._lock = Lock()
+        self._math_to_image = None
+        self._font_properties = None
+        self._math_lock = Lock()  # mathtext keeps global state; formulas from several threads are typeset in turn
+        self._is_mathtext_checked = False
+        self._executables: Dict[str, Optional[str]] = {}  # Command -> resolved path (None if not installed)
+        self.ui_thread: Optional[Thread] = None  # Renders requested on this thread never wait for a renderer
+        self.on_rendered: Optional[Callable[[], None]] = None  # Called from the block worker once its queue is done
+        self.on_renderer_missing: Optional[Callable[[str], None]] = None  # Called once per missing renderer
+        self._reported_missing: Set[str] = set()
+        self._deferred: "Queue[Tuple[str, str, Callable[[], Optional[str]]]]" = Queue()
+        self._deferred_keys: Set[str] = set()  # Queued or being rendered by the block worker
+        self._worker: Optional[Thread] = None
+
+    @property
+    def cache_dir(self) -> Optional[Path]:
+        if not self._is_cache_dir_ready:
+            self._is_cache_dir_ready = True
+            try:
+                if self._cache_dir is None:
+                    self._cache_dir = app_cache_dir("blocks")
+                else:
+                    self._cache_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(f"Block cache directory unavailable: {e}")
+                self._cache_dir = None
+        return self._cache_dir
+
+    def _load_mathtext(self) -> bool:
+        # matplotlib is optional and slow to import, so it is loaded on the first formula only.
+        if not self._is_mathtext_checked:
+            self._is_mathtext_checked = True
+            try:
+                from matplotlib.font_manager import FontProperties
+                from matplotlib.mathtext import math_to_image
+                self._math_to_image = math_to_image
+                self._font_properties = FontProperties(size=self.MATH_FONT_SIZE)
+            except ImportError:
+                self._report_missing("matplotlib")
+        return self._math_to_image is not None
+
+    def _executable(self, command: str) -> Optional[str]:
+        if command not in self._executables:
+            self._executables[command] = shutil.which(command, path=TOOL_SEARCH_PATH) or shutil.which(command)
+        return self._executables[command]
+
+    def _report_missing(self, renderer: str) -> None:
+        with self._lock:
+            if renderer in self._reported_missing:
+                return
+            self._reported_missing.add(renderer)
+        if self.on_renderer_missing:
+            self.on_renderer_missing(RENDERER_NAMES.get(renderer, renderer))
+        else:
+            print(f"{RENDERER_NAMES.get(renderer, renderer)} is not installed; its blocks are shown as code")
+
+    def is_available(self, language: str) -> bool:
+        """指定したブロックを描画できるレンダラーがあるかどうか"""
+        if language in MATH_FENCE_LANGUAGES:
+            return self._load_mathtext()
+        command = DIAGRAM_COMMANDS.get(language)
+        return bool(command and self._executable(command))
+
+    def render_math(self, tex: str) -> Optional[str]:
+        """TeX の数式をSVGに変換する（描画できなければ None、UIスレッドで描画待ちなら BLOCK_PENDING）"""
+        if self._is_mathtext_checked and self._math_to_image is None:
+            return None
+        # matplotlib takes about a second to import, so even loading it is left to the block worker on the UI thread.
+        return self._cached("math", tex, lambda: self._render_math(tex) if self._load_mathtext() else None)
+
+    def render_diagram(self, language: str, source: str) -> Optional[str]:
+        """ダイアグラムのソースをSVGに変換する（描画できなければ None、UIスレッドで描画待ちなら BLOCK_PENDING）"""
+        command = DIAGRAM_COMMANDS.get(language)
+        executable = self._executable(command) if command else None
+        if executable is None:
+            if command:
+                self._report_missing(command)
+            return None
+        return self._cached(command, source, lambda: self._render_diagram(command, executable, source))
+
+    def _cached(self, kind: str, source: str, render: Callable[[], Optional[str]]) -> Optional[str]:
+        key = hashlib.sha1(f"{kind}\0{source}".encode('utf-8')).hexdigest()
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        svg = self._read_disk(key)
+        if svg is not None:
+            self._remember(key, svg)
+            return svg
+        if self.ui_thread is not None and current_thread() is self.ui_thread:
+            self._defer(key, kind, render)
+            return BLOCK_PENDING
+        return self._render(key, kind, render)
+
+    def _render(self, key: str, kind: str, render: Callable[[], Optional[str]]) -> Optional[str]:
+        svg = None
+        try:
+            svg = render()
+        except Exception as e:
+            print(f"Error rendering {kind} block: {e}")
+        if svg is not None:
+            self._write_disk(key, svg)
+        # Failures are remembered in memory only, so a broken block is not re-run on every keystroke.
+        self._remember(key, svg)
+        return svg
+
+    def _remember(self, key: str, svg: Optional[str]) -> None:
+        with self._lock:
+            self._memory[key] = svg
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _defer(self, key: str, kind: str, render: Callable[[], Optional[str]]) -> None:
+        with self._lock:
+            if key in self._deferred_keys:
+                return
+            self._deferred_keys.add(key)
+            self._deferred.put((key, kind, render))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run_deferred, name="block-render-worker", daemon=True)
+                self._worker.start()
+
+    def _run_deferred(self) -> None:
+        while True:
+            key, kind, render = self._deferred.get()
+            self._render(key, kind, render)
+            with self._lock:
+                self._deferred_keys.discard(key)
+                is_idle = not self._deferred_keys
+            if is_idle and self.on_rendered:
+                self.on_rendered()  # Once per batch, so the preview is refreshed once rather than per block
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        try:
+            return (self.cache_dir / f"{key}.svg").read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, svg: str) -> None:
+        if self.cache_dir is None:
+            return
+        path = self.cache_dir / f"{key}.svg"
+        temp_path = path.with_name(f".{key}.{os.getpid()}.tmp")  # Worker processes may write the same key
+        try:
+            temp_path.write_text(svg, encoding='utf-8')
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing block cache {path}: {e}")
+
+    def _render_math(self, tex: str) -> Optional[str]:
+        output = io.BytesIO()
+        with self._math_lock:
+            self._math_to_image(f"${tex}$", output, prop=self._font_properties, format="svg")
+        svg = self._strip_prolog(output.getvalue().decode('utf-8'))
+        # Glyphs take the surrounding text colour, so formulas stay readable on dark themes.
+        return _BLACK_FILL_PATTERN.sub("currentColor", svg) if svg else None
+
+    def _render_diagram(self, command: str, executable: str, source: str) -> Optional[str]:
+        if command == "mmdc":
+            # mermaid-cli only works on files; a unique id keeps several diagrams' styles apart in one page.
+            svg_id = "mermaid-" + hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+            with tempfile.TemporaryDirectory() as temp_dir:
+                input_path, output_path = Path(temp_dir) / "diagram.mmd", Path(temp_dir) / "diagram.svg"
+                input_path.write_text(source, encoding='utf-8')
+                self._run([executable, "-q", "-i", str(input_path), "-o", str(output_path), "-I", svg_id], None)
+                return self._strip_prolog(output_path.read_text(encoding='utf-8'))
+        arguments: List[str] = [executable, "-Tsvg"] if command == "dot" else [executable, "-tsvg", "-pipe"]
+        return self._strip_prolog(self._run(arguments, source))
+
+    def _run(self, arguments: List[str], stdin_text: Optional[str]) -> str:
+        result = subprocess.run(arguments, input=stdin_text, capture_output=True, text=True, encoding='utf-8',
+                                timeout=self.COMMAND_TIMEOUT)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"{arguments[0]} exited with {result.returncode}")
+        return result.stdout
+
+    def _strip_prolog(self, svg: str) -> Optional[str]:
+        # Drops the XML declaration and DOCTYPE so the SVG can be inlined into HTML.
+        match = _SVG_START_PATTERN.search(svg)
+        return svg[match.start():].strip() if match else None
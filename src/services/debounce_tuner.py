@@ -0,0 +1,58 @@
+from collections import deque
+from typing import Deque, Optional
+import time
+
+
+class AdaptiveDebounceTuner:
+    """直近のレンダリング時間とタイピング間隔からデバウンス時間を推定する"""
+
+    # Gaps longer than this are pauses between bursts, not typing cadence.
+    MAX_TYPING_GAP = 2.0
+
+    def __init__(self, min_delay: float = 0.2, max_delay: float = 5.0, history_size: int = 20):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.render_durations: Deque[float] = deque(maxlen=history_size)
+        self.typing_gaps: Deque[float] = deque(maxlen=history_size * 3)
+        self._last_keystroke: Optional[float] = None
+
+    def record_keystroke(self, timestamp: Optional[float] = None) -> None:
+        now = time.monotonic() if timestamp is None else timestamp
+        if self._last_keystroke is not None:
+            gap = now - self._last_keystroke
+            if 0 < gap <= self.MAX_TYPING_GAP:
+                self.typing_gaps.append(gap)
+        self._last_keystroke = now
+
+    def record_render(self, duration: float) -> None:
+        if duration >= 0:
+            self.render_durations.append(duration)
+
+    def reset(self) -> None:
+        self.render_durations.clear()
+        self.typing_gaps.clear()
+        self._last_keystroke = None
+
+    def _typing_gap_estimate(self) -> float:
+        # 75th percentile: waiting slightly longer than a typical pause keeps
+        # refreshes from firing in the middle of a burst.
+        if not self.typing_gaps:
+            return 0.0
+        gaps = sorted(self.typing_gaps)
+        return gaps[min(len(gaps) - 1, int(len(gaps) * 0.75))]
+
+    def _render_cost_estimate(self) -> float:
+        # Exponentially weighted so the estimate follows the deck as it grows.
+        estimate = 0.0
+        for i, duration in enumerate(self.render_durations):
+            estimate = duration if i == 0 else 0.7 * estimate + 0.3 * duration
+        return estimate
+
+    def compute_delay(self, fallback: float) -> float:
+        """推奨デバウンス時間（秒）を返す。計測値が無い場合は fallback を使う"""
+        if not self.render_durations and not self.typing_gaps:
+            return fallback
+        # Refresh once typing pauses, but never more often than a render can
+        # finish, so an expensive deck is not re-rendered on every short pause.
+        delay = max(self._typing_gap_estimate() * 1.5, self._render_cost_estimate())
+        return round(min(self.max_delay, max(self.min_delay, delay)), 2)
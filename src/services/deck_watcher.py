@@ -0,0 +1,303 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import shutil
+import time
+
+from playwright.sync_api import Error as PlaywrightError, sync_playwright
+
+from src.models.app_state import SlideData
+from src.services.file_manager import FileManager, app_cache_dir
+from src.services.marp_engine import THEMES_DIR, MarpEngine
+from src.services.project_index import MARKDOWN_SUFFIXES, SKIPPED_DIRECTORIES
+
+WATCH_FORMATS = ("html", "png", "pdf")
+
+FileSignature = Optional[Tuple[int, int]]  # (mtime_ns, size); None while the file does not exist
+
+
+def _signature(path: Path) -> FileSignature:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class WatchedDeck:
+    path: Path
+    output_dir: Path
+    signature: FileSignature = None
+    asset_signatures: Dict[Path, FileSignature] = field(default_factory=dict)
+    slide_keys: List[str] = field(default_factory=list)  # Render key of each written slide image, by position
+    document_key: str = ""  # Covers every slide, the theme and the title; HTML and PDF are rewritten when it changes
+    is_built: bool = False
+    failed_signature: FileSignature = None  # Signature of the version that failed to build; skipped until it changes
+
+
+@dataclass
+class DeckBuildReport:
+    path: Path
+    slide_count: int
+    rendered_slides: List[int]  # 1-based indices of the slides that were rendered again
+    written: List[Path]
+    elapsed: float
+    errors: List[str] = field(default_factory=list)  # Outputs that could not be written, or why the build failed
+
+
+class DeckWatcher:
+    """Markdown・テーマ・画像を監視し、変更のあったデッキの HTML・PNG・PDF を書き直す
+
+    変更は (更新時刻, サイズ) のポーリングで検出する。スライドごとの描画キー
+    (本文・ディレクティブ・参照画像・テーマ CSS) を前回の書き出しと比べ、
+    キーの変わったスライドだけを Chromium で描き直す。描画済みの PNG はキー別に
+    キャッシュするため、スライドの挿入で番号がずれても描画はやり直さない。
+    HTML はエンジンの section キャッシュから組み立て直し、PDF は1回の印刷で作り直す。
+    出力はすべて一時ファイルからの置き換えで書くので、読み手が途中の状態を見ることはない。
+    ビルドに失敗したデッキはその版のまま再試行せず、ファイルが変わるまで飛ばす。失敗は
+    DeckBuildReport.errors で返し、ブラウザはブラウザ自体のエラーの時だけ起動し直す。
+    """
+
+    def __init__(self, marp_engine: MarpEngine, file_manager: FileManager, sources: Sequence[Path], output_dir: Path,
+                 formats: Sequence[str] = WATCH_FORMATS, theme_name: Optional[str] = None,
+                 aspect_ratio: str = "16:9"):
+        unknown = set(formats) - set(WATCH_FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown output format: {', '.join(sorted(unknown))}")
+        self.marp_engine = marp_engine
+        self.file_manager = file_manager
+        self.sources = [Path(source).resolve() for source in sources]
+        self.output_dir = Path(output_dir).resolve()
+        self.formats = set(formats)
+        self.theme_name = theme_name
+        self.aspect_ratio = aspect_ratio
+        self.decks: Dict[Path, WatchedDeck] = {}
+        self._theme_signatures: Dict[Path, FileSignature] = self._scan_themes()
+        self._theme_digests: Dict[str, str] = {}
+        self._playwright = None
+        self._browser = None
+
+    def close(self) -> None:
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def poll(self) -> List[DeckBuildReport]:
+        """変更を1回確認し、影響を受けたデッキを書き直す"""
+        themes_changed = self._check_themes()
+        found = self._discover()
+        for path in set(self.decks) - set(found):
+            del self.decks[path]  # Deleted or moved away; its outputs are left in place
+        reports = []
+        for path, output_dir in found.items():
+            deck = self.decks.get(path)
+            if deck is None:
+                deck = self.decks[path] = WatchedDeck(path, output_dir)
+            if not themes_changed and deck.failed_signature is not None and _signature(path) == deck.failed_signature:
+                continue  # Retrying the same content would only fail again
+            if deck.is_built and not themes_changed and not self._has_changed(deck):
+                continue
+            started = time.perf_counter()
+            signature = _signature(path)
+            try:
+                reports.append(self.build(deck))
+            except Exception as e:
+                if isinstance(e, PlaywrightError):
+                    self._reset_browser()  # The browser may have crashed; the next build launches a new one
+                deck.failed_signature = signature
+                reports.append(DeckBuildReport(path, 0, [], [], time.perf_counter() - started, errors=[str(e)]))
+        return reports
+
+    def _discover(self) -> Dict[Path, Path]:
+        # Markdown file -> output folder. Folders are searched recursively, like the project browser.
+        found: Dict[Path, Path] = {}
+        for source in self.sources:
+            if source.is_file():
+                found[source] = self.output_dir / source.stem
+                continue
+            directories = [source]
+            while directories:
+                directory = directories.pop()
+                try:
+                    items = list(os.scandir(directory))
+                except OSError:
+                    continue
+                for item in items:
+                    if item.name.startswith('.') or item.name in SKIPPED_DIRECTORIES:
+                        continue
+                    path = Path(item.path)
+                    if item.is_dir(follow_symlinks=False):
+                        if path != self.output_dir:
+                            directories.append(path)
+                    elif item.name.lower().endswith(MARKDOWN_SUFFIXES):
+                        found[path] = self.output_dir / path.relative_to(source).with_suffix("")
+        return self._disambiguate(found)
+
+    def _disambiguate(self, found: Dict[Path, Path]) -> Dict[Path, Path]:
+        # Decks that would share an output folder (same stem in different places, or a.md next to a.markdown)
+        # get a suffix derived from their own path, so each keeps the same folder from one poll to the next.
+        claims: Dict[Path, int] = {}
+        for output_dir in found.values():
+            claims[output_dir] = claims.get(output_dir, 0) + 1
+        return {path: output_dir if claims[output_dir] == 1
+                else output_dir.with_name(f"{output_dir.name}-{hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:8]}")
+                for path, output_dir in found.items()}
+
+    def _scan_themes(self) -> Dict[Path, FileSignature]:
+        signatures: Dict[Path, FileSignature] = {}
+        if THEMES_DIR.is_dir():
+            for theme_path in THEMES_DIR.iterdir():
+                for name in ("theme.css", "theme.json"):
+                    signatures[theme_path / name] = _signature(theme_path / name)
+        return signatures
+
+    def _check_themes(self) -> bool:
+        signatures = self._scan_themes()
+        if signatures == self._theme_signatures:
+            return False
+        self._theme_signatures = signatures
+        self._theme_digests.clear()
+        self.marp_engine.reload_themes()
+        return True
+
+    def _theme_digest(self, theme_name: str) -> str:
+        # Slide render keys name the theme but not its CSS; the digest makes a stylesheet edit change them.
+        digest = self._theme_digests.get(theme_name)
+        if digest is None:
+            theme = self.marp_engine.themes.get(theme_name)
+            digest = hashlib.sha1((theme.css_content if theme else "").encode('utf-8')).hexdigest()
+            self._theme_digests[theme_name] = digest
+        return digest
+
+    def _has_changed(self, deck: WatchedDeck) -> bool:
+        if _signature(deck.path) != deck.signature:
+            return True
+        return any(_signature(path) != signature for path, signature in deck.asset_signatures.items())
+
+    def _resolve_theme(self, document_theme: Optional[str]) -> str:
+        for theme_name in (document_theme, self.theme_name, "default"):
+            if theme_name and theme_name in self.marp_engine.themes:
+                return theme_name
+        available = self.marp_engine.get_available_themes()
+        return available[0] if available else "default"
+
+    def build(self, deck: WatchedDeck) -> DeckBuildReport:
+        """デッキを読み直し、描画キーの変わったスライドと出力だけを書き直す"""
+        started = time.perf_counter()
+        signature = _signature(deck.path)
+        text = self.file_manager.read_text(deck.path)
+        resolver = self.marp_engine.asset_resolver
+        resolver.set_document_path(deck.path)
+        parsed = self.marp_engine.parse_document(text)
+        slides = parsed.slides
+        theme_name = self._resolve_theme(parsed.metadata.theme)
+        size = parsed.metadata.size
+        aspect_ratio = size if size in ("16:9", "4:3") else self.aspect_ratio
+        title = parsed.metadata.title or deck.path.stem
+
+        theme_digest = self._theme_digest(theme_name)
+        keys = [f"{self.marp_engine.slide_render_key(slide, theme_name, aspect_ratio)}-{theme_digest[:12]}"
+                for slide in slides]
+        document_key = hashlib.sha1("\0".join(keys + [title]).encode('utf-8')).hexdigest()
+
+        deck.output_dir.mkdir(parents=True, exist_ok=True)
+        written: List[Path] = []
+        errors: List[str] = []
+        rendered: List[int] = []
+        if "png" in self.formats:
+            rendered = self._write_slide_images(deck, slides, keys, theme_name, aspect_ratio, written, errors)
+        if document_key != deck.document_key or not deck.is_built:
+            if "html" in self.formats:
+                html_path = deck.output_dir / f"{deck.path.stem}.html"
+                chunks = self.marp_engine.iter_html_export(slides, theme_name, aspect_ratio, title)
+                if self.file_manager.write_stream(html_path, chunks):
+                    written.append(html_path)
+                else:
+                    errors.append(f"Could not write {html_path}")
+            if "pdf" in self.formats:
+                # Chromium prints the whole document; a PDF cannot be patched page by page without a PDF library.
+                pdf_path = deck.output_dir / f"{deck.path.stem}.pdf"
+                pdf_data = self.marp_engine.render_pdf(self._ensure_browser(), slides, theme_name, aspect_ratio, title)
+                if self.file_manager.write_bytes(pdf_path, pdf_data):
+                    written.append(pdf_path)
+                else:
+                    errors.append(f"Could not write {pdf_path}")
+
+        deck.signature = signature
+        deck.asset_signatures = {path: _signature(path) for slide in slides
+                                 for path in resolver.referenced_paths(slide.content,
+                                                                       slide.directives.get("backgroundImage", ""))}
+        deck.slide_keys = keys
+        deck.document_key = document_key
+        deck.is_built = True
+        deck.failed_signature = None
+        return DeckBuildReport(deck.path, len(slides), rendered, written, time.perf_counter() - started, errors)
+
+    def _write_slide_images(self, deck: WatchedDeck, slides: List[SlideData], keys: List[str], theme_name: str,
+                            aspect_ratio: str, written: List[Path], errors: List[str]) -> List[int]:
+        cache_dir = app_cache_dir("watch") / hashlib.sha1(str(deck.path).encode('utf-8')).hexdigest()
+        cache_dir.mkdir(exist_ok=True)
+        changed = [position for position, key in enumerate(keys)
+                   if position >= len(deck.slide_keys) or deck.slide_keys[position] != key
+                   or not self._slide_image_path(deck, position).exists()]
+        missing = [position for position in changed if not (cache_dir / f"{keys[position]}.png").exists()]
+        if missing:
+            documents = self.marp_engine.render_slide_documents([slides[p] for p in missing], theme_name, aspect_ratio)
+            browser = self._ensure_browser()
+            for position, slide_html in zip(missing, documents):
+                png_data = self.marp_engine.screenshot_slide(browser, slides[position], theme_name, aspect_ratio,
+                                                             slide_html=slide_html)
+                self.file_manager.write_bytes(cache_dir / f"{keys[position]}.png", png_data)
+
+        for position in changed:
+            # Slides that only moved are copied from the cache instead of being rendered again.
+            image_path = self._slide_image_path(deck, position)
+            temp_path = image_path.with_name(f".{image_path.name}.tmp")
+            try:
+                shutil.copyfile(cache_dir / f"{keys[position]}.png", temp_path)
+                os.replace(temp_path, image_path)
+                written.append(image_path)
+            except OSError as e:
+                errors.append(f"Could not write {image_path}: {e}")
+        for position in range(len(slides), len(deck.slide_keys)):
+            try:
+                self._slide_image_path(deck, position).unlink()
+            except OSError:
+                pass
+
+        current = {f"{key}.png" for key in keys}
+        for cached in cache_dir.iterdir():
+            if cached.name not in current:
+                try:
+                    cached.unlink()
+                except OSError:
+                    pass
+        return [position + 1 for position in missing]
+
+    def _slide_image_path(self, deck: WatchedDeck, position: int) -> Path:
+        return deck.output_dir / f"slide_{position + 1:03d}.png"
+
+    def _ensure_browser(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        if self._browser is None:
+            self._browser = self._playwright.chromium.launch()
+        return self._browser
+
+    def _reset_browser(self) -> None:
+        # A crashed browser is replaced on the next build.
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
@@ -0,0 +1,233 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import difflib
+import re
+
+from src.models.app_state import DocumentMetadata, SlideData
+
+# https://marpit.marp.app/directives
+GLOBAL_DIRECTIVES = {"theme", "style", "headingDivider", "lang", "size", "title", "author",
+                     "description", "image", "keywords", "url", "marp", "math"}
+LOCAL_DIRECTIVES = {"paginate", "header", "footer", "class", "backgroundColor", "backgroundImage",
+                    "backgroundPosition", "backgroundRepeat", "backgroundSize", "color"}
+# Global directives that change how every slide is drawn; they are folded into each
+# slide's effective directives so the render cache key reflects them.
+RENDER_GLOBAL_DIRECTIVES = {"style"}
+# Directives whose value must be one of a fixed set
+DIRECTIVE_CHOICES = {"paginate": ("true", "false"), "marp": ("true", "false"), "math": ("mathjax", "katex"),
+                     "size": ("16:9", "4:3"), "headingDivider": ("1", "2", "3", "4", "5", "6")}
+
+_COMMENT_PATTERN = re.compile(r'<!--(.*?)-->', re.DOTALL)
+_DIRECTIVE_LINE_PATTERN = re.compile(r'^\s*(_?[A-Za-z][A-Za-z0-9]*)\s*:\s*(.*?)\s*$')
+PARSED_CACHE_SIZE = 4096  # Parsed slides kept by content digest, so the slide text itself is not held
+
+
+@dataclass(frozen=True)
+class SlideDirectives:
+    """1枚のスライドのHTMLコメントから取り出したディレクティブとノート"""
+    global_directives: Tuple[Tuple[str, str], ...] = ()
+    local_directives: Tuple[Tuple[str, str], ...] = ()
+    spot_directives: Tuple[Tuple[str, str], ...] = ()
+    notes: Optional[str] = None
+
+    @property
+    def directive_items(self) -> Tuple[Tuple[Tuple[str, str], ...], ...]:
+        """ノートを除いたディレクティブ部分（ノートだけの変更では解決し直さないため）"""
+        return self.global_directives, self.local_directives, self.spot_directives
+
+
+@dataclass
+class ResolvedDirectives:
+    metadata: DocumentMetadata
+    slide_directives: List[Dict[str, str]] = field(default_factory=list)
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+        return value[1:-1]
+    return value
+
+
+def _parse_directive_block(text: str) -> Optional[List[Tuple[str, str]]]:
+    """'key: value' 行だけで構成されたブロックならディレクティブのリストを返す（そうでなければ None）"""
+    directives = []
+    for line in text.strip().splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        match = _DIRECTIVE_LINE_PATTERN.match(line)
+        if not match:
+            return None
+        key = match.group(1)
+        if key.lstrip('_') not in GLOBAL_DIRECTIVES | LOCAL_DIRECTIVES:
+            return None
+        directives.append((key, _unquote(match.group(2))))
+    return directives
+
+
+def parse_front_matter(front_matter: str) -> List[Tuple[str, str]]:
+    """フロントマター（YAMLの単純な key: value 形式）を解析する。未知のキーもそのまま返す"""
+    directives = []
+    for line in front_matter.splitlines():
+        match = _DIRECTIVE_LINE_PATTERN.match(line)
+        if match:
+            directives.append((match.group(1), _unquote(match.group(2))))
+    return directives
+
+
+def parse_slide_directives(slide_content: str) -> SlideDirectives:
+    """スライド本文のHTMLコメントをディレクティブとスピーカーノートに振り分ける"""
+    if '<!--' not in slide_content:
+        return SlideDirectives()
+    global_directives, local_directives, spot_directives, notes = [], [], [], []
+    for match in _COMMENT_PATTERN.finditer(slide_content):
+        body = match.group(1)
+        directives = _parse_directive_block(body)
+        if directives is None:
+            if body.strip():
+                notes.append(body.strip())
+            continue
+        for key, value in directives:
+            if key.startswith('_'):
+                spot_directives.append((key[1:], value))
+            elif key in GLOBAL_DIRECTIVES:
+                global_directives.append((key, value))
+            else:
+                local_directives.append((key, value))
+    return SlideDirectives(tuple(global_directives), tuple(local_directives), tuple(spot_directives),
+                           "\n\n".join(notes) if notes else None)
+
+
+_parsed_by_digest: "OrderedDict[str, SlideDirectives]" = OrderedDict()
+_parsed_lock = Lock()  # Notes are also read by the render workers
+
+
+def slide_directives_of(slide: SlideData) -> SlideDirectives:
+    """スライドのディレクティブとノートを返す（本文のハッシュをキーに解析結果をキャッシュする）"""
+    digest = slide.content_digest
+    with _parsed_lock:
+        parsed = _parsed_by_digest.get(digest)
+        if parsed is not None:
+            _parsed_by_digest.move_to_end(digest)
+            return parsed
+    parsed = parse_slide_directives(slide.content)
+    with _parsed_lock:
+        _parsed_by_digest[digest] = parsed
+        while len(_parsed_by_digest) > PARSED_CACHE_SIZE:
+            _parsed_by_digest.popitem(last=False)
+    return parsed
+
+
+class DirectiveResolver:
+    """スライドを先頭から順に受け取ってディレクティブを解決する
+
+    resolve_directives() は文書全体を1回で解決する。読み込み中の文書のように末尾へスライドが
+    追加されていく場合は extend() で追加分だけを解決できる。その場合、後のスライドで見つかった
+    グローバルディレクティブは解決済みのスライドには反映されないため、読み込み後に文書全体を解決し直す。
+    """
+
+    def __init__(self, front_matter: str):
+        self.global_values: Dict[str, str] = {}
+        self.slide_count = 0  # Slides resolved so far
+        self._inherited: Dict[str, str] = {}
+        self._previous: Optional[Dict[str, str]] = None
+        for key, value in parse_front_matter(front_matter):
+            if key in LOCAL_DIRECTIVES:
+                self._inherited[key] = value
+            else:
+                self.global_values[key] = value
+
+    def _effective(self, slide_directives: SlideDirectives, inherited: Dict[str, str]) -> Dict[str, str]:
+        effective = {key: value for key, value in self.global_values.items() if key in RENDER_GLOBAL_DIRECTIVES}
+        effective.update(inherited)
+        effective.update(slide_directives.spot_directives)
+        if effective == self._previous:
+            return self._previous  # Runs of slides with the same directives share one dict
+        return effective
+
+    def _resolve(self, parsed: List[SlideDirectives]) -> List[Dict[str, str]]:
+        resolved = []
+        for slide_directives in parsed:
+            self._inherited.update(slide_directives.local_directives)
+            self._previous = self._effective(slide_directives, self._inherited)
+            resolved.append(self._previous)
+        self.slide_count += len(parsed)
+        return resolved
+
+    def extend(self, slides: Iterable[SlideData]) -> List[Dict[str, str]]:
+        """続きのスライドのディレクティブを解決して、それらの有効値を返す"""
+        parsed = [slide_directives_of(slide) for slide in slides]
+        for slide_directives in parsed:
+            self.global_values.update(slide_directives.global_directives)
+        return self._resolve(parsed)
+
+    def peek(self, slide: SlideData) -> Dict[str, str]:
+        """次のスライドの有効値を、解決済みとして記録せずに求める（まだ書きかけのスライド用）"""
+        slide_directives = slide_directives_of(slide)
+        return self._effective(slide_directives, {**self._inherited, **dict(slide_directives.local_directives)})
+
+    @property
+    def metadata(self) -> DocumentMetadata:
+        global_values = self.global_values
+        return DocumentMetadata(
+            title=global_values.get("title"),
+            author=global_values.get("author"),
+            description=global_values.get("description"),
+            theme=global_values.get("theme"),
+            size=global_values.get("size"),
+            custom_directives={key: value for key, value in global_values.items()
+                               if key not in ("title", "author", "description", "theme", "size")}
+        )
+
+
+def resolve_directives(front_matter: str, slides: List[SlideData]) -> ResolvedDirectives:
+    """フロントマターと各スライドのディレクティブから、文書メタデータとスライドごとの有効値を求める
+
+    グローバルディレクティブは文書全体に、ローカルディレクティブはそのスライドと以降のスライドに、
+    '_' 付きのスポットディレクティブはそのスライドだけに適用される。
+    """
+    resolver = DirectiveResolver(front_matter)
+    parsed = [slide_directives_of(slide) for slide in slides]
+    for slide_directives in parsed:
+        resolver.global_values.update(slide_directives.global_directives)  # Global values apply to every slide
+    slide_directives = resolver._resolve(parsed)
+    return ResolvedDirectives(resolver.metadata, slide_directives)
+
+
+def iter_directive_lines(text: str, first_line: int = 0) -> Iterator[Tuple[int, str, str]]:
+    """'key: value' 形式の行を (行番号, キー, 値) で返す（行番号は first_line から数える）"""
+    for number, line in enumerate(text.split('\n'), first_line):
+        match = _DIRECTIVE_LINE_PATTERN.match(line)
+        if match:
+            yield number, match.group(1), _unquote(match.group(2))
+
+
+def iter_comment_directive_lines(slide_content: str) -> Iterator[Tuple[int, str, str]]:
+    """HTMLコメント内の 'key: value' 行を (スライド内の行番号, キー, 値) で返す（ノート扱いになる行も含む）"""
+    if '<!--' not in slide_content:
+        return
+    for match in _COMMENT_PATTERN.finditer(slide_content):
+        yield from iter_directive_lines(match.group(1), slide_content.count('\n', 0, match.start(1)))
+
+
+def check_directive(key: str, value: str, available_themes: Iterable[str]) -> Optional[Tuple[str, str]]:
+    """ディレクティブの問題を (重大度, メッセージ) で返す（問題が無ければ None）
+
+    未知のキーは既知のディレクティブの綴り間違いと思われる場合だけ報告する
+    （'Note: ...' のようなスピーカーノートの行を誤検出しないため）。
+    """
+    name = key[1:] if key.startswith('_') else key
+    known = GLOBAL_DIRECTIVES | LOCAL_DIRECTIVES
+    if name not in known:
+        suggestions = difflib.get_close_matches(name, sorted(known), n=1, cutoff=0.8)
+        if suggestions:
+            return "warning", f"Unknown directive '{name}' (did you mean '{suggestions[0]}'?)"
+        return None
+    if key.startswith('_') and name in GLOBAL_DIRECTIVES:
+        return "warning", f"'{name}' is a global directive and cannot be used as a spot directive"
+    if name in DIRECTIVE_CHOICES and value not in DIRECTIVE_CHOICES[name]:
+        return "error", f"Invalid value '{value}' for '{name}' (expected {', '.join(DIRECTIVE_CHOICES[name])})"
+    if name == "theme" and value not in available_themes:
+        return "error", f"Theme '{value}' is not available"
+    return None
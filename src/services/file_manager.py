@@ -1,7 +1,20 @@
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional
+import codecs
+import json
+import os
 import chardet
 
+APP_DATA_DIR = Path.home() / '.marp-editor'
+
+
+def app_cache_dir(name: str) -> Path:
+    """アプリのキャッシュ用ディレクトリ（無ければ作る）"""
+    path = APP_DATA_DIR / 'cache' / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 class FileManager:
     def read_file(self, file_path: Path) -> Optional[str]:
         try:
@@ -17,6 +30,36 @@ class FileManager:
             print(f"Error reading file {file_path}: {e}")
             return None
 
+    def detect_encoding(self, file_path: Path, sample_size: int = 64 * 1024) -> str:
+        """ファイル先頭のサンプルから文字コードを推定する"""
+        with open(file_path, 'rb') as f:
+            sample = f.read(sample_size)
+        encoding = chardet.detect(sample)['encoding'] or 'utf-8'
+        # A pure-ASCII sample says nothing about the rest of the file; UTF-8 is a superset.
+        return 'utf-8' if encoding.lower() == 'ascii' else encoding
+
+    def read_text(self, file_path: Path) -> str:
+        """UTF-8 で読めればそのまま、読めなければ文字コードを推定して読む（一括索引向け。例外はそのまま送出）"""
+        raw_data = file_path.read_bytes()
+        try:
+            return raw_data.decode('utf-8-sig')  # Also drops a BOM
+        except UnicodeDecodeError:
+            # chardet is by far the slowest step of indexing, so it only runs for non-UTF-8 files.
+            encoding = chardet.detect(raw_data[:64 * 1024])['encoding'] or 'utf-8'
+            return raw_data.decode(encoding, errors='replace')
+
+    def iter_text_chunks(self, file_path: Path, encoding: str, chunk_size: int = 1024 * 1024) -> Iterator[str]:
+        """ファイルを chunk_size バイトずつ読み、インクリメンタルデコーダで文字列の断片として返す"""
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        with open(file_path, 'rb') as f:
+            while True:
+                raw_data = f.read(chunk_size)
+                text = decoder.decode(raw_data, final=not raw_data)
+                if text:
+                    yield text
+                if not raw_data:
+                    break
+
     def write_file(self, file_path: Path, content: str, encoding: str = 'utf-8') -> bool:
         try:
             with open(file_path, 'w', encoding=encoding) as f:
@@ -24,4 +67,52 @@ class FileManager:
             return True
         except Exception as e:
             print(f"Error writing file {file_path}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def write_stream(self, file_path: Path, chunks: Iterable[str], encoding: str = 'utf-8') -> bool:
+        """文字列の断片を順に書き出す。一時ファイルに書いてから置き換えるため、失敗しても既存のファイルは壊れない"""
+        temp_path = file_path.with_name(f".{file_path.name}.tmp")
+        try:
+            with open(temp_path, 'w', encoding=encoding) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(temp_path, file_path)
+            return True
+        except Exception as e:
+            print(f"Error writing file {file_path}: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+    def write_bytes(self, file_path: Path, data: bytes) -> bool:
+        """バイト列を書き出す（write_stream と同じく一時ファイルからの置き換えで書き込む）"""
+        temp_path = file_path.with_name(f".{file_path.name}.tmp")
+        try:
+            temp_path.write_bytes(data)
+            os.replace(temp_path, file_path)
+            return True
+        except Exception as e:
+            print(f"Error writing file {file_path}: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+    def read_json(self, file_path: Path) -> Optional[Any]:
+        """JSONファイルを読む（無いか壊れていれば None）"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading {file_path}: {e}")
+            return None
+
+    def write_json(self, file_path: Path, data: Any) -> bool:
+        """JSONファイルを書く（write_stream と同じく置き換えで書き込む）"""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        return self.write_stream(file_path, [json.dumps(data, ensure_ascii=False)])
@@ -1,8 +1,14 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from collections import OrderedDict
+from itertools import islice
+from threading import Lock, local
 from dataclasses import dataclass, field
 from pathlib import Path
 import json
 import io
+import hashlib
+import html
+import re
 from PIL import Image
 from playwright.sync_api import sync_playwright
 
@@ -11,12 +17,19 @@ from pygments import highlight
 from pygments.lexers import get_lexer_by_name
 from pygments.formatters import HtmlFormatter
 
-from src.models.app_state import SlideData # Import SlideData
+from src.models.app_state import SlideData, DocumentMetadata # Import SlideData
+from src.models.document_buffer import SLIDE_DELIMITER, FRONT_MATTER_OPENER
+from src.services.directives import (resolve_directives, iter_directive_lines,
+                                     iter_comment_directive_lines, check_directive)
+from src.services.asset_resolver import AssetResolver
+from src.services.parallel_renderer import ParallelSlideRenderer
+from src.services.block_renderer import BLOCK_PENDING, BlockRenderer, DIAGRAM_COMMANDS, MATH_FENCE_LANGUAGES
 
 @dataclass
 class ParsedDocument:
-    # Placeholder for parsed document structure
-    pass
+    metadata: DocumentMetadata
+    slides: List[SlideData]
+    front_matter: str = ""
 
 @dataclass
 class RenderedPresentation:
@@ -25,8 +38,27 @@ class RenderedPresentation:
 
 @dataclass
 class ValidationError:
-    # Placeholder for validation error structure
-    pass
+    slide_index: int  # 1-based; 0 for the front matter
+    line: int  # 0-based line within the slide content (or the front matter)
+    message: str
+    severity: str = "error"  # "error" or "warning"
+    code: str = ""  # e.g. "unclosed-fence", "directive", "missing-image", "overflow"
+
+@dataclass
+class SlideCapture:
+    png_data: bytes
+    overflow_width: int = 0  # CSS pixels of content beyond the slide box, measured in the same page load
+    overflow_height: int = 0
+
+_FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})(.*)$')
+_HEADING_WITHOUT_SPACE_PATTERN = re.compile(r'^ {0,3}#{1,6}[^#\s]')
+# Measures how far the content extends past the fixed .slide box (overflow is hidden, so nothing shows it)
+_MEASURE_OVERFLOW_SCRIPT = """() => {
+    const slide = document.querySelector('.slide');
+    return slide ? [slide.scrollWidth - slide.clientWidth, slide.scrollHeight - slide.clientHeight] : [0, 0];
+}"""
+
+THEMES_DIR = Path(__file__).parent.parent.parent / "themes"
 
 @dataclass
 class Theme:
@@ -38,18 +70,129 @@ class Theme:
     preview_image: Optional[str] = None
     description: str = ""
 
+# Styles for rendered math and diagram blocks, shared by every page the engine produces
+_BLOCK_CSS = """
+        .math svg { vertical-align: middle; }
+        .math-block, .diagram { text-align: center; margin: 0.5em 0; }
+        .diagram svg { max-width: 100%; height: auto; }
+"""
+
+
+def _math_inline_rule(state, silent: bool) -> bool:
+    # $...$ with no space just inside the dollars; "$5 and $6" is left alone (closing $ followed by a digit).
+    if state.src[state.pos] != '$':
+        return False
+    start = state.pos + 1
+    if start >= state.posMax or state.src[start] in ' \t\n$':
+        return False
+    end = start
+    while True:
+        end = state.src.find('$', end, state.posMax)
+        if end == -1:
+            return False
+        if state.src[end - 1] != '\\':
+            break
+        end += 1
+    if state.src[end - 1] in ' \t\n' or (end + 1 < state.posMax and state.src[end + 1].isdigit()):
+        return False
+    if not silent:
+        token = state.push('math_inline', 'math', 0)
+        token.content = state.src[start:end]
+        token.markup = '$'
+    state.pos = end + 1
+    return True
+
+
+def _math_block_rule(state, start_line: int, end_line: int, silent: bool) -> bool:
+    # $$ ... $$ on one line or spanning lines; an unclosed block stays a paragraph.
+    if state.sCount[start_line] - state.blkIndent >= 4:
+        return False
+    first = state.src[state.bMarks[start_line] + state.tShift[start_line]:state.eMarks[start_line]].rstrip()
+    if not first.startswith('$$'):
+        return False
+    if len(first) > 4 and first.endswith('$$'):
+        content, next_line = first[2:-2], start_line + 1
+    else:
+        lines = [first[2:]] if first[2:].strip() else []
+        next_line = start_line + 1
+        while True:
+            if next_line >= end_line:
+                return False
+            text = state.src[state.bMarks[next_line] + state.tShift[next_line]:state.eMarks[next_line]].rstrip()
+            next_line += 1
+            if text.endswith('$$'):
+                lines.append(text[:-2])
+                break
+            lines.append(text)
+        content = '\n'.join(lines)
+    if silent:
+        return True
+    state.line = next_line
+    token = state.push('math_block', 'math', 0)
+    token.block = True
+    token.content = content.strip()
+    token.markup = '$$'
+    token.map = [start_line, next_line]
+    return True
+
+
 class MarpEngine:
+    FRAGMENT_CACHE_SIZE = 4096  # Rendered section bodies kept for the deck, the preview server and exports
+
     def __init__(self):
-        self.md = MarkdownIt('commonmark', {'html': True, 'typographer': True, 'breaks': True}) # Added 'breaks': True
-        self.md.enable(['table', 'linkify', 'strikethrough'])
-        self.md.add_render_rule('fence', self._render_fence_pygments)
-        self.formatter = HtmlFormatter(cssclass="highlight")
+        # The editor, the render scheduler, the preview server and the render service all call into one engine
+        # from their own threads, so each thread gets its own parser and formatter; the caches are shared.
+        self._thread_state = local()
+        self.block_renderer = BlockRenderer()
+        self.asset_resolver = AssetResolver()
+        self.parallel_renderer: Optional[ParallelSlideRenderer] = None  # Set while parallel rendering is enabled
+        self._fragment_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._fragment_lock = Lock()
         self.themes: Dict[str, Theme] = {}
         self._load_themes()
 
+    @property
+    def md(self) -> MarkdownIt:
+        """このスレッド用の markdown-it パーサー（markdown-it の描画はスレッド間で共有しない）"""
+        md = getattr(self._thread_state, "md", None)
+        if md is None:
+            md = self._thread_state.md = self._create_parser()
+        return md
+
+    @property
+    def formatter(self) -> HtmlFormatter:
+        """このスレッド用の Pygments フォーマッタ"""
+        formatter = getattr(self._thread_state, "formatter", None)
+        if formatter is None:
+            formatter = self._thread_state.formatter = HtmlFormatter(cssclass="highlight")
+        return formatter
+
+    def _create_parser(self) -> MarkdownIt:
+        md = MarkdownIt('commonmark', {'html': True, 'typographer': True, 'breaks': True}) # Added 'breaks': True
+        md.enable(['table', 'linkify', 'strikethrough'])
+        # Assigned directly: add_render_rule() would rebind these methods to the renderer instead of the engine.
+        md.renderer.rules['fence'] = self._render_fence_pygments
+        md.renderer.rules['image'] = self._render_image
+        md.renderer.rules['html_block'] = self._render_html_with_images
+        md.renderer.rules['html_inline'] = self._render_html_with_images
+        md.inline.ruler.after('escape', 'math_inline', _math_inline_rule)
+        md.block.ruler.before('fence', 'math_block', _math_block_rule,
+                              {'alt': ['paragraph', 'reference', 'blockquote', 'list']})
+        md.renderer.rules['math_inline'] = self._render_math_inline
+        md.renderer.rules['math_block'] = self._render_math_block
+        return md
+
     def _render_fence_pygments(self, tokens, idx, options, env):
         token = tokens[idx]
         lang = token.info.strip()
+        if lang in MATH_FENCE_LANGUAGES:
+            return self._render_math_block(tokens, idx, options, env)
+        if lang in DIAGRAM_COMMANDS:
+            svg = self.block_renderer.render_diagram(lang, token.content)
+            if svg:
+                return f'<div class="diagram">{svg}</div>\n'
+            if svg == BLOCK_PENDING:
+                env["has_pending_blocks"] = True  # Shown as code until the block worker has drawn it
         try:
             lexer = get_lexer_by_name(lang, stripall=True)
         except:
@@ -57,8 +200,40 @@ class MarpEngine:
 
         return highlight(token.content, lexer, self.formatter)
 
+    def _render_math_inline(self, tokens, idx, options, env):
+        tex = tokens[idx].content
+        svg = self.block_renderer.render_math(tex)
+        if svg:
+            return f'<span class="math">{svg}</span>'
+        if svg == BLOCK_PENDING:
+            env["has_pending_blocks"] = True
+        return f'<code class="math">{self.md.utils.escapeHtml(tex)}</code>'
+
+    def _render_math_block(self, tokens, idx, options, env):
+        # Display math is typeset line by line; mathtext has no multi-line environments.
+        tex = tokens[idx].content.strip()
+        svgs = [self.block_renderer.render_math(line.strip()) for line in tex.splitlines() if line.strip()]
+        if svgs and all(svgs):
+            return '<div class="math-block">' + '<br>'.join(svgs) + '</div>\n'
+        if BLOCK_PENDING in svgs:
+            env["has_pending_blocks"] = True
+        return f'<pre class="math"><code>{self.md.utils.escapeHtml(tex)}</code></pre>\n'
+
+    def _render_image(self, tokens, idx, options, env):
+        # Local images are inlined as cached, downscaled data URIs so renders never touch the originals.
+        token = tokens[idx]
+        src = token.attrGet('src')
+        if src:
+            data_uri = self.asset_resolver.inline(src)
+            if data_uri:
+                token.attrSet('src', data_uri)
+        return self.md.renderer.image(tokens, idx, options, env)
+
+    def _render_html_with_images(self, tokens, idx, options, env):
+        return self.asset_resolver.inline_html_images(tokens[idx].content)
+
     def _load_themes(self):
-        themes_dir = Path(__file__).parent.parent.parent / "themes"
+        themes_dir = THEMES_DIR
         if not themes_dir.exists():
             print(f"Themes directory not found: {themes_dir}")
             return
@@ -90,28 +265,217 @@ class MarpEngine:
         if not self.themes:
             print("No themes loaded. Ensure 'themes' directory and its contents are correctly set up.")
 
+    def reload_themes(self) -> None:
+        """themes ディレクトリからテーマを読み直す（CSS の変更や追加・削除を反映する）"""
+        previous = self.themes
+        self.themes = {}
+        self._load_themes()
+        for name, theme in self.themes.items():
+            if name in previous:
+                theme.preview_image = previous[name].preview_image
+
     def get_available_themes(self) -> List[str]:
         return list(self.themes.keys())
 
     def parse_document(self, markdown_content: str) -> ParsedDocument:
         """Markdownドキュメントを解析し、構造化データを返す"""
-        # Placeholder implementation - will be implemented more fully later
-        return ParsedDocument()
+        front_matter = ""
+        slides: List[SlideData] = []
+        for is_front_matter, piece in self._iter_document_parts([markdown_content]):
+            if is_front_matter:
+                front_matter = piece
+            else:
+                slides.append(self.build_slide(len(slides) + 1, piece.strip()))
+        metadata = self.apply_directives(front_matter, slides)
+        return ParsedDocument(metadata=metadata, slides=slides, front_matter=front_matter)
+
+    def iter_slide_contents(self, chunks: Iterable[str]) -> Iterator[str]:
+        """テキスト断片の列から、区切りごとの生テキストを順に取り出す
+
+        分割結果は str.split(SLIDE_DELIMITER) と同じだが、全体の分割リストは作らず、
+        断片の境界をまたぐ区切りも検出する。保持するのは未確定の末尾だけになる。
+        """
+        pending = ""
+        for chunk in chunks:
+            pending = pending + chunk if pending else chunk
+            start = 0
+            while True:
+                found = pending.find(SLIDE_DELIMITER, start)
+                if found == -1:
+                    break
+                yield pending[start:found]
+                start = found + len(SLIDE_DELIMITER)
+            pending = pending[start:]
+        yield pending
+
+    def _iter_document_parts(self, chunks: Iterable[str]) -> Iterator[Tuple[bool, str]]:
+        # Yields (is_front_matter, raw text); the first part is front matter only if a delimiter follows it.
+        pieces = self.iter_slide_contents(chunks)
+        first = next(pieces)
+        second = next(pieces, None)
+        if second is None:
+            yield False, first
+            return
+        if first.startswith(FRONT_MATTER_OPENER):
+            yield True, first[len(FRONT_MATTER_OPENER):]
+        else:
+            yield False, first
+        yield False, second
+        for piece in pieces:
+            yield False, piece
+
+    def iter_slides(self, chunks: Iterable[str]) -> Iterator[SlideData]:
+        """スライドを1枚ずつ生成する（フロントマターは飛ばす）
+
+        ディレクティブは後続のスライドやフロントマターに依存するため未解決のまま返す。
+        必要なら集めた後で apply_directives() を呼ぶ。
+        """
+        index = 0
+        for is_front_matter, piece in self._iter_document_parts(chunks):
+            if not is_front_matter:
+                index += 1
+                yield self.build_slide(index, piece.strip())
+
+    def apply_directives(self, front_matter: str, slides: List[SlideData]) -> DocumentMetadata:
+        """ディレクティブを解決して各スライドの directives を設定し、文書メタデータを返す
+
+        directives が変わったスライドだけ新しい SlideData に置き換えるため、
+        変更の無いスライドは描画キャッシュのキーも変わらない。
+        """
+        resolved = resolve_directives(front_matter, slides)
+        for position, directives in enumerate(resolved.slide_directives):
+            if slides[position].directives != directives:
+                slides[position] = slides[position].with_directives(directives)
+        return resolved.metadata
         
     def render_presentation(self, markdown_content: str, theme_name: str, slide_index: Optional[int] = None) -> str:
         """解析済みドキュメントをHTMLプレゼンテーションに変換"""
-        slides = self.extract_slides(markdown_content)
-        
         content_to_render = ""
-        if slide_index is not None and 0 <= slide_index < len(slides):
-            content_to_render = slides[slide_index].content
+        if slide_index is not None and slide_index >= 0:
+            # Stop scanning at the requested slide instead of splitting the whole document.
+            slide = next(islice(self.iter_slides([markdown_content]), slide_index, None), None)
+            content_to_render = slide.content if slide else ""
         elif slide_index is None:
             content_to_render = markdown_content # Render all if no specific slide is requested
         
         # Render markdown to HTML using markdown-it-py
         html_content = self.md.render(content_to_render)
-        
-        # Apply theme
+        return self._presentation_page(html_content, theme_name)
+
+    def render_presentation_deck(self, slides: List[SlideData], theme_name: str, visible_position: Optional[int] = 0,
+                                 script: str = "") -> str:
+        """全スライドを1つのHTML文書にまとめる（各スライドは id="slide-N" の section）
+
+        表示するスライド以外は display: none で隠しておき、スライド移動は表示の切り替えだけで行う。
+        visible_position が None なら全スライドを縦に並べて表示する。
+        """
+        sections = []
+        for position, (slide, fragment) in enumerate(zip(slides, self.render_slide_fragments(slides))):
+            section_class, section_style = self.slide_section_attributes(slide)
+            if visible_position is not None and position != visible_position:
+                section_style += " display: none;"
+            sections.append(f'<section id="{self.slide_section_id(position)}" class="{html.escape(section_class, quote=True)}" '
+                            f'style="{html.escape(section_style, quote=True)}">\n{fragment}\n</section>')
+        extra_css = """
+        .slide-section { position: relative; min-height: 90vh; }
+        .slide-header, .slide-footer, .slide-pagination { position: absolute; font-size: 0.6em; opacity: 0.8; }
+        .slide-header { top: 0; left: 0; }
+        .slide-footer { bottom: 0; left: 0; }
+        .slide-pagination { bottom: 0; right: 0; }
+"""
+        if slides:
+            extra_css += slides[0].directives.get("style", "")
+        return self._presentation_page("\n".join(sections) + script, theme_name, extra_css)
+
+    def slide_section_id(self, position: int) -> str:
+        """デッキ文書内のスライドの要素ID（position は0始まり）"""
+        return f"slide-{position + 1}"
+
+    def slide_section_attributes(self, slide: SlideData) -> Tuple[str, str]:
+        """デッキ文書での section 要素の (class, style) 属性値"""
+        return " ".join(["slide-section", slide.directives.get("class", "")]).strip(), self._directive_style(slide.directives)
+
+    def render_slide_fragment(self, slide: SlideData) -> str:
+        """デッキ文書の section 要素の中身（ヘッダー・フッター・ページ番号と本文）"""
+        key = self.fragment_key(slide)
+        fragment = self._cached_fragment(key)
+        if fragment is None:
+            fragment = self._render_fragment(slide, key)
+        return fragment
+
+    def _render_fragment(self, slide: SlideData, key: str) -> str:
+        env: Dict[str, Any] = {}
+        fragment = self._slide_decorations(slide.directives, slide.index) + self.md.render(slide.content, env)
+        if not env.get("has_pending_blocks"):
+            # A fragment drawn while a diagram or formula was still pending is not kept; the next render has it.
+            self._store_fragment(key, fragment)
+        return fragment
+
+    def render_slide_fragments(self, slides: List[SlideData]) -> List[str]:
+        """全スライドの section の中身を順番どおりに描画する
+
+        描画済みの断片はキャッシュから再利用し、残りが多ければプロセスプールで並列に描画する。
+        """
+        keys = [self.fragment_key(slide) for slide in slides]
+        fragments = [self._cached_fragment(key) for key in keys]
+        missing = [position for position, fragment in enumerate(fragments) if fragment is None]
+        rendered = None
+        if self.parallel_renderer and self.parallel_renderer.should_parallelize(len(missing)):
+            try:
+                rendered = self.parallel_renderer.render_fragments([slides[position] for position in missing],
+                                                                   self.asset_resolver.base_dir)
+            except Exception as e:
+                print(f"Parallel rendering failed, rendering sequentially: {e}")
+        if rendered is None:
+            for position in missing:
+                fragments[position] = self._render_fragment(slides[position], keys[position])
+            return fragments
+        for position, fragment in zip(missing, rendered):
+            fragments[position] = fragment
+            self._store_fragment(keys[position], fragment)
+        return fragments
+
+    def fragment_key(self, slide: SlideData) -> str:
+        """テーマやサイズに依存しない、section の中身のキャッシュキー"""
+        digest = hashlib.sha1(slide.content_digest.encode('ascii'))
+        # Effective directives already include inherited and render-relevant global values,
+        # so a directive edit only changes the keys of the slides it actually applies to.
+        for key, value in sorted(slide.directives.items()):
+            digest.update(f"\0{key}={value}".encode('utf-8'))
+        if slide.directives.get("paginate") == "true":
+            digest.update(f"\0page={slide.index}".encode('utf-8'))
+        # Referenced local images are part of the result; their mtimes invalidate the key when a file changes.
+        digest.update(self.asset_resolver.fingerprint(slide.content, slide.directives.get("backgroundImage", "")).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _cached_fragment(self, key: str) -> Optional[str]:
+        with self._fragment_lock:
+            fragment = self._fragment_cache.get(key)
+            if fragment is not None:
+                self._fragment_cache.move_to_end(key)
+            return fragment
+
+    def _store_fragment(self, key: str, fragment: str) -> None:
+        with self._fragment_lock:
+            self._fragment_cache[key] = fragment
+            self._fragment_cache.move_to_end(key)
+            while len(self._fragment_cache) > self.FRAGMENT_CACHE_SIZE:
+                self._fragment_cache.popitem(last=False)
+
+    def render_slide_documents(self, slides: List[SlideData], theme_name: str, aspect_ratio: str) -> List[str]:
+        """各スライドのスクリーンショット用HTMLを順番どおりに描画する（枚数が多ければ並列に）"""
+        if self.parallel_renderer and self.parallel_renderer.should_parallelize(len(slides)):
+            try:
+                theme = self.themes.get(theme_name)
+                return self.parallel_renderer.render_slide_documents(slides, theme_name,
+                                                                     theme.css_content if theme else "",
+                                                                     aspect_ratio, self.asset_resolver.base_dir)
+            except Exception as e:
+                print(f"Parallel rendering failed, rendering sequentially: {e}")
+        return [self.render_slide_html(slide.content, theme_name, aspect_ratio,
+                                       directives=slide.directives, page_number=slide.index) for slide in slides]
+
+    def _presentation_page(self, body_html: str, theme_name: str, extra_css: str = "") -> str:
         theme_css = ""
         if theme_name in self.themes:
             theme_css = self.themes[theme_name].css_content
@@ -138,37 +502,182 @@ class MarpEngine:
         }}
 
         {self.formatter.get_style_defs()}
+        {_BLOCK_CSS}
         {theme_css}
+        {extra_css}
     </style>
 </head>
 <body>
-{html_content}
+{body_html}
 </body>
 </html>
 """
         return final_html
 
+    def iter_html_export(self, slides: List[SlideData], theme_name: str, aspect_ratio: str,
+                         title: str = "Marp Presentation") -> Iterator[str]:
+        """単体で開けるHTMLとしてデッキを書き出す断片を順に生成する
+
+        スタイル（基本CSS・Pygments・テーマ・style ディレクティブ）は先頭に1回だけ書き、
+        各スライドはキャッシュ済みの section の中身を使う。ローカル画像は描画時に
+        data URI として埋め込まれているため、出力ファイル1つで完結する。
+        """
+        theme = self.themes.get(theme_name)
+        if theme is None:
+            print(f"Warning: Theme '{theme_name}' not found. Using default styles.")
+        width, height = self.slide_dimensions(aspect_ratio)
+        yield f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)}</title>
+<style>
+body {{ margin: 0; padding: 20px 0; background: #e0e0e0; font-family: sans-serif; }}
+.slide-section {{ width: {width}px; height: {height}px; margin: 0 auto 20px; box-sizing: border-box; padding: 20px;
+    overflow: hidden; position: relative; background: #fff; box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2); }}
+.slide-header, .slide-footer, .slide-pagination {{ position: absolute; font-size: 0.6em; opacity: 0.8; }}
+.slide-header {{ top: 6px; left: 20px; }}
+.slide-footer {{ bottom: 6px; left: 20px; }}
+.slide-pagination {{ bottom: 6px; right: 20px; }}
+@media print {{
+    body {{ padding: 0; background: none; }}
+    .slide-section {{ margin: 0; box-shadow: none; page-break-after: always; }}
+}}
+{self.formatter.get_style_defs()}
+{_BLOCK_CSS}
+{theme.css_content if theme else ""}
+{slides[0].directives.get("style", "") if slides else ""}
+</style>
+</head>
+<body>
+"""
+        for position, (slide, fragment) in enumerate(zip(slides, self.render_slide_fragments(slides))):
+            section_class, section_style = self.slide_section_attributes(slide)
+            yield (f'<section id="{self.slide_section_id(position)}" class="{html.escape(section_class, quote=True)}" '
+                   f'style="{html.escape(section_style, quote=True)}">\n{fragment}\n</section>\n')
+        yield "</body>\n</html>\n"
+
     def render_slides_as_images(self, markdown_content: str, theme_name: str, aspect_ratio: str) -> List[bytes]:
         slides = self.extract_slides(markdown_content)
+        slide_documents = self.render_slide_documents(slides, theme_name, aspect_ratio)
         images = []
         with sync_playwright() as p:
             browser = p.chromium.launch()
-            for slide in slides:
-                html = self.render_slide_html(slide.content, theme_name, aspect_ratio)
-                page = browser.new_page()
-                width, height = (800, 600) if aspect_ratio == "4:3" else (1024, 576)
-                page.set_viewport_size({"width": width, "height": height})
-                page.set_content(html)
-                image_bytes = page.screenshot(type="png")
-                images.append(image_bytes)
-                page.close()
+            for slide, slide_html in zip(slides, slide_documents):
+                images.append(self.screenshot_slide(browser, slide, theme_name, aspect_ratio, slide_html=slide_html))
             browser.close()
         return images
 
-    def render_slide_html(self, slide_content: str, theme_name: str, aspect_ratio: str) -> str:
+    def render_pdf(self, browser, slides: List[SlideData], theme_name: str, aspect_ratio: str,
+                   title: str = "Marp Presentation") -> bytes:
+        """起動済みのブラウザでデッキをPDFに変換する（1ページ1スライド、ページサイズはスライドと同じ）"""
+        width, height = self.slide_dimensions(aspect_ratio)
+        page = browser.new_page()
+        try:
+            # Same document as the HTML export; its print styles put every section on its own page.
+            page.set_content("".join(self.iter_html_export(slides, theme_name, aspect_ratio, title)))
+            return page.pdf(width=f"{width}px", height=f"{height}px", print_background=True,
+                            margin={"top": "0", "right": "0", "bottom": "0", "left": "0"})
+        finally:
+            page.close()
+
+    def slide_dimensions(self, aspect_ratio: str) -> Tuple[int, int]:
+        """スライドのCSSピクセルサイズ (幅, 高さ)"""
+        return (800, 600) if aspect_ratio == "4:3" else (1024, 576)
+
+    def screenshot_slide(self, browser, slide: SlideData, theme_name: str, aspect_ratio: str, scale: float = 1.0,
+                         slide_html: Optional[str] = None) -> bytes:
+        """起動済みのブラウザで1枚のスライドをPNGとして描画する
+
+        scale は Chromium のデバイススケールで、1未満を渡すと縮小済みの画像が直接得られる。
+        slide_html には render_slide_documents() で描画済みのHTMLを渡せる。
+        """
+        return self.capture_slide(browser, slide, theme_name, aspect_ratio, scale, slide_html).png_data
+
+    def capture_slide(self, browser, slide: SlideData, theme_name: str, aspect_ratio: str, scale: float = 1.0,
+                      slide_html: Optional[str] = None) -> SlideCapture:
+        """screenshot_slide() と同じ描画に加え、同じページでレイアウトのはみ出し量を測る"""
+        if slide_html is None:
+            slide_html = self.render_slide_html(slide.content, theme_name, aspect_ratio,
+                                                directives=slide.directives, page_number=slide.index)
+        page = browser.new_page(device_scale_factor=scale)
+        try:
+            width, height = self.slide_dimensions(aspect_ratio)
+            page.set_viewport_size({"width": width, "height": height})
+            page.set_content(slide_html)
+            # Device scale does not change CSS layout, so thumbnails measure the same as full renders.
+            overflow_width, overflow_height = page.evaluate(_MEASURE_OVERFLOW_SCRIPT)
+            return SlideCapture(page.screenshot(type="png"), max(0, overflow_width), max(0, overflow_height))
+        finally:
+            page.close()
+
+    def capture_slide_themes(self, browser, slide: SlideData, theme_names: List[str], aspect_ratio: str,
+                             scale: float = 1.0) -> Tuple[bytes, List[Tuple[int, int]]]:
+        """1枚のスライドを複数のテーマで1ページに縦に並べて描画し、まとめて撮影する
+
+        テーマごとに iframe で分けるので CSS は干渉しない。ページの読み込みと撮影は1回で済み、
+        各テーマの画像は高さ (スライドの高さ × scale) ごとに切り出して使う。
+        はみ出し量はテーマの順に返す。
+        """
+        width, height = self.slide_dimensions(aspect_ratio)
+        frames = []
+        for theme_name in theme_names:
+            slide_html = self.render_slide_html(slide.content, theme_name, aspect_ratio,
+                                                directives=slide.directives, page_number=slide.index)
+            frames.append(f'<iframe srcdoc="{html.escape(slide_html, quote=True)}" width="{width}" height="{height}" '
+                          f'style="display: block; border: 0;" scrolling="no"></iframe>')
+        page = browser.new_page(device_scale_factor=scale)
+        try:
+            page.set_viewport_size({"width": width, "height": height * len(theme_names)})
+            page.set_content(f'<!DOCTYPE html><html><body style="margin: 0;">{"".join(frames)}</body></html>')
+            overflows = []
+            for element in page.query_selector_all("iframe"):
+                frame = element.content_frame()
+                overflow_width, overflow_height = frame.evaluate(_MEASURE_OVERFLOW_SCRIPT) if frame else (0, 0)
+                overflows.append((max(0, overflow_width), max(0, overflow_height)))
+            return page.screenshot(type="png", full_page=True), overflows
+        finally:
+            page.close()
+
+    def slide_render_key(self, slide: SlideData, theme_name: str, aspect_ratio: str) -> str:
+        """スライドの描画結果を一意に識別するキャッシュキー"""
+        digest = hashlib.sha1(self.fragment_key(slide).encode('ascii'))
+        digest.update(f"\0{theme_name}\0{aspect_ratio}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _directive_style(self, directives: Dict[str, str]) -> str:
+        styles = []
+        if "backgroundColor" in directives:
+            styles.append(f"background-color: {directives['backgroundColor']};")
+        if "color" in directives:
+            styles.append(f"color: {directives['color']};")
+        if "backgroundImage" in directives:
+            styles.append(f"background-image: {self.asset_resolver.inline_css_urls(directives['backgroundImage'])};")
+        for directive, prop in (("backgroundPosition", "background-position"), ("backgroundRepeat", "background-repeat"),
+                                ("backgroundSize", "background-size")):
+            if directive in directives:
+                styles.append(f"{prop}: {directives[directive]};")
+        return " ".join(styles)
+
+    def _slide_decorations(self, directives: Dict[str, str], page_number: Optional[int]) -> str:
+        decorations = ""
+        if directives.get("header"):
+            decorations += f'<header class="slide-header">{self.md.renderInline(directives["header"])}</header>'
+        if directives.get("footer"):
+            decorations += f'<footer class="slide-footer">{self.md.renderInline(directives["footer"])}</footer>'
+        if directives.get("paginate") == "true" and page_number is not None:
+            decorations += f'<div class="slide-pagination">{page_number}</div>'
+        return decorations
+
+    def render_slide_html(self, slide_content: str, theme_name: str, aspect_ratio: str,
+                          directives: Optional[Dict[str, str]] = None, page_number: Optional[int] = None) -> str:
+        directives = directives or {}
         html_content = self.md.render(slide_content)
         theme_css = self.themes.get(theme_name, Theme(name="default", display_name="Default", css_content="", variables={}, fonts=[])).css_content
-        width, height = (800, 600) if aspect_ratio == "4:3" else (1024, 576)
+        width, height = self.slide_dimensions(aspect_ratio)
+        slide_class = html.escape(" ".join(["slide", directives.get("class", "")]).strip(), quote=True)
+        decorations = self._slide_decorations(directives, page_number)
 
         return f"""
 <!DOCTYPE html>
@@ -177,13 +686,20 @@ class MarpEngine:
     <title>Marp Preview</title>
     <style>
         body {{ margin: 0; padding: 0; overflow: hidden; }}
-        .slide {{ width: {width}px; height: {height}px; border: 1px solid #ccc; box-sizing: border-box; padding: 20px; overflow: hidden; }}
+        .slide {{ width: {width}px; height: {height}px; border: 1px solid #ccc; box-sizing: border-box; padding: 20px; overflow: hidden; position: relative; }}
+        .slide-header, .slide-footer, .slide-pagination {{ position: absolute; font-size: 0.6em; opacity: 0.8; }}
+        .slide-header {{ top: 6px; left: 20px; }}
+        .slide-footer {{ bottom: 6px; left: 20px; }}
+        .slide-pagination {{ bottom: 6px; right: 20px; }}
         {self.formatter.get_style_defs()}
+        {_BLOCK_CSS}
         {theme_css}
+        {directives.get("style", "")}
     </style>
 </head>
 <body>
-<div class="slide">
+<div class="{slide_class}" style="{html.escape(self._directive_style(directives), quote=True)}">
+{decorations}
 {html_content}
 </div>
 </body>
@@ -197,20 +713,78 @@ class MarpEngine:
         
     def extract_slides(self, markdown_content: str) -> List[SlideData]:
         """Markdownからスライドデータを抽出"""
-        slides_raw = markdown_content.split('\n---\n') # Marp slide delimiter
-        slides_data = []
-        for i, slide_content in enumerate(slides_raw):
-            # Basic extraction for now. Later, parse directives and notes.
-            slides_data.append(SlideData(
-                index=i + 1,
-                title=f"Slide {i + 1}", # Placeholder title
-                content=slide_content.strip(),
-                directives={},
-                notes=None
-            ))
-        return slides_data
-        
+        return self.parse_document(markdown_content).slides
+
+    def build_slide(self, index: int, content: str) -> SlideData:
+        """1枚分のスライド本文から SlideData を作る"""
+        # Effective directives depend on the slides before this one; see apply_directives().
+        # The title defaults to "Slide N" and the notes are parsed when first read.
+        return SlideData(index, content=content)
+
+    def build_document_slide(self, index: int, text: str, start: int, end: int) -> SlideData:
+        """文書全体の文字列 text の [start, end) を本文とする SlideData を作る（本文はコピーしない）"""
+        return SlideData.from_span(index, text, start, end)
+
+    def extract_headings(self, slide_content: str, max_level: int = 3) -> List[Tuple[int, str, int]]:
+        """スライド本文の見出しを (レベル, テキスト, スライド内の行番号) で返す"""
+        headings = []
+        tokens = self.md.parse(slide_content)
+        for i, token in enumerate(tokens):
+            if token.type != 'heading_open' or int(token.tag[1:]) > max_level:
+                continue
+            inline = tokens[i + 1]
+            text = "".join(child.content for child in (inline.children or []) if child.type in ('text', 'code_inline'))
+            headings.append((int(token.tag[1:]), text.strip() or inline.content.strip(), token.map[0] if token.map else 0))
+        return headings
+
     def validate_syntax(self, markdown_content: str) -> List[ValidationError]:
         """Markdown構文の検証"""
-        # Placeholder implementation
-        return []
\ No newline at end of file
+        parsed = self.parse_document(markdown_content)
+        errors = self.validate_front_matter(parsed.front_matter)
+        for slide in parsed.slides:
+            errors.extend(self.validate_slide(slide))
+        return errors
+
+    def validate_front_matter(self, front_matter: str) -> List[ValidationError]:
+        """フロントマターのディレクティブを検証する（slide_index は 0）"""
+        errors = []
+        for line, key, value in iter_directive_lines(front_matter):
+            problem = check_directive(key, value, self.themes)
+            if problem:
+                errors.append(ValidationError(0, line, problem[1], problem[0], "directive"))
+        return errors
+
+    def validate_slide(self, slide: SlideData) -> List[ValidationError]:
+        """1枚のスライドの Markdown とディレクティブを検証する（描画はしない）"""
+        content = slide.content
+        errors = []
+        fence: Optional[Tuple[str, int, int]] = None  # (marker character, marker length, line)
+        for line, text in enumerate(content.split('\n')):
+            match = _FENCE_PATTERN.match(text)
+            if fence:
+                if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= fence[1] and not match.group(2).strip():
+                    fence = None
+                continue
+            if match and not (match.group(1)[0] == '`' and '`' in match.group(2)):
+                fence = (match.group(1)[0], len(match.group(1)), line)
+            elif _HEADING_WITHOUT_SPACE_PATTERN.match(text):
+                errors.append(ValidationError(slide.index, line, "Missing space after '#'; this line is not a heading",
+                                              "warning", "heading"))
+        if fence:
+            errors.append(ValidationError(slide.index, fence[2], "Code block is never closed", "error", "unclosed-fence"))
+
+        comment_start = content.rfind('<!--')
+        if comment_start != -1 and content.find('-->', comment_start) == -1:
+            errors.append(ValidationError(slide.index, content.count('\n', 0, comment_start),
+                                          "HTML comment is never closed; the rest of the slide is hidden",
+                                          "error", "unclosed-comment"))
+
+        for line, key, value in iter_comment_directive_lines(content):
+            problem = check_directive(key, value, self.themes)
+            if problem:
+                errors.append(ValidationError(slide.index, line, problem[1], problem[0], "directive"))
+
+        for offset, src in self.asset_resolver.find_missing_images(content):
+            errors.append(ValidationError(slide.index, content.count('\n', 0, offset), f"Image not found: {src}",
+                                          "error", "missing-image"))
+        return sorted(errors, key=lambda error: error.line)
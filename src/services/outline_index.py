@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from src.models.app_state import SlideData
+from src.services.marp_engine import MarpEngine
+
+
+@dataclass(frozen=True)
+class OutlineEntry:
+    slide_index: int  # 1-based
+    level: int  # 1-3
+    text: str
+    line: int  # Line offset inside the (stripped) slide content
+
+
+class OutlineIndex:
+    """スライドごとの見出し (H1〜H3) のインデックス
+
+    見出しは markdown-it のトークン列から取り出し、スライド本文のハッシュをキーにキャッシュする。
+    スライドの追加・削除で位置がずれても、本文が変わっていなければ再解析しない。
+    """
+
+    def __init__(self, marp_engine: MarpEngine, max_level: int = 3):
+        self.marp_engine = marp_engine
+        self.max_level = max_level
+        self.version = 0  # Incremented on every change so views can skip redundant redraws
+        self._headings_by_digest: Dict[str, List[Tuple[int, str, int]]] = {}
+        self._entries: List[List[OutlineEntry]] = []
+        self._digests: List[str] = []  # Content digest per slide; the contents themselves are not copied
+
+    def _headings(self, slide: SlideData) -> List[Tuple[int, str, int]]:
+        headings = self._headings_by_digest.get(slide.content_digest)
+        if headings is None:
+            headings = self.marp_engine.extract_headings(slide.content, self.max_level)
+            self._headings_by_digest[slide.content_digest] = headings
+        return headings
+
+    def _entries_for(self, slide: SlideData) -> List[OutlineEntry]:
+        return [OutlineEntry(slide.index, level, text, line) for level, text, line in self._headings(slide)]
+
+    def rebuild(self, slides: List[SlideData]) -> None:
+        """スライド構成が変わった時に呼ぶ。本文が既知のスライドはキャッシュを再利用する"""
+        self._entries = [self._entries_for(slide) for slide in slides]
+        self._digests = [slide.content_digest for slide in slides]
+        # Keep only the headings that are still referenced by the deck.
+        live_digests = set(self._digests)
+        self._headings_by_digest = {digest: headings for digest, headings in self._headings_by_digest.items()
+                                    if digest in live_digests}
+        self.version += 1
+
+    def replace_tail(self, slides: List[SlideData], first: int) -> None:
+        """first 以降（0始まり）のスライドだけを入れ替える。読み込み中に末尾へスライドが増える時に使う"""
+        for digest in self._digests[first:]:
+            self._headings_by_digest.pop(digest, None)
+        del self._entries[first:], self._digests[first:]
+        for slide in slides[first:]:
+            self._entries.append(self._entries_for(slide))
+            self._digests.append(slide.content_digest)
+        self.version += 1
+
+    def update(self, slides: List[SlideData], positions: Iterable[int]) -> None:
+        """変更されたスライド（0始まりの位置）だけ見出しを取り直す"""
+        changed = False
+        for position in positions:
+            if 0 <= position < len(self._entries):
+                slide = slides[position]
+                if slide.content_digest == self._digests[position]:
+                    continue
+                self._headings_by_digest.pop(self._digests[position], None)
+                self._digests[position] = slide.content_digest
+                entries = self._entries_for(slide)
+                if entries != self._entries[position]:
+                    self._entries[position] = entries
+                    changed = True
+        if changed:
+            self.version += 1
+
+    @property
+    def slide_count(self) -> int:
+        return len(self._entries)
+
+    def entries(self, position: int) -> List[OutlineEntry]:
+        return self._entries[position]
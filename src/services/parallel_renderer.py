@@ -0,0 +1,97 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Optional, Tuple
+import multiprocessing
+import os
+
+from src.models.app_state import SlideData
+
+# Engine owned by each worker process; it carries that worker's own MarkdownIt and HtmlFormatter.
+_worker_engine = None
+
+
+def _init_worker() -> None:
+    global _worker_engine
+    from src.services.marp_engine import MarpEngine  # Imported here: marp_engine imports this module
+    _worker_engine = MarpEngine()
+
+
+def _use_base_dir(base_dir: Optional[str]) -> None:
+    resolver = _worker_engine.asset_resolver
+    if (str(resolver.base_dir) if resolver.base_dir else None) != base_dir:
+        resolver.base_dir = Path(base_dir) if base_dir else None
+
+
+def _render_fragment(args: Tuple[SlideData, Optional[str]]) -> str:
+    slide, base_dir = args
+    _use_base_dir(base_dir)
+    return _worker_engine.render_slide_fragment(slide)
+
+
+def _use_theme_css(theme_name: str, css_content: str) -> None:
+    # Workers load the themes once, when the pool starts; the caller's current CSS arrives with every task.
+    theme = _worker_engine.themes.get(theme_name)
+    if theme is None:
+        from src.services.marp_engine import Theme
+        _worker_engine.themes[theme_name] = Theme(name=theme_name, display_name=theme_name, css_content=css_content,
+                                                  variables={}, fonts=[])
+    elif theme.css_content != css_content:
+        _worker_engine.themes[theme_name] = replace(theme, css_content=css_content)
+
+
+def _render_slide_document(args: Tuple[SlideData, str, str, str, Optional[str]]) -> str:
+    slide, theme_name, theme_css, aspect_ratio, base_dir = args
+    _use_base_dir(base_dir)
+    _use_theme_css(theme_name, theme_css)
+    return _worker_engine.render_slide_html(slide.content, theme_name, aspect_ratio,
+                                            directives=slide.directives, page_number=slide.index)
+
+
+class ParallelSlideRenderer:
+    """スライドごとの Markdown→HTML 変換（コードのハイライトを含む）をプロセスプールで並列に行う
+
+    markdown-it-py と Pygments は純Pythonのため、スレッドではGILに律速される。
+    各ワーカープロセスは自前の MarpEngine（MarkdownIt と HtmlFormatter）を持ち、
+    結果は入力と同じ順序で返す。枚数が少ない時はプロセス間通信の方が高くつくため逐次処理する。
+    テーマの CSS は呼び出し側の最新のものをタスクと一緒に渡すので、プールの起動後に編集された
+    テーマも逐次処理と同じように反映される（同じチャンク内の CSS は pickle で1度しか送られない）。
+    """
+
+    MIN_PARALLEL_SLIDES = 32
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) - 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def should_parallelize(self, slide_count: int) -> bool:
+        return self.max_workers > 1 and slide_count >= self.MIN_PARALLEL_SLIDES
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the GUI process runs Tk and Playwright threads.
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker)
+        return self._executor
+
+    def _chunksize(self, count: int) -> int:
+        return max(1, count // (self.max_workers * 4))
+
+    def render_fragments(self, slides: List[SlideData], base_dir: Optional[Path]) -> List[str]:
+        """各スライドの section の中身を並列に描画する"""
+        base = str(base_dir) if base_dir else None
+        tasks = [(slide, base) for slide in slides]
+        return list(self._get_executor().map(_render_fragment, tasks, chunksize=self._chunksize(len(tasks))))
+
+    def render_slide_documents(self, slides: List[SlideData], theme_name: str, theme_css: str, aspect_ratio: str,
+                               base_dir: Optional[Path]) -> List[str]:
+        """各スライドのスクリーンショット用HTML文書を並列に描画する（theme_css はテーマの現在の CSS）"""
+        base = str(base_dir) if base_dir else None
+        tasks = [(slide, theme_name, theme_css, aspect_ratio, base) for slide in slides]
+        return list(self._get_executor().map(_render_slide_document, tasks, chunksize=self._chunksize(len(tasks))))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,209 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty, Queue
+from threading import Lock, Thread
+from typing import List, Optional, Set
+import json
+
+from src.models.app_state import SlideData
+from src.services.marp_engine import MarpEngine
+
+# Replaces single sections in place on "slide" events, so only the edited slide is re-rendered by the browser.
+_CLIENT_SCRIPT = """
+<script>
+(function () {
+    var source = new EventSource("/events");
+    source.addEventListener("slide", function (event) {
+        var data = JSON.parse(event.data);
+        var element = document.getElementById(data.id);
+        if (!element) { location.reload(); return; }
+        element.className = data.className;
+        element.setAttribute("style", data.style);
+        element.innerHTML = data.html;
+    });
+    source.addEventListener("current", function (event) {
+        var element = document.getElementById(JSON.parse(event.data).id);
+        if (element) { element.scrollIntoView({behavior: "smooth", block: "start"}); }
+    });
+    source.addEventListener("reload", function () { location.reload(); });
+})();
+</script>
+"""
+
+
+class PreviewServer:
+    """ローカルのブラウザ向けのライブプレビューサーバー
+
+    デッキ全体のHTMLを http://127.0.0.1:<port>/ で配信し、文書が更新されたら
+    変更されたスライドの section だけを Server-Sent Events (/events) で送る。
+    スライド構成やテーマが変わった場合はブラウザに再読み込みを指示する。
+    ページ全体のHTMLはブラウザが読み込む時にだけ作るため、編集1回あたりの描画は
+    変更されたスライドの断片だけで済む。断片もページも描画はサーバー専用の1本のスレッドで行い、
+    publish を呼ぶ UI スレッドや HTTP のスレッドはその結果を待つか受け取るだけにする。
+    """
+
+    KEEPALIVE_INTERVAL = 15.0  # Seconds between SSE comments that keep idle connections open
+
+    def __init__(self, marp_engine: MarpEngine, host: str = "127.0.0.1", port: int = 0):
+        self.marp_engine = marp_engine
+        self.host = host
+        self.port = port  # 0 picks a free port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[Thread] = None
+        self._renderer: Optional[ThreadPoolExecutor] = None  # The single thread that renders fragments and pages
+        self._lock = Lock()
+        self._clients: Set[Queue] = set()
+        # Only read and written on the render thread
+        self._page_html: Optional[str] = None  # Rendered lazily on the next page request
+        self._slides: Optional[List[SlideData]] = None
+        self._theme_name: Optional[str] = None
+        self._current_position: Optional[int] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._server is not None
+
+    @property
+    def url(self) -> Optional[str]:
+        if self._server is None:
+            return None
+        return f"http://{self.host}:{self._server.server_address[1]}/"
+
+    def start(self) -> str:
+        """サーバーを起動してURLを返す（起動済みなら何もしない）"""
+        if self._server is None:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+            self._server.daemon_threads = True
+            self._renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview-render")
+            self._thread = Thread(target=self._server.serve_forever, name="preview-server", daemon=True)
+            self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        with self._lock:
+            for client in self._clients:
+                client.put(None)  # Ends the client's event stream
+            self._clients.clear()
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        self._renderer.submit(self._reset)
+        self._renderer.shutdown(wait=False)
+        self._renderer = None
+
+    def _reset(self) -> None:
+        self._slides = None
+        self._page_html = None
+        self._current_position = None
+
+    def publish(self, slides: List[SlideData], theme_name: str, current_position: Optional[int] = None) -> None:
+        """文書の最新状態を反映する。前回から変わったスライドだけを描画して送る（描画は描画スレッドで行う）"""
+        if self._renderer is None:
+            return
+        self._renderer.submit(self._publish, list(slides), theme_name, current_position).add_done_callback(
+            self._report_publish_error)
+
+    @staticmethod
+    def _report_publish_error(future: Future) -> None:
+        if future.exception() is not None:
+            print(f"Error publishing preview: {future.exception()}")
+
+    def _publish(self, slides: List[SlideData], theme_name: str, current_position: Optional[int]) -> None:
+        previous = self._slides
+        events = []
+        if previous is None or len(previous) != len(slides) or theme_name != self._theme_name \
+                or (slides and previous[0].directives.get("style") != slides[0].directives.get("style")):
+            events.append(("reload", {}))
+        else:
+            # Slides are rebuilt on edit, so identity tells which ones changed.
+            for position, slide in enumerate(slides):
+                if slide is previous[position]:
+                    continue
+                section_class, section_style = self.marp_engine.slide_section_attributes(slide)
+                events.append(("slide", {"id": self.marp_engine.slide_section_id(position), "className": section_class,
+                                         "style": section_style, "html": self.marp_engine.render_slide_fragment(slide)}))
+        if current_position is not None and current_position != self._current_position and 0 <= current_position < len(slides):
+            events.append(("current", {"id": self.marp_engine.slide_section_id(current_position)}))
+        if events:
+            self._page_html = None
+        self._slides = slides
+        self._theme_name = theme_name
+        self._current_position = current_position
+        with self._lock:
+            for event, data in events:
+                message = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+                for client in self._clients:
+                    client.put(message)
+
+    def _page(self) -> bytes:
+        renderer = self._renderer
+        if renderer is None:
+            return b""
+        try:
+            # Queued behind any pending publish, so the page includes every edit made before the request.
+            return renderer.submit(self._render_page).result().encode("utf-8")
+        except RuntimeError:
+            return b""  # The server was stopped while the request was being handled
+
+    def _render_page(self) -> str:
+        if self._page_html is None:
+            self._page_html = self.marp_engine.render_presentation_deck(self._slides or [], self._theme_name or "",
+                                                                        visible_position=None, script=_CLIENT_SCRIPT)
+        return self._page_html
+
+    def _subscribe(self) -> Queue:
+        client: Queue = Queue()
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def _unsubscribe(self, client: Queue) -> None:
+        with self._lock:
+            self._clients.discard(client)
+
+    def _make_handler(self):
+        server = self
+
+        class PreviewRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/events":
+                    self._stream_events()
+                elif self.path in ("/", "/index.html"):
+                    body = server._page()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("Cache-Control", "no-store")
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self.send_error(404)
+
+            def _stream_events(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                client = server._subscribe()
+                try:
+                    while True:
+                        try:
+                            message = client.get(timeout=server.KEEPALIVE_INTERVAL)
+                        except Empty:
+                            message = b": keepalive\n\n"
+                        if message is None:
+                            break
+                        self.wfile.write(message)
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    server._unsubscribe(client)
+
+            def log_message(self, format, *args):
+                pass  # Keep the console quiet; every SSE reconnect would otherwise be logged
+
+        return PreviewRequestHandler
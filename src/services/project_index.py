@@ -0,0 +1,264 @@
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Callable, Dict, List, Optional
+import hashlib
+import os
+import re
+
+from PIL import Image
+
+from src.models.encoded_image import Thumbnail, decode_image
+from src.services.draft_renderer import DraftSlideRenderer
+from src.services.file_manager import FileManager, app_cache_dir
+from src.services.marp_engine import MarpEngine
+
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+SKIPPED_DIRECTORIES = {"node_modules", "__pycache__", "venv", ".venv"}  # Hidden directories are skipped as well
+_FIRST_HEADING_PATTERN = re.compile(r'^ {0,3}#{1,6}\s+(.+?)\s*#*\s*$', re.MULTILINE)
+
+
+@dataclass
+class ProjectFileEntry:
+    path: str  # Relative to the project root, with '/' separators
+    mtime_ns: int
+    size: int
+    slide_count: int = 0
+    title: Optional[str] = None
+    theme: Optional[str] = None
+    is_thumbnail_rendered: bool = False  # Thumbnail came from Chromium rather than the draft renderer
+
+
+ProjectUpdatedCallback = Callable[[int, List[ProjectFileEntry], bool], None]  # (generation, entries, is_scanning)
+
+
+class ProjectIndex:
+    """プロジェクトディレクトリ内の Markdown ファイルのメタデータ索引
+
+    os.scandir で走査し、ファイルごとの (更新時刻, サイズ, スライド数, タイトル, テーマ) を
+    プロジェクトごとのJSONに保存する。再走査では更新時刻とサイズが変わったファイルだけを解析し直すため、
+    数千のデッキがあっても変更の無いファイルは読まない。
+    サムネイルは先頭スライドの下書き画像で、エディタで開いて描画された時に実際の画像に置き換える。
+    """
+
+    THUMBNAIL_WIDTH = 160
+    PROGRESS_INTERVAL = 200  # Newly indexed files between intermediate updates of the view
+    INDEX_VERSION = 1
+
+    def __init__(self, marp_engine: MarpEngine, draft_renderer: DraftSlideRenderer, file_manager: FileManager):
+        self.marp_engine = marp_engine
+        self.draft_renderer = draft_renderer
+        self.file_manager = file_manager
+        self.root: Optional[Path] = None
+        self._entries: Dict[str, ProjectFileEntry] = {}
+        self._lock = Lock()
+        self._save_lock = Lock()  # The scanner and the Tk thread (store_thumbnail) both write the index
+        self._generation = 0
+        self._on_updated: Optional[ProjectUpdatedCallback] = None
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def open(self, root: Path, on_updated: ProjectUpdatedCallback) -> int:
+        """保存済みの索引をすぐに通知し、バックグラウンドで差分を走査する。世代番号を返す
+
+        前のプロジェクトの走査は止めずに残るが、世代番号が変わるので結果は新しい索引に入らない。
+        """
+        entries = self._load_index(root)
+        with self._lock:
+            # Root, entries and generation change together, so a late scanner sees either all or none of it.
+            self._generation += 1
+            self.root = root
+            self._entries = entries
+            generation = self._generation
+        self._on_updated = on_updated
+        on_updated(generation, self.entries(), True)
+        self._start_scan()
+        return generation
+
+    def refresh(self) -> None:
+        """プロジェクトを再走査する（変更されたファイルだけ解析し直す）"""
+        if self.root is not None:
+            with self._lock:
+                self._generation += 1
+            self._start_scan()
+
+    def close(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.root = None
+            self._entries = {}
+
+    def entries(self) -> List[ProjectFileEntry]:
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda entry: entry.path.lower())
+
+    def absolute_path(self, entry: ProjectFileEntry) -> Path:
+        return self.root / entry.path
+
+    def relative_key(self, path: Path) -> Optional[str]:
+        """プロジェクト内のファイルなら索引のキーを返す"""
+        if self.root is None:
+            return None
+        try:
+            return path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    def thumbnail_path(self, entry: ProjectFileEntry) -> Path:
+        return self._thumbnail_file(self.root, entry)
+
+    def _thumbnail_file(self, root: Path, entry: ProjectFileEntry) -> Path:
+        digest = hashlib.sha1(str(root / entry.path).encode('utf-8')).hexdigest()
+        return self._thumbnail_dir() / f"{digest}.png"
+
+    def store_thumbnail(self, path: Path, image: Thumbnail) -> None:
+        """エディタで描画された先頭スライドの画像をサムネイルとして保存する（ファイルが索引と一致する時だけ）"""
+        key = self.relative_key(path)
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+        if entry is None or entry.is_thumbnail_rendered:
+            return
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        if stat.st_mtime_ns != entry.mtime_ns or stat.st_size != entry.size:
+            return  # Saved since it was indexed; the next scan brings the entry up to date first
+        if self._save_thumbnail(self.root, entry, decode_image(image)):
+            entry.is_thumbnail_rendered = True
+            self._save_index()
+
+    # --- scanning -----------------------------------------------------------
+
+    def _start_scan(self) -> None:
+        with self._lock:
+            generation, root = self._generation, self.root
+        Thread(target=self._scan, args=(generation, root), name="project-scanner", daemon=True).start()
+
+    def _notify(self, generation: int, is_scanning: bool) -> None:
+        if generation == self._generation and self._on_updated:
+            self._on_updated(generation, self.entries(), is_scanning)
+
+    def _scan(self, generation: int, root: Path) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            cached = dict(self._entries)
+        found: Dict[str, ProjectFileEntry] = {}
+        changed = 0
+        directories = [root]
+        while directories:
+            if generation != self._generation:
+                return
+            directory = directories.pop()
+            try:
+                with os.scandir(directory) as iterator:
+                    items = list(iterator)
+            except OSError:
+                continue
+            for item in items:
+                if item.name.startswith('.') or item.name in SKIPPED_DIRECTORIES:
+                    continue
+                try:
+                    if item.is_dir(follow_symlinks=False):
+                        directories.append(Path(item.path))
+                        continue
+                    if not item.name.lower().endswith(MARKDOWN_SUFFIXES) or not item.is_file():
+                        continue
+                    stat = item.stat()  # Cached by the DirEntry on Windows
+                except OSError:
+                    continue
+                key = Path(item.path).relative_to(root).as_posix()
+                entry = cached.get(key)
+                if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+                    entry = self._index_file(root, key, stat)
+                    changed += 1
+                    with self._lock:
+                        if generation != self._generation:
+                            return  # Another project was opened (or this one rescanned) meanwhile
+                        self._entries[key] = entry
+                    if changed % self.PROGRESS_INTERVAL == 0:
+                        self._notify(generation, True)
+                found[key] = entry
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries = found
+        removed = set(cached) - set(found)
+        for key in removed:
+            try:
+                self._thumbnail_file(root, cached[key]).unlink()
+            except OSError:
+                pass
+        if changed or removed:
+            self._save_index()
+        self._notify(generation, False)
+
+    def _index_file(self, root: Path, key: str, stat: os.stat_result) -> ProjectFileEntry:
+        path = root / key
+        entry = ProjectFileEntry(key, stat.st_mtime_ns, stat.st_size, title=path.stem)
+        try:
+            text = self.file_manager.read_text(path)
+        except (OSError, LookupError) as e:
+            print(f"Error indexing {path}: {e}")
+            return entry
+        document = self.marp_engine.parse_document(text)
+        entry.slide_count = len(document.slides)
+        entry.theme = document.metadata.theme
+        heading = _FIRST_HEADING_PATTERN.search(document.slides[0].content) if document.slides else None
+        entry.title = document.metadata.title or (heading.group(1) if heading else path.stem)
+        if document.slides:
+            theme = entry.theme if entry.theme in self.marp_engine.themes else "default"
+            aspect_ratio = document.metadata.size if document.metadata.size in ("16:9", "4:3") else "16:9"
+            try:
+                self._save_thumbnail(root, entry, self.draft_renderer.render(document.slides[0], theme, aspect_ratio,
+                                                                       self.THUMBNAIL_WIDTH))
+            except Exception as e:
+                print(f"Error drafting thumbnail for {path}: {e}")
+        return entry
+
+    def _save_thumbnail(self, root: Path, entry: ProjectFileEntry, image: Image.Image) -> bool:
+        if image.width != self.THUMBNAIL_WIDTH:
+            image = image.resize((self.THUMBNAIL_WIDTH, max(1, round(image.height * self.THUMBNAIL_WIDTH / image.width))),
+                                 Image.LANCZOS)
+        path = self._thumbnail_file(root, entry)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            image.save(temp_path, format="PNG")
+            os.replace(temp_path, path)
+            return True
+        except OSError as e:
+            print(f"Error saving thumbnail {path}: {e}")
+            return False
+
+    # --- persistence ----------------------------------------------------------
+
+    def _thumbnail_dir(self) -> Path:
+        return app_cache_dir("thumbnails")
+
+    def _index_path(self, root: Path) -> Path:
+        return app_cache_dir("projects") / f"{hashlib.sha1(str(root.resolve()).encode('utf-8')).hexdigest()}.json"
+
+    def _load_index(self, root: Path) -> Dict[str, ProjectFileEntry]:
+        data = self.file_manager.read_json(self._index_path(root))
+        if not isinstance(data, dict) or data.get("version") != self.INDEX_VERSION:
+            return {}
+        try:
+            return {item["path"]: ProjectFileEntry(**item) for item in data.get("files", [])}
+        except (TypeError, KeyError) as e:
+            print(f"Ignoring unreadable project index for {root}: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        with self._save_lock:
+            with self._lock:
+                # Read together, so entries are never written into another project's index.
+                root = self.root
+                entries = sorted(self._entries.values(), key=lambda entry: entry.path.lower())
+            if root is None:
+                return
+            data = {"version": self.INDEX_VERSION, "root": str(root), "files": [asdict(entry) for entry in entries]}
+            self.file_manager.write_json(self._index_path(root), data)
@@ -0,0 +1,217 @@
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Condition, Lock, Thread
+from typing import List, Optional, Tuple
+import hashlib
+import re
+import sqlite3
+
+from src.services.file_manager import FileManager, app_cache_dir
+from src.services.marp_engine import MarpEngine
+from src.services.project_index import ProjectFileEntry
+
+_HEADING_PATTERN = re.compile(r'^ {0,3}#{1,6}\s+(.+?)\s*#*\s*$', re.MULTILINE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL);
+CREATE VIRTUAL TABLE IF NOT EXISTS slides USING fts5(path UNINDEXED, slide UNINDEXED, title, content, tokenize='{tokenizer}');
+"""
+
+
+@dataclass
+class SearchHit:
+    path: str  # Relative to the project root, as in ProjectFileEntry
+    slide_index: int  # 1-based
+    title: str
+    snippet: str
+    line: int  # 0-based line of the first match within the slide content
+    score: float  # bm25; lower is better
+
+
+@dataclass
+class SearchSyncJob:
+    generation: int
+    entries: List[ProjectFileEntry]
+
+
+class ProjectSearchIndex:
+    """プロジェクト内の全 Markdown ファイルに対する全文検索インデックス（SQLite FTS5）
+
+    スライド単位で行を持ち、bm25 で順位付けしたヒットをスライド番号と抜粋付きで返す。
+    ファイルごとの (更新時刻, サイズ) を記録し、ProjectIndex の走査結果と比べて
+    変わったファイルだけを読み直す。トークナイザは日本語の部分一致にも使える trigram を使い、
+    3文字未満の語は LIKE で探す。
+    """
+
+    SYNC_BATCH_SIZE = 50  # Files per transaction; searches wait for at most one batch
+    SNIPPET_TOKENS = {"trigram": 40, "unicode61": 12}  # trigram tokens are single characters wide
+
+    def __init__(self, marp_engine: MarpEngine, file_manager: FileManager):
+        self.marp_engine = marp_engine
+        self.file_manager = file_manager
+        self.root: Optional[Path] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._is_trigram = False
+        self._lock = Lock()  # One connection, shared by the sync worker and the Tk thread
+        self._condition = Condition()
+        self._pending_job: Optional[SearchSyncJob] = None
+        self._generation = 0
+        self._worker: Optional[Thread] = None
+
+    def open(self, root: Path) -> bool:
+        """プロジェクトの検索インデックスを開く（無ければ作る）"""
+        self.close()
+        path = app_cache_dir("search") / f"{hashlib.sha1(str(root.resolve()).encode('utf-8')).hexdigest()}.sqlite3"
+        try:
+            connection = sqlite3.connect(str(path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            try:
+                connection.executescript(_SCHEMA.format(tokenizer="trigram"))
+            except sqlite3.OperationalError:
+                connection.executescript(_SCHEMA.format(tokenizer="unicode61"))  # SQLite < 3.34
+            row = connection.execute("SELECT sql FROM sqlite_master WHERE name = 'slides'").fetchone()
+            self._is_trigram = bool(row and "trigram" in row[0])
+        except sqlite3.Error as e:
+            print(f"Full-text search unavailable: {e}")
+            return False
+        with self._lock:
+            self._connection = connection
+            self.root = root
+        return True
+
+    def close(self) -> None:
+        with self._condition:
+            self._generation += 1
+            self._pending_job = None
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = None
+            self.root = None
+
+    def sync(self, entries: List[ProjectFileEntry]) -> None:
+        """ProjectIndex の走査結果に合わせて、変更・追加されたファイルを索引し直し、消えたファイルを除く"""
+        if self._connection is None:
+            return
+        with self._condition:
+            self._generation += 1
+            self._pending_job = SearchSyncJob(self._generation, list(entries))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, name="project-search-indexer", daemon=True)
+                self._worker.start()
+            self._condition.notify()
+
+    def _next_job(self) -> SearchSyncJob:
+        with self._condition:
+            while self._pending_job is None:
+                self._condition.wait()
+            job, self._pending_job = self._pending_job, None
+            return job
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            try:
+                self._sync(job)
+            except Exception as e:
+                print(f"Error updating search index: {e}")
+
+    def _sync(self, job: SearchSyncJob) -> None:
+        with self._lock:
+            if self._connection is None:
+                return
+            root = self.root
+            indexed = {path: (mtime_ns, size) for path, mtime_ns, size in
+                       self._connection.execute("SELECT path, mtime_ns, size FROM files")}
+        changed = [entry for entry in job.entries if indexed.get(entry.path) != (entry.mtime_ns, entry.size)]
+        removed = set(indexed) - {entry.path for entry in job.entries}
+        if removed:
+            with self._lock:
+                if self._connection is None or self.root != root:
+                    return
+                with self._connection:
+                    for path in removed:
+                        self._delete(path)
+
+        for start in range(0, len(changed), self.SYNC_BATCH_SIZE):
+            if job.generation != self._generation:
+                return  # A newer scan result supersedes this one
+            # Files are read and split outside the lock so searches are not held up by disk I/O.
+            batch = [(entry, self._read_slides(root / entry.path)) for entry in changed[start:start + self.SYNC_BATCH_SIZE]]
+            with self._lock:
+                if self._connection is None or self.root != root:
+                    return
+                with self._connection:
+                    for entry, slides in batch:
+                        self._delete(entry.path)
+                        self._connection.executemany(
+                            "INSERT INTO slides (path, slide, title, content) VALUES (?, ?, ?, ?)",
+                            [(entry.path, index, title, content) for index, (title, content) in enumerate(slides, 1)])
+                        self._connection.execute("INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                                                 (entry.path, entry.mtime_ns, entry.size))
+
+    def _delete(self, path: str) -> None:
+        self._connection.execute("DELETE FROM slides WHERE path = ?", (path,))
+        self._connection.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def _read_slides(self, path: Path) -> List[Tuple[str, str]]:
+        try:
+            text = self.file_manager.read_text(path)
+        except (OSError, LookupError) as e:
+            print(f"Error indexing {path} for search: {e}")
+            return []
+        slides = []
+        for slide in self.marp_engine.iter_slides([text]):
+            heading = _HEADING_PATTERN.search(slide.content)
+            slides.append((heading.group(1) if heading else "", slide.content))
+        return slides
+
+    def search(self, query: str, limit: int = 100) -> List[SearchHit]:
+        """クエリの全ての語を含むスライドを関連度順に返す"""
+        terms = [term for term in query.split() if term]
+        if not terms:
+            return []
+        with self._lock:
+            if self._connection is None:
+                return []
+            try:
+                if self._is_trigram and any(len(term) < 3 for term in terms):
+                    rows = self._search_like(terms, limit)
+                else:
+                    rows = self._search_fts(terms, limit)
+            except sqlite3.Error as e:
+                print(f"Error searching: {e}")
+                return []
+        return [SearchHit(path, slide, title, snippet, self._first_match_line(content, terms), score)
+                for path, slide, title, snippet, content, score in rows]
+
+    def _search_fts(self, terms: List[str], limit: int) -> List[tuple]:
+        # Each term is quoted so that FTS5 operators typed by the user are matched literally.
+        expression = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        return self._connection.execute(
+            "SELECT path, slide, title, snippet(slides, 3, '[', ']', '...', ?), content, bm25(slides, 0, 0, 5.0, 1.0) AS score "
+            "FROM slides WHERE slides MATCH ? ORDER BY score LIMIT ?",
+            (self.SNIPPET_TOKENS["trigram" if self._is_trigram else "unicode61"], expression, limit)).fetchall()
+
+    def _search_like(self, terms: List[str], limit: int) -> List[tuple]:
+        # trigram needs at least three characters per term; short terms fall back to a scan.
+        conditions = " AND ".join("content LIKE ? ESCAPE '\\'" for _ in terms)
+        patterns = ["%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" for term in terms]
+        rows = self._connection.execute(
+            f"SELECT path, slide, title, content FROM slides WHERE {conditions} ORDER BY path, slide LIMIT ?",
+            (*patterns, limit)).fetchall()
+        return [(path, slide, title, self._snippet(content, terms[0]), content, 0.0) for path, slide, title, content in rows]
+
+    def _snippet(self, content: str, term: str, context: int = 40) -> str:
+        position = content.lower().find(term.lower())
+        if position < 0:
+            return content[:context * 2].replace('\n', ' ')
+        start, end = max(0, position - context), position + len(term)
+        text = f"{content[start:position]}[{content[position:end]}]{content[end:end + context]}".replace('\n', ' ')
+        return ("..." if start > 0 else "") + text + ("..." if end + context < len(content) else "")
+
+    def _first_match_line(self, content: str, terms: List[str]) -> int:
+        lowered = content.lower()
+        positions = [position for position in (lowered.find(term.lower()) for term in terms) if position >= 0]
+        return content.count('\n', 0, min(positions)) if positions else 0
@@ -0,0 +1,439 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+import time
+
+from PIL import Image
+from playwright.sync_api import Error as PlaywrightError, sync_playwright
+
+from src.models.app_state import SlideData
+from src.models.encoded_image import EncodedImage, Thumbnail
+from src.services.marp_engine import MarpEngine
+
+SlideRenderedCallback = Callable[[int, int, Thumbnail], None]  # (generation, slide position, thumbnail)
+RenderFinishedCallback = Callable[[int, float, int], None]  # (generation, seconds spent rendering, slides rendered)
+SlideMeasuredCallback = Callable[[int, int, int, int], None]  # (generation, slide position, overflow width, overflow height)
+SlideExportedCallback = Callable[[int, int, bytes], None]  # (generation, slide position, full-size PNG)
+ExportFinishedCallback = Callable[[int, int, Optional[str]], None]  # (generation, slides exported, error message)
+BrowserTask = Callable[[Any], None]  # Called on the render worker with its launched browser
+T = TypeVar("T")
+
+LANE_PRESENTER = "presenter"
+LANE_THUMBNAILS = "thumbnails"
+LANE_GALLERY = "gallery"
+LANE_EXPORT = "export"
+LANES = (LANE_PRESENTER, LANE_THUMBNAILS, LANE_GALLERY, LANE_EXPORT)  # Highest priority first
+
+
+@dataclass
+class RenderJob:
+    generation: int
+    slides: List[SlideData]
+    theme_name: str
+    aspect_ratio: str
+    order: List[int]  # 0-based slide positions, highest priority first
+    thumbnail_width: int  # Device pixels, already including the display scaling
+    on_slide_rendered: SlideRenderedCallback
+    on_finished: Optional[RenderFinishedCallback] = None
+    on_slide_measured: Optional[SlideMeasuredCallback] = None
+    cache_namespace: int = 0  # Document whose cache the images belong to
+    lane: str = LANE_THUMBNAILS
+
+
+@dataclass
+class ExportJob:
+    generation: int
+    slides: List[SlideData]
+    theme_name: str
+    aspect_ratio: str
+    on_slide_exported: SlideExportedCallback
+    on_finished: ExportFinishedCallback
+    lane: str = LANE_EXPORT
+
+
+@dataclass
+class BrowserJob:
+    generation: int
+    run: BrowserTask
+    lane: str = LANE_GALLERY
+
+
+class _ImageCache:
+    """Rendered images with their measured overflow, split into per-document namespaces.
+
+    Namespaces are ordered by their last job, least recent first, and each one by its own LRU order.
+    Used only by the worker thread.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._namespaces: "OrderedDict[int, OrderedDict[str, Tuple[Thumbnail, Tuple[int, int]]]]" = OrderedDict()
+        self.count = 0
+
+    def touch(self, namespace: int) -> None:
+        """Marks the namespace as the most recently used document."""
+        if namespace not in self._namespaces:
+            self._namespaces[namespace] = OrderedDict()
+        self._namespaces.move_to_end(namespace)
+
+    def drop(self, namespace: int) -> None:
+        self.count -= len(self._namespaces.pop(namespace, ()))
+
+    def get(self, namespace: int, key: str) -> Optional[Tuple[Thumbnail, Tuple[int, int]]]:
+        cache = self._namespaces.get(namespace)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            cache.move_to_end(key)
+        return cached
+
+    def put(self, namespace: int, key: str, image: Thumbnail, overflow: Tuple[int, int]) -> None:
+        cache = self._namespaces.get(namespace)
+        if cache is None:
+            # Seeded for a document with no job yet; it ranks as least recently used.
+            cache = self._namespaces[namespace] = OrderedDict()
+            self._namespaces.move_to_end(namespace, last=False)
+        if key not in cache:
+            self.count += 1
+        cache[key] = (image, overflow)
+        cache.move_to_end(key)
+        while self.count > self.capacity:
+            # Documents not shown for the longest time give up their images first.
+            evicted_namespace, evicted_cache = next(iter(self._namespaces.items()))
+            evicted_cache.popitem(last=False)
+            self.count -= 1
+            if not evicted_cache:
+                del self._namespaces[evicted_namespace]
+
+
+class RenderScheduler:
+    """スライドの画像をバックグラウンドで優先度順に描画し、1枚ずつ通知する
+
+    Playwright の sync API はスレッドに紐づくため、ブラウザは専用のワーカースレッドが
+    保持し続ける。ジョブはレーン (発表者ビュー・サムネイル・テーマギャラリー・画像エクスポート) ごとに1つだけ持ち、
+    新しいジョブが投入されると同じレーンの古いジョブは次のスライドの前で破棄される。ワーカーは
+    1枚描画するたびに優先度の高いレーンから次の1枚を選ぶので、発表者ビューの前後のスライドは
+    サムネイルより先に、サムネイルは長いエクスポートの途中でも先に描かれる。ブラウザは全レーンで1つ。
+    サムネイルは Chromium のデバイススケールで最初からパネル幅に合わせて描画し、PNG のまま
+    (EncodedImage) キャッシュする。デコードは画面に表示する時にだけ行う。
+    スクリーンショットと同じページで測ったレイアウトのはみ出し量も画像と一緒に保持し、通知する。
+    キャッシュは文書（タブ）ごとの名前空間に分け、上限を超えたら最も長く使われていない文書の
+    画像から捨てる。裏のタブを何枚開いても、表示中の文書のサムネイルが追い出されることはない。
+    発表者ビューの大きな画像は別の小さなキャッシュに置き、サムネイルを追い出さない。
+    """
+
+    PREFETCH_BATCH = 32  # Cache misses whose HTML is rendered together, in parallel, ahead of their screenshots
+
+    def __init__(self, marp_engine: MarpEngine, cache_size: int = 512, presenter_cache_size: int = 32):
+        self.marp_engine = marp_engine
+        self._caches: Dict[str, _ImageCache] = {LANE_THUMBNAILS: _ImageCache(cache_size),
+                                                LANE_PRESENTER: _ImageCache(presenter_cache_size)}
+        self._condition = Condition()
+        self._pending_jobs: Dict[str, object] = {}  # Lane -> job submitted but not yet picked up by the worker
+        self._seeded: List[Tuple[int, str, Thumbnail, Tuple[int, int]]] = []  # Rendered elsewhere, added by the worker
+        self._dropped: List[int] = []  # Namespaces of closed documents, released by the worker
+        self._reorders: Dict[str, Tuple[int, List[int]]] = {}  # Lane -> (generation, new order) for its current job
+        self._generations: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._worker: Optional[Thread] = None
+        self._is_shutting_down = False
+        self._playwright = None  # Owned by the worker thread
+        self._browser = None
+
+    @property
+    def generation(self) -> int:
+        return self._generations[LANE_THUMBNAILS]
+
+    @property
+    def presenter_generation(self) -> int:
+        return self._generations[LANE_PRESENTER]
+
+    @property
+    def export_generation(self) -> int:
+        return self._generations[LANE_EXPORT]
+
+    def submit(self, slides: List[SlideData], theme_name: str, aspect_ratio: str, order: List[int],
+               thumbnail_width: int,
+               on_slide_rendered: SlideRenderedCallback,
+               on_finished: Optional[RenderFinishedCallback] = None,
+               on_slide_measured: Optional[SlideMeasuredCallback] = None,
+               cache_namespace: int = 0,
+               lane: str = LANE_THUMBNAILS) -> int:
+        """描画ジョブを投入し、そのジョブの世代番号を返す（同じレーンで実行中のジョブは破棄される）
+
+        lane に LANE_PRESENTER を渡すと、発表者ビュー用の画像としてサムネイルより先に描画する。
+        """
+        with self._condition:
+            generation = self._next_generation(lane)
+            self._queue(RenderJob(generation, list(slides), theme_name, aspect_ratio, order, max(1, thumbnail_width),
+                                  on_slide_rendered, on_finished, on_slide_measured, cache_namespace, lane))
+            return generation
+
+    def reprioritize(self, order: List[int], lane: str = LANE_THUMBNAILS) -> None:
+        """実行中（または未着手）のジョブの描画順だけを変える（描画済みのスライドはやり直さない）
+
+        スライドの移動のように文書が変わっていない時は、ジョブを投入し直さずにこれを使う。
+        """
+        with self._condition:
+            self._reorders[lane] = (self._generations[lane], list(order))
+
+    def export(self, slides: List[SlideData], theme_name: str, aspect_ratio: str,
+               on_slide_exported: SlideExportedCallback, on_finished: ExportFinishedCallback) -> int:
+        """全スライドをフル解像度の PNG に描画するジョブを投入し、世代番号を返す
+
+        サムネイルの描画が待っていればそちらを先に進め、エクスポートは空いた合間に1枚ずつ進める。
+        """
+        with self._condition:
+            generation = self._next_generation(LANE_EXPORT)
+            self._queue(ExportJob(generation, list(slides), theme_name, aspect_ratio, on_slide_exported, on_finished))
+            return generation
+
+    def run_with_browser(self, run: BrowserTask, lane: str = LANE_GALLERY) -> int:
+        """ワーカーのブラウザを使う処理を投入し、世代番号を返す（同じレーンの未実行の処理は破棄される）
+
+        テーマギャラリーのように独自の描画をする機能も、ブラウザを自分で起動せずにここを通す。
+        """
+        with self._condition:
+            generation = self._next_generation(lane)
+            self._queue(BrowserJob(generation, run, lane))
+            return generation
+
+    def store_image(self, slide: SlideData, theme_name: str, aspect_ratio: str, thumbnail_width: int,
+                    image: Thumbnail, overflow: Tuple[int, int], cache_namespace: int = 0) -> None:
+        """別の場所で描画済みの画像をキャッシュに加える（次のジョブはそのスライドを描画せずに通知する）"""
+        key = f"{self.marp_engine.slide_render_key(slide, theme_name, aspect_ratio)}@{thumbnail_width}"
+        with self._condition:
+            self._seeded.append((cache_namespace, key, image, overflow))
+
+    def drop_cache(self, cache_namespace: int) -> None:
+        """閉じた文書の画像をキャッシュから捨てる"""
+        with self._condition:
+            self._seeded = [seeded for seeded in self._seeded if seeded[0] != cache_namespace]
+            self._dropped.append(cache_namespace)
+
+    def cancel(self, lane: str = LANE_THUMBNAILS) -> None:
+        with self._condition:
+            self._next_generation(lane)
+            self._pending_jobs.pop(lane, None)
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._is_shutting_down = True
+            for lane in LANES:
+                self._next_generation(lane)
+            self._pending_jobs.clear()
+            self._condition.notify()
+
+    def _next_generation(self, lane: str) -> int:
+        self._generations[lane] += 1
+        return self._generations[lane]
+
+    def _queue(self, job) -> None:
+        self._pending_jobs[job.lane] = job
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = Thread(target=self._run, name="slide-render-worker", daemon=True)
+            self._worker.start()
+        self._condition.notify()
+
+    def _is_stale(self, job) -> bool:
+        return job.generation != self._generations[job.lane] or self._is_shutting_down
+
+    def _take_jobs(self, wait: bool) -> Optional[list]:
+        """Returns the newly submitted jobs (waiting for one if nothing is in progress), or None on shutdown."""
+        with self._condition:
+            while wait and not self._pending_jobs and not self._is_shutting_down:
+                self._condition.wait()
+            if self._is_shutting_down:
+                return None
+            jobs = [self._pending_jobs.pop(lane) for lane in LANES if lane in self._pending_jobs]
+            seeded, self._seeded = self._seeded, []
+            dropped, self._dropped = self._dropped, []
+        # The cache belongs to the worker, so changes requested from other threads are only made here.
+        for namespace in dropped:
+            for cache in self._caches.values():
+                cache.drop(namespace)
+        for job in jobs:
+            if isinstance(job, RenderJob):
+                self._caches[job.lane].touch(job.cache_namespace)
+        for namespace, key, image, overflow in seeded:
+            self._caches[LANE_THUMBNAILS].put(namespace, key, image, overflow)
+        return jobs
+
+    def _take_reorder(self, job: RenderJob) -> Optional[List[int]]:
+        with self._condition:
+            generation, order = self._reorders.pop(job.lane, (None, None))
+        return order if generation == job.generation else None
+
+    def _cache_get(self, job: RenderJob, key: str) -> Optional[Tuple[Thumbnail, Tuple[int, int]]]:
+        return self._caches[job.lane].get(job.cache_namespace, key)
+
+    def _cache_key(self, slide: SlideData, job: RenderJob) -> str:
+        return f"{self.marp_engine.slide_render_key(slide, job.theme_name, job.aspect_ratio)}@{job.thumbnail_width}"
+
+    def _prefetch_documents(self, job: RenderJob, order: List[int]) -> Dict[int, str]:
+        """Renders the HTML of the next batch of uncached slides in parallel (e.g. after a theme switch)."""
+        parallel_renderer = self.marp_engine.parallel_renderer
+        if parallel_renderer is None:
+            return {}
+        batch = []
+        for position in order:
+            if len(batch) == self.PREFETCH_BATCH or self._is_stale(job):
+                break
+            if 0 <= position < len(job.slides) and self._cache_get(job, self._cache_key(job.slides[position], job)) is None:
+                batch.append(position)
+        if not parallel_renderer.should_parallelize(len(batch)):
+            return {}
+        documents = self.marp_engine.render_slide_documents([job.slides[p] for p in batch], job.theme_name, job.aspect_ratio)
+        return dict(zip(batch, documents))
+
+    def _launch_browser(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        if self._browser is None:
+            self._browser = self._playwright.chromium.launch()
+        return self._browser
+
+    def _discard_dead_browser(self) -> bool:
+        # True when Chromium (or the Playwright driver) has gone away; the next launch then starts both afresh.
+        if self._browser is None:
+            return False
+        try:
+            if self._browser.is_connected():
+                return False
+        except Exception:
+            pass
+        print("Chromium disconnected; relaunching it on the render worker")
+        try:
+            self._browser.close()
+            if self._playwright is not None:
+                self._playwright.stop()
+        except Exception:
+            pass
+        self._playwright = self._browser = None
+        return True
+
+    def _with_browser(self, run: Callable[[Any], T]) -> T:
+        # A Playwright error from a dead browser is retried once with a relaunched one; other errors propagate.
+        try:
+            return run(self._launch_browser())
+        except PlaywrightError:
+            if not self._discard_dead_browser():
+                raise
+        return run(self._launch_browser())
+
+    def _render_thumbnail(self, slide: SlideData, job: RenderJob,
+                          slide_html: Optional[str] = None) -> Tuple[EncodedImage, Tuple[int, int]]:
+        slide_width, slide_height = self.marp_engine.slide_dimensions(job.aspect_ratio)
+        scale = job.thumbnail_width / slide_width
+        capture = self._with_browser(lambda browser: self.marp_engine.capture_slide(
+            browser, slide, job.theme_name, job.aspect_ratio, scale=scale, slide_html=slide_html))
+        image = EncodedImage.from_png(capture.png_data)
+        thumbnail_size = (job.thumbnail_width, max(1, round(slide_height * scale)))
+        if image.size != thumbnail_size:
+            # Only rounding in the device scale gets here; the common case keeps Chromium's PNG untouched.
+            image = EncodedImage.encode(image.decode().resize(thumbnail_size, Image.LANCZOS))
+        return image, (capture.overflow_width, capture.overflow_height)
+
+    def _thumbnail_steps(self, job: RenderJob) -> Iterator[None]:
+        """Notifies the job's slides in priority order, yielding after each one so other lanes can go first."""
+        render_seconds = 0.0  # Cache hits cost nothing; only actual renders are reported
+        rendered_count = 0
+        prefetched: Dict[int, str] = {}
+        prefetched_until = 0  # Index into order up to which prefetching was already attempted
+        order, order_index = job.order, 0
+        notified = set()
+        while order_index < len(order):
+            if self._is_stale(job):
+                return
+            reordered = self._take_reorder(job)
+            if reordered is not None:
+                # The user moved to another slide: continue in the new order, skipping what is already shown.
+                order, order_index, prefetched_until = [p for p in reordered if p not in notified], 0, 0
+                continue
+            position = order[order_index]
+            order_index += 1
+            if not 0 <= position < len(job.slides) or position in notified:
+                continue
+            slide = job.slides[position]
+            key = self._cache_key(slide, job)
+            cached = self._cache_get(job, key)
+            if cached is None:
+                started = time.perf_counter()
+                if order_index > prefetched_until:
+                    prefetched.update(self._prefetch_documents(job, order[order_index - 1:]))
+                    prefetched_until = order_index - 1 + self.PREFETCH_BATCH
+                try:
+                    cached = self._render_thumbnail(slide, job, prefetched.pop(position, None))
+                except Exception as e:
+                    print(f"Error rendering slide {slide.index}: {e}")
+                    continue
+                finally:
+                    render_seconds += time.perf_counter() - started
+                rendered_count += 1
+                self._caches[job.lane].put(job.cache_namespace, key, *cached)
+            image, overflow = cached
+            notified.add(position)
+            job.on_slide_rendered(job.generation, position, image)
+            if job.on_slide_measured:
+                job.on_slide_measured(job.generation, position, *overflow)
+            yield
+        if job.on_finished and not self._is_stale(job):
+            job.on_finished(job.generation, render_seconds, rendered_count)
+
+    def _export_steps(self, job: ExportJob) -> Iterator[None]:
+        """Screenshots every slide at full size, one per step; the HTML is rendered a batch at a time."""
+        exported = 0
+        try:
+            for batch_start in range(0, len(job.slides), self.PREFETCH_BATCH):
+                batch = job.slides[batch_start:batch_start + self.PREFETCH_BATCH]
+                documents = self.marp_engine.render_slide_documents(batch, job.theme_name, job.aspect_ratio)
+                for position, (slide, slide_html) in enumerate(zip(batch, documents), start=batch_start):
+                    yield
+                    if self._is_stale(job):
+                        return
+                    png_data = self._with_browser(lambda browser: self.marp_engine.screenshot_slide(
+                        browser, slide, job.theme_name, job.aspect_ratio, slide_html=slide_html))
+                    job.on_slide_exported(job.generation, position, png_data)
+                    exported += 1
+        except Exception as e:
+            if not self._is_stale(job):
+                job.on_finished(job.generation, exported, str(e))
+            return
+        if not self._is_stale(job):
+            job.on_finished(job.generation, exported, None)
+
+    def _browser_steps(self, job: BrowserJob) -> Iterator[None]:
+        if not self._is_stale(job):
+            try:
+                self._with_browser(job.run)
+            except Exception as e:
+                print(f"Error in background render task: {e}")
+        yield
+
+    def _steps(self, job) -> Iterator[None]:
+        if isinstance(job, RenderJob):
+            return self._thumbnail_steps(job)
+        if isinstance(job, ExportJob):
+            return self._export_steps(job)
+        return self._browser_steps(job)
+
+    def _run(self) -> None:
+        in_progress: Dict[str, Iterator[None]] = {}  # Lane -> steps of its current job
+        try:
+            while True:
+                jobs = self._take_jobs(wait=not in_progress)
+                if jobs is None:
+                    break
+                for job in jobs:
+                    # Replaces the lane's previous job, which is abandoned between two slides.
+                    in_progress[job.lane] = self._steps(job)
+                lane = next(lane for lane in LANES if lane in in_progress)
+                try:
+                    next(in_progress[lane])
+                except StopIteration:
+                    del in_progress[lane]
+        finally:
+            if self._browser is not None:
+                self._browser.close()
+            if self._playwright is not None:
+                self._playwright.stop()
+            self._playwright = self._browser = None
@@ -0,0 +1,408 @@
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Full, Queue
+from threading import Event, Lock, Thread, current_thread
+from typing import Deque, Dict, List, Optional
+import hashlib
+import io
+import itertools
+import json
+import os
+import socketserver
+import time
+import zipfile
+
+from playwright.sync_api import sync_playwright
+
+from src.services.marp_engine import MarpEngine
+
+OUTPUT_FORMATS = {"html": "text/html; charset=utf-8", "png": "image/png", "pdf": "application/pdf"}
+ZIP_CONTENT_TYPE = "application/zip"  # PNG output of a whole deck
+
+
+class ServiceBusyError(RuntimeError):
+    """ジョブキューが満杯（呼び出し側は時間をおいて再試行する）"""
+
+
+@dataclass
+class RenderRequest:
+    markdown: str
+    theme_name: str = "default"
+    aspect_ratio: str = "16:9"
+    output_format: str = "html"  # "html", "png" or "pdf"
+    slide: Optional[int] = None  # 1-based; with "png", a single image instead of a zip of all slides
+
+    def cache_key(self) -> str:
+        digest = hashlib.sha1(self.markdown.encode('utf-8'))
+        digest.update(f"\0{self.theme_name}\0{self.aspect_ratio}\0{self.output_format}\0{self.slide}".encode('utf-8'))
+        return digest.hexdigest()
+
+
+@dataclass
+class RenderMetrics:
+    job_id: int
+    output_format: str
+    status: str = "queued"  # queued, done, failed, expired
+    slide_count: int = 0
+    queued_ms: float = 0.0  # Waiting for a worker
+    render_ms: float = 0.0
+    output_bytes: int = 0
+    is_cache_hit: bool = False
+    worker: str = ""
+    error: Optional[str] = None
+
+
+@dataclass
+class RenderResult:
+    content_type: str
+    body: bytes
+    metrics: RenderMetrics
+
+
+@dataclass
+class RenderTicket:
+    request: RenderRequest
+    metrics: RenderMetrics
+    cache_key: str
+    deadline: float  # time.monotonic() after which the job is abandoned
+    enqueued_at: float = field(default_factory=time.monotonic)
+    done: Event = field(default_factory=Event)
+    result: Optional[RenderResult] = None
+
+    def wait(self, timeout: Optional[float] = None) -> RenderResult:
+        """結果を待つ。失敗したジョブは RuntimeError、時間切れは TimeoutError を送出する"""
+        if not self.done.wait(timeout):
+            raise TimeoutError(f"Render job {self.metrics.job_id} did not finish in time")
+        if self.result is None:
+            if self.metrics.status == "expired":
+                raise TimeoutError(self.metrics.error)
+            raise RuntimeError(self.metrics.error or "Render failed")
+        return self.result
+
+
+class RenderService:
+    """GUI を使わずに Markdown を HTML / PNG / PDF に変換するレンダリングサービス
+
+    ジョブは上限付きのキューに入れ、満杯なら ServiceBusyError で即座に断る（バックプレッシャー）。
+    各ワーカースレッドは Chromium を起動したまま保持し（Playwright の sync API はスレッドに紐づく）、
+    ジョブごとの待ち時間・描画時間などを RenderMetrics として記録する。
+    結果は入力（Markdown・テーマ・比率・形式）のハッシュをキーにメモリにキャッシュし、
+    同じ入力の再要求はブラウザを使わずに返す。ワーカーは渡された MarpEngine を共有する
+    （エンジンはスレッドごとにパーサーを持ち、スライド単位の HTML の断片キャッシュは全ワーカーで効く）。
+    """
+
+    RECENT_METRICS = 100
+
+    def __init__(self, marp_engine: MarpEngine, workers: int = 2, queue_size: int = 16,
+                 job_timeout: float = 60.0, cache_size: int = 64):
+        self.marp_engine = marp_engine
+        self.workers = max(1, workers)
+        self.job_timeout = job_timeout
+        self.cache_size = cache_size
+        self._queue: "Queue[Optional[RenderTicket]]" = Queue(maxsize=queue_size)
+        self._cache: "OrderedDict[str, RenderResult]" = OrderedDict()
+        self._lock = Lock()
+        self._job_ids = itertools.count(1)
+        self._threads: List[Thread] = []
+        self._recent: Deque[RenderMetrics] = deque(maxlen=self.RECENT_METRICS)
+        self._counters: Dict[str, int] = {"accepted": 0, "rejected": 0, "done": 0, "failed": 0, "expired": 0,
+                                          "cache_hits": 0, "in_flight": 0}
+        self._render_ms_total = 0.0
+
+    def start(self, warm: bool = True) -> None:
+        """ワーカーを起動する。warm なら最初のジョブを待たずにブラウザを起動しておく"""
+        while len(self._threads) < self.workers:
+            thread = Thread(target=self._run, args=(warm,), name=f"render-service-worker-{len(self._threads) + 1}",
+                            daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)  # Blocks until there is room; workers drain the queue
+        for thread in self._threads:
+            thread.join(timeout=10)
+        self._threads = []
+
+    def submit(self, request: RenderRequest) -> RenderTicket:
+        """ジョブを投入する。キャッシュにあれば完了済みのチケットを返し、キューが満杯なら ServiceBusyError"""
+        if request.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown format '{request.output_format}' (expected one of {', '.join(OUTPUT_FORMATS)})")
+        if request.theme_name not in self.marp_engine.themes:
+            raise ValueError(f"Unknown theme '{request.theme_name}'")
+        if request.aspect_ratio not in ("16:9", "4:3"):
+            raise ValueError(f"Unknown aspect ratio '{request.aspect_ratio}'")
+        # Referenced local images are part of the input; editing one must not return a stale result.
+        cache_key = f"{request.cache_key()}:{self.marp_engine.asset_resolver.fingerprint(request.markdown)}"
+        ticket = RenderTicket(request, RenderMetrics(next(self._job_ids), request.output_format), cache_key,
+                              time.monotonic() + self.job_timeout)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                self._counters["cache_hits"] += 1
+        if cached is not None:
+            ticket.metrics.is_cache_hit = True
+            ticket.metrics.slide_count = cached.metrics.slide_count
+            self._finish(ticket, RenderResult(cached.content_type, cached.body, ticket.metrics))
+            return ticket
+        try:
+            self._queue.put_nowait(ticket)
+        except Full:
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise ServiceBusyError(f"Render queue is full ({self._queue.maxsize} jobs waiting)")
+        with self._lock:
+            self._counters["accepted"] += 1
+        return ticket
+
+    def render(self, request: RenderRequest) -> RenderResult:
+        """submit() して結果を待つ"""
+        return self.submit(request).wait(self.job_timeout)
+
+    def metrics(self) -> dict:
+        """サービス全体の集計と直近のジョブのメトリクス"""
+        with self._lock:
+            rendered = self._counters["done"] - self._counters["cache_hits"]
+            return {
+                **self._counters,
+                "queued": self._queue.qsize(),
+                "workers": self.workers,
+                "average_render_ms": round(self._render_ms_total / rendered, 1) if rendered else 0.0,
+                "recent": [asdict(metrics) for metrics in self._recent],
+            }
+
+    def _finish(self, ticket: RenderTicket, result: Optional[RenderResult], status: str = "done",
+                error: Optional[str] = None) -> None:
+        ticket.metrics.status = status
+        ticket.metrics.error = error
+        ticket.result = result
+        if result is not None:
+            ticket.metrics.output_bytes = len(result.body)
+        with self._lock:
+            self._counters[status] += 1
+            if status == "done" and not ticket.metrics.is_cache_hit:
+                self._render_ms_total += ticket.metrics.render_ms
+            self._recent.append(ticket.metrics)
+        ticket.done.set()
+
+    def _run(self, warm: bool) -> None:
+        playwright = None
+        browser = None
+        try:
+            if warm:
+                playwright = sync_playwright().start()
+                browser = playwright.chromium.launch()
+            while True:
+                ticket = self._queue.get()
+                if ticket is None:
+                    break
+                started = time.monotonic()
+                ticket.metrics.queued_ms = round((started - ticket.enqueued_at) * 1000, 1)
+                ticket.metrics.worker = current_thread().name
+                if started > ticket.deadline:
+                    self._finish(ticket, None, "expired", f"Job {ticket.metrics.job_id} expired after "
+                                                          f"{ticket.metrics.queued_ms:.0f} ms in the queue")
+                    continue
+                with self._lock:
+                    self._counters["in_flight"] += 1
+                try:
+                    if ticket.request.output_format != "html" and browser is None:
+                        if playwright is None:
+                            playwright = sync_playwright().start()
+                        browser = playwright.chromium.launch()
+                    result = self._render(browser, ticket)
+                except TimeoutError as e:
+                    self._finish(ticket, None, "expired", str(e))
+                except Exception as e:
+                    print(f"Error rendering job {ticket.metrics.job_id}: {e}")
+                    self._finish(ticket, None, "failed", str(e))
+                    try:
+                        if browser is not None and not browser.is_connected():
+                            browser = None  # Crashed; the next job launches a fresh one
+                    except Exception:
+                        browser = None
+                else:
+                    ticket.metrics.render_ms = round((time.monotonic() - started) * 1000, 1)
+                    with self._lock:
+                        self._cache[ticket.cache_key] = result
+                        while len(self._cache) > self.cache_size:
+                            self._cache.popitem(last=False)
+                    self._finish(ticket, result)
+                finally:
+                    with self._lock:
+                        self._counters["in_flight"] -= 1
+        finally:
+            if browser is not None:
+                browser.close()
+            if playwright is not None:
+                playwright.stop()
+
+    def _render(self, browser, ticket: RenderTicket) -> RenderResult:
+        marp_engine = self.marp_engine
+        request = ticket.request
+        slides = marp_engine.parse_document(request.markdown).slides
+        ticket.metrics.slide_count = len(slides)
+        if request.output_format == "html":
+            body = "".join(marp_engine.iter_html_export(slides, request.theme_name, request.aspect_ratio))
+            return RenderResult(OUTPUT_FORMATS["html"], body.encode("utf-8"), ticket.metrics)
+        if request.output_format == "pdf":
+            body = marp_engine.render_pdf(browser, slides, request.theme_name, request.aspect_ratio)
+            return RenderResult(OUTPUT_FORMATS["pdf"], body, ticket.metrics)
+
+        if request.slide is not None:
+            if not 1 <= request.slide <= len(slides):
+                raise ValueError(f"Slide {request.slide} is out of range (1-{len(slides)})")
+            png_data = marp_engine.screenshot_slide(browser, slides[request.slide - 1], request.theme_name,
+                                                    request.aspect_ratio)
+            return RenderResult(OUTPUT_FORMATS["png"], png_data, ticket.metrics)
+        archive = io.BytesIO()
+        documents = marp_engine.render_slide_documents(slides, request.theme_name, request.aspect_ratio)
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zip_file:  # PNG is compressed already
+            for slide, slide_html in zip(slides, documents):
+                if time.monotonic() > ticket.deadline:
+                    raise TimeoutError(f"Job {ticket.metrics.job_id} timed out at slide {slide.index} of {len(slides)}")
+                zip_file.writestr(f"slide_{slide.index:03d}.png",
+                                  marp_engine.screenshot_slide(browser, slide, request.theme_name,
+                                                               request.aspect_ratio, slide_html=slide_html))
+        return RenderResult(ZIP_CONTENT_TYPE, archive.getvalue(), ticket.metrics)
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Bursts of clients are answered with 503 by the service, not reset by the kernel
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+        def server_bind(self):
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)  # Left over from a previous run
+            super().server_bind()
+else:
+    _UnixHTTPServer = None  # Windows
+
+
+class RenderServiceServer:
+    """RenderService の HTTP インターフェース（localhost の TCP、または Unix ソケット）
+
+    POST /render  JSON {"markdown", "theme", "aspect_ratio", "format", "slide"} -> 描画結果
+    GET  /metrics サービスの集計と直近のジョブ
+    GET  /health  稼働確認
+    キューが満杯なら 503 (Retry-After 付き)、時間切れは 504 を返す。
+    """
+
+    MAX_REQUEST_BYTES = 16 * 1024 * 1024
+    RETRY_AFTER_SECONDS = 1
+
+    def __init__(self, service: RenderService, host: str = "127.0.0.1", port: int = 0,
+                 unix_socket: Optional[str] = None):
+        self.service = service
+        self.unix_socket = unix_socket
+        if unix_socket:
+            if _UnixHTTPServer is None:
+                raise ValueError("Unix sockets are not supported on this platform")
+            self._server = _UnixHTTPServer(unix_socket, self._make_handler())
+        else:
+            self._server = _TCPHTTPServer((host, port), self._make_handler())
+
+    @property
+    def address(self) -> str:
+        if self.unix_socket:
+            return f"unix:{self.unix_socket}"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self.unix_socket:
+            try:
+                os.unlink(self.unix_socket)
+            except OSError:
+                pass
+
+    def _make_handler(self):
+        server = self
+
+        class RenderRequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, so pipelines can reuse one connection
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send_json(200, {"status": "ok"})
+                elif self.path == "/metrics":
+                    self._send_json(200, server.service.metrics())
+                else:
+                    self._send_json(404, {"error": "Not found"})
+
+            def do_POST(self):
+                if self.path != "/render":
+                    self._send_json(404, {"error": "Not found"})
+                    return
+                length = None
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    if length < 0:
+                        raise ValueError(f"invalid Content-Length {length}")
+                    if length > server.MAX_REQUEST_BYTES:
+                        self.close_connection = True  # The body is not read
+                        self._send_json(413, {"error": f"Request body exceeds {server.MAX_REQUEST_BYTES} bytes"})
+                        return
+                    data = json.loads(self.rfile.read(length) or b"{}")
+                    if not isinstance(data, dict):
+                        raise ValueError("the body must be a JSON object")
+                    slide = data.get("slide")
+                    request = RenderRequest(markdown=str(data["markdown"]), theme_name=data.get("theme", "default"),
+                                            aspect_ratio=data.get("aspect_ratio", "16:9"),
+                                            output_format=data.get("format", "html"),
+                                            slide=int(slide) if slide is not None else None)
+                    ticket = server.service.submit(request)
+                except (ValueError, KeyError, TypeError) as e:
+                    if length is None:
+                        self.close_connection = True  # Without a usable length the body cannot be skipped
+                    self._send_json(400, {"error": f"Bad request: {e}"})
+                    return
+                except ServiceBusyError as e:
+                    self._send_json(503, {"error": str(e)}, {"Retry-After": str(server.RETRY_AFTER_SECONDS)})
+                    return
+                try:
+                    result = ticket.wait(max(0.0, ticket.deadline - time.monotonic()))
+                except TimeoutError as e:
+                    self._send_json(504, {"error": str(e)})
+                    return
+                except RuntimeError as e:
+                    self._send_json(500, {"error": str(e)})
+                    return
+                metrics = result.metrics
+                self._send(200, result.content_type, result.body, {
+                    "X-Render-Job": str(metrics.job_id),
+                    "X-Render-Cache": "HIT" if metrics.is_cache_hit else "MISS",
+                    "X-Render-Queue-Ms": str(metrics.queued_ms),
+                    "X-Render-Ms": str(metrics.render_ms),
+                    "X-Render-Slides": str(metrics.slide_count),
+                })
+
+            def _send_json(self, status: int, data: dict, headers: Optional[Dict[str, str]] = None):
+                self._send(status, "application/json", json.dumps(data).encode("utf-8"), headers)
+
+            def _send(self, status: int, content_type: str, body: bytes, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Per-job metrics are available from /metrics instead
+
+        return RenderRequestHandler
@@ -0,0 +1,210 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+import re
+
+try:
+    from re import _parser as _regex_parser  # Python 3.11+
+except ImportError:
+    import sre_parse as _regex_parser
+
+from src.models.document_buffer import DocumentBuffer
+
+_NEWLINE = ord('\n')
+# Character class categories that include '\n'
+_NEWLINE_CATEGORIES = {_regex_parser.CATEGORY_SPACE, _regex_parser.CATEGORY_NOT_DIGIT, _regex_parser.CATEGORY_NOT_WORD,
+                       _regex_parser.CATEGORY_LINEBREAK}
+
+
+def _class_matches_newline(items) -> bool:
+    negated = False
+    matched = False
+    for op, av in items:
+        if op is _regex_parser.NEGATE:
+            negated = True
+        elif op is _regex_parser.LITERAL:
+            matched |= av == _NEWLINE
+        elif op is _regex_parser.RANGE:
+            matched |= av[0] <= _NEWLINE <= av[1]
+        elif op is _regex_parser.CATEGORY:
+            matched |= av in _NEWLINE_CATEGORIES
+    return matched != negated
+
+
+def _can_match_newline(parsed, dotall: bool) -> bool:
+    """解析済みの正規表現のどこかが改行文字にマッチしうるか（判断できない構文は True とみなす）"""
+    for op, av in parsed:
+        if op is _regex_parser.LITERAL:
+            found = av == _NEWLINE
+        elif op is _regex_parser.NOT_LITERAL:
+            found = av != _NEWLINE
+        elif op is _regex_parser.ANY:
+            found = dotall
+        elif op is _regex_parser.IN:
+            found = _class_matches_newline(av)
+        elif op is _regex_parser.SUBPATTERN:
+            add_flags, del_flags = av[1], av[2]
+            group_dotall = (dotall or bool(add_flags & re.DOTALL)) and not del_flags & re.DOTALL
+            found = _can_match_newline(av[-1], group_dotall)
+        elif op in (_regex_parser.MAX_REPEAT, _regex_parser.MIN_REPEAT) or op is getattr(_regex_parser, 'POSSESSIVE_REPEAT', None):
+            found = _can_match_newline(av[2], dotall)
+        elif op is _regex_parser.BRANCH:
+            found = any(_can_match_newline(branch, dotall) for branch in av[1])
+        elif op in (_regex_parser.ASSERT, _regex_parser.ASSERT_NOT):
+            found = _can_match_newline(av[1], dotall)
+        elif op is getattr(_regex_parser, 'ATOMIC_GROUP', None):
+            found = _can_match_newline(av, dotall)
+        elif op is _regex_parser.GROUPREF_EXISTS:
+            found = any(_can_match_newline(branch, dotall) for branch in av[1:] if branch is not None)
+        elif op is _regex_parser.AT:
+            found = False  # Anchors consume nothing
+        else:
+            found = True  # Back-references and anything unknown: assume the worst
+        if found:
+            return True
+    return False
+
+
+def pattern_spans_lines(pattern: re.Pattern) -> bool:
+    """パターンのマッチが改行をまたぎうるか（またぐなら編集のたびに全文を走査し直す）"""
+    try:
+        parsed = _regex_parser.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return True
+    return _can_match_newline(parsed, bool(pattern.flags & re.DOTALL))
+
+
+class TextSearchIndex:
+    """エディタ本文（DocumentBuffer）に対する正規表現検索と、ソート済みのマッチ位置インデックス
+
+    マッチは文字オフセット（開始・終了）の昇順リストで保持し、編集時には編集箇所を
+    含む行の範囲だけを再走査して、それ以降のマッチはオフセットをずらすだけで済ませる。
+    改行をまたいでマッチしうるパターン（\\s、\\n、DOTALL の .、否定の文字クラスなど）は
+    どこまで影響するか分からないため、編集のたびに全文を走査し直す。
+    """
+
+    def __init__(self, document: DocumentBuffer):
+        self.document = document
+        self.pattern: Optional[re.Pattern] = None
+        self._spans_lines = False  # The pattern can match across line breaks
+        self.match_starts: List[int] = []
+        self.match_ends: List[int] = []
+
+    @property
+    def text(self) -> str:
+        return self.document.text
+
+    # --- text -------------------------------------------------------------
+
+    def rebuild(self) -> None:
+        """本文が丸ごと置き換えられた後にマッチを再計算する"""
+        self._rescan_all()
+
+    def apply_edit(self, offset: int, removed_length: int, inserted_length: int) -> None:
+        """DocumentBuffer に適用済みの編集（offset から removed_length 文字を置換）を反映する"""
+        old_end = offset + removed_length
+        delta = inserted_length - removed_length
+
+        if self.pattern is None:
+            return
+        if self._spans_lines:
+            self._rescan_all()
+            return
+
+        # Matches cannot contain a line break, so rescanning from the line before the edit
+        # to the line after it (anchors and lookarounds need the neighbouring lines) is enough.
+        window_start = self.line_start_before(offset)
+        window_end_old = self._line_end_after(offset + inserted_length) - delta
+        first = bisect_right(self.match_ends, window_start)
+        last = bisect_left(self.match_starts, window_end_old)
+        if first < last:
+            window_start = min(window_start, self.match_starts[first])
+            window_end_old = max(window_end_old, self.match_ends[last - 1])
+        window_end = min(len(self.text), window_end_old + delta)
+        window_end = self._line_end(window_end)
+
+        new_starts, new_ends = self._scan(window_start, window_end)
+        tail_starts = [start + delta for start in self.match_starts[last:]]
+        tail_ends = [end + delta for end in self.match_ends[last:]]
+        # Matches found by the rescan may already cover the first shifted ones.
+        skip = bisect_left(tail_starts, new_ends[-1]) if new_ends else 0
+        self.match_starts = self.match_starts[:first] + new_starts + tail_starts[skip:]
+        self.match_ends = self.match_ends[:first] + new_ends + tail_ends[skip:]
+
+    def _line_end_after(self, offset: int) -> int:
+        # End of the line following the one that holds offset.
+        line_end = self._line_end(offset)
+        return line_end if line_end == len(self.text) else self._line_end(line_end + 1)
+
+    def line_start_before(self, offset: int) -> int:
+        """offset の1行前の行頭オフセット"""
+        return self.document.line_start(self.document.line_at(offset) - 1)
+
+    def _line_end(self, offset: int) -> int:
+        end = self.text.find('\n', offset)
+        return len(self.text) if end == -1 else end
+
+    # --- query ------------------------------------------------------------
+
+    def set_query(self, query: str, use_regex: bool = False, match_case: bool = False, whole_word: bool = False) -> Optional[str]:
+        """検索条件を設定する。正規表現が不正な場合はエラーメッセージを返す"""
+        if not query:
+            self.pattern = None
+            self.match_starts, self.match_ends = [], []
+            return None
+        expression = query if use_regex else re.escape(query)
+        if whole_word:
+            expression = rf"\b(?:{expression})\b"
+        flags = re.MULTILINE | (0 if match_case else re.IGNORECASE)
+        try:
+            self.pattern = re.compile(expression, flags)
+        except re.error as e:
+            self.pattern = None
+            self.match_starts, self.match_ends = [], []
+            return str(e)
+        self._spans_lines = pattern_spans_lines(self.pattern)
+        self._rescan_all()
+        return None
+
+    def _rescan_all(self) -> None:
+        if self.pattern is None:
+            self.match_starts, self.match_ends = [], []
+            return
+        self.match_starts, self.match_ends = self._scan(0, len(self.text))
+
+    def _scan(self, start: int, end: int) -> Tuple[List[int], List[int]]:
+        starts: List[int] = []
+        ends: List[int] = []
+        for match in self.pattern.finditer(self.text, start, end):
+            if match.end() > match.start():  # Zero-width matches cannot be highlighted
+                starts.append(match.start())
+                ends.append(match.end())
+        return starts, ends
+
+    # --- lookups ----------------------------------------------------------
+
+    @property
+    def match_count(self) -> int:
+        return len(self.match_starts)
+
+    def match_at(self, match_number: int) -> Tuple[int, int]:
+        return self.match_starts[match_number], self.match_ends[match_number]
+
+    def matches_in_range(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """[start, end) と重なるマッチを返す（表示範囲のみタグ付けするため）"""
+        first = bisect_right(self.match_ends, start)
+        last = bisect_left(self.match_starts, end)
+        return list(zip(self.match_starts[first:last], self.match_ends[first:last]))
+
+    def next_match(self, offset: int) -> Optional[int]:
+        """offset 以降で最初のマッチ番号（末尾を越えたら先頭に戻る）"""
+        if not self.match_starts:
+            return None
+        number = bisect_left(self.match_starts, offset)
+        return number if number < len(self.match_starts) else 0
+
+    def previous_match(self, offset: int) -> Optional[int]:
+        """offset より前の最後のマッチ番号（先頭を越えたら末尾に戻る）"""
+        if not self.match_starts:
+            return None
+        number = bisect_left(self.match_starts, offset) - 1
+        return number if number >= 0 else len(self.match_starts) - 1
@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from threading import Condition, Thread
+from typing import Callable, List, Optional
+import hashlib
+
+from src.models.app_state import SlideData
+from src.services.marp_engine import MarpEngine, ValidationError
+
+ValidationFinishedCallback = Callable[[int, List[ValidationError]], None]  # (generation, errors of the whole document)
+
+
+@dataclass
+class ValidationJob:
+    generation: int
+    slides: List[SlideData]
+    front_matter: str
+    on_finished: ValidationFinishedCallback
+
+
+class SlideValidator:
+    """文書の静的な検証（Markdown・ディレクティブ・画像の参照）をバックグラウンドで行う
+
+    結果はスライド本文と参照画像の更新時刻から求めたハッシュごとにキャッシュするため、
+    編集後に実際に検証し直すのは変更されたスライドだけになる。
+    新しいジョブが投入されると、古いジョブは次のスライドの前で破棄される。
+    レイアウトのはみ出しはここでは調べない（サムネイル描画時に RenderScheduler が測る）。
+    """
+
+    def __init__(self, marp_engine: MarpEngine, cache_size: int = 4096):
+        self.marp_engine = marp_engine
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[ValidationError]]" = OrderedDict()
+        self._condition = Condition()
+        self._pending_job: Optional[ValidationJob] = None
+        self._generation = 0
+        self._worker: Optional[Thread] = None
+        self._is_shutting_down = False
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def submit(self, slides: List[SlideData], front_matter: str, on_finished: ValidationFinishedCallback) -> int:
+        """検証ジョブを投入し、そのジョブの世代番号を返す（実行中のジョブは破棄される）"""
+        with self._condition:
+            self._generation += 1
+            self._pending_job = ValidationJob(self._generation, list(slides), front_matter, on_finished)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, name="slide-validation-worker", daemon=True)
+                self._worker.start()
+            self._condition.notify()
+            return self._generation
+
+    def cancel(self) -> None:
+        with self._condition:
+            self._generation += 1
+            self._pending_job = None
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._is_shutting_down = True
+            self._generation += 1
+            self._pending_job = None
+            self._condition.notify()
+
+    def _is_stale(self, job: ValidationJob) -> bool:
+        return job.generation != self._generation or self._is_shutting_down
+
+    def _next_job(self) -> Optional[ValidationJob]:
+        with self._condition:
+            while self._pending_job is None and not self._is_shutting_down:
+                self._condition.wait()
+            job, self._pending_job = self._pending_job, None
+            return job
+
+    def _cache_key(self, slide: SlideData) -> str:
+        digest = hashlib.sha1(slide.content_digest.encode('ascii'))
+        # A referenced image appearing or disappearing changes the fingerprint.
+        digest.update(self.marp_engine.asset_resolver.fingerprint(slide.content).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _validate_slide(self, slide: SlideData) -> List[ValidationError]:
+        key = self._cache_key(slide)
+        errors = self._cache.get(key)
+        if errors is None:
+            errors = self.marp_engine.validate_slide(slide)
+            self._cache[key] = errors
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        # Results are shared by equal slides at any position; only the reported index differs.
+        return [error if error.slide_index == slide.index else replace(error, slide_index=slide.index) for error in errors]
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            try:
+                errors = self.marp_engine.validate_front_matter(job.front_matter)
+                for slide in job.slides:
+                    if self._is_stale(job):
+                        break
+                    errors.extend(self._validate_slide(slide))
+                else:
+                    job.on_finished(job.generation, errors)
+            except Exception as e:
+                print(f"Error validating document: {e}")
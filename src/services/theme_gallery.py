@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, List, Optional, Tuple
+import io
+
+from PIL import Image
+
+from src.models.app_state import SlideData
+from src.models.encoded_image import EncodedImage
+from src.services.file_manager import app_cache_dir
+from src.services.marp_engine import MarpEngine
+from src.services.render_scheduler import LANE_GALLERY, RenderScheduler
+
+ThemeRenderedCallback = Callable[[int, str, EncodedImage], None]  # (generation, theme name, preview)
+
+
+@dataclass
+class GalleryJob:
+    generation: int
+    slide: SlideData
+    theme_names: List[str]
+    aspect_ratio: str
+    width: int  # Device pixels, already including the display scaling
+    on_theme_rendered: ThemeRenderedCallback
+
+
+class ThemeGallery:
+    """現在のスライドを全てのテーマで描画し、テーマギャラリー用のプレビューとして保持する
+
+    キャッシュに無いテーマは MarpEngine.capture_slide_themes() で1ページにまとめて描画するため、
+    テーマが増えてもページの読み込みと撮影は1回で済む。描画は RenderScheduler のワーカーと
+    ブラウザを借りて行い (ギャラリーのレーンはサムネイルの次)、自分ではブラウザを起動しない。
+    画像は RenderScheduler と同じキー (スライドの描画キー@幅) で PNG のままキャッシュし、
+    テーマを切り替えた直後のサムネイルにも使えるようにする。
+    各テーマの最新のプレビューは Theme.preview_image にも PNG ファイルとして残す。
+    """
+
+    def __init__(self, marp_engine: MarpEngine, render_scheduler: RenderScheduler, cache_size: int = 256):
+        self.marp_engine = marp_engine
+        self.render_scheduler = render_scheduler
+        self.cache_size = cache_size
+        self._image_cache: "OrderedDict[str, Tuple[EncodedImage, Tuple[int, int]]]" = OrderedDict()
+        self._cache_lock = Lock()  # The Tk thread reads the cache when a theme is applied
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def cache_key(self, slide: SlideData, theme_name: str, aspect_ratio: str, width: int) -> str:
+        return f"{self.marp_engine.slide_render_key(slide, theme_name, aspect_ratio)}@{width}"
+
+    def cached_image(self, slide: SlideData, theme_name: str, aspect_ratio: str,
+                     width: int) -> Optional[Tuple[EncodedImage, Tuple[int, int]]]:
+        """描画済みのプレビューとはみ出し量を返す（無ければ None）"""
+        key = self.cache_key(slide, theme_name, aspect_ratio, width)
+        with self._cache_lock:
+            cached = self._image_cache.get(key)
+            if cached is not None:
+                self._image_cache.move_to_end(key)
+            return cached
+
+    def submit(self, slide: SlideData, theme_names: List[str], aspect_ratio: str, width: int,
+               on_theme_rendered: ThemeRenderedCallback) -> int:
+        """スライドを全テーマで描画するジョブを投入し、世代番号を返す（実行中のジョブは破棄される）"""
+        self._generation += 1
+        job = GalleryJob(self._generation, slide, list(theme_names), aspect_ratio, max(1, width), on_theme_rendered)
+        self.render_scheduler.run_with_browser(lambda browser: self._run_job(browser, job), lane=LANE_GALLERY)
+        return self._generation
+
+    def cancel(self) -> None:
+        self._generation += 1
+        self.render_scheduler.cancel(LANE_GALLERY)
+
+    def _is_stale(self, job: GalleryJob) -> bool:
+        return job.generation != self._generation
+
+    def _cache_put(self, key: str, image: EncodedImage, overflow: Tuple[int, int]) -> None:
+        with self._cache_lock:
+            self._image_cache[key] = (image, overflow)
+            self._image_cache.move_to_end(key)
+            while len(self._image_cache) > self.cache_size:
+                self._image_cache.popitem(last=False)
+
+    def _render_missing(self, browser, job: GalleryJob, theme_names: List[str]) -> None:
+        slide_width, slide_height = self.marp_engine.slide_dimensions(job.aspect_ratio)
+        scale = job.width / slide_width
+        png_data, overflows = self.marp_engine.capture_slide_themes(browser, job.slide, theme_names,
+                                                                    job.aspect_ratio, scale=scale)
+        sheet = Image.open(io.BytesIO(png_data)).convert("RGB")
+        row_height = sheet.height / len(theme_names)
+        preview_size = (job.width, max(1, round(slide_height * scale)))
+        for row, (theme_name, overflow) in enumerate(zip(theme_names, overflows)):
+            image = sheet.crop((0, round(row * row_height), sheet.width, round((row + 1) * row_height)))
+            if image.size != preview_size:
+                image = image.resize(preview_size, Image.LANCZOS)
+            preview = EncodedImage.encode(image)
+            self._cache_put(self.cache_key(job.slide, theme_name, job.aspect_ratio, job.width), preview, overflow)
+            self._store_theme_preview(theme_name, preview)
+            if self._is_stale(job):
+                return
+            job.on_theme_rendered(job.generation, theme_name, preview)
+
+    def _store_theme_preview(self, theme_name: str, preview: EncodedImage) -> None:
+        theme = self.marp_engine.themes.get(theme_name)
+        if theme is None:
+            return
+        path = app_cache_dir("themes") / f"{theme_name}.png"
+        try:
+            path.write_bytes(preview.data)
+        except OSError as e:
+            print(f"Error saving preview of theme '{theme_name}': {e}")
+            return
+        theme.preview_image = str(path)
+
+    def _run_job(self, browser, job: GalleryJob) -> None:
+        # Runs on the render worker, between two slides of the lanes that come before the gallery.
+        missing = []
+        for theme_name in job.theme_names:
+            cached = self.cached_image(job.slide, theme_name, job.aspect_ratio, job.width)
+            if cached is None:
+                missing.append(theme_name)
+            elif not self._is_stale(job):
+                job.on_theme_rendered(job.generation, theme_name, cached[0])
+        if not missing or self._is_stale(job):
+            return
+        try:
+            self._render_missing(browser, job, missing)
+        except Exception as e:
+            print(f"Error rendering theme previews: {e}")
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from queue import Queue
+from threading import Lock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from src.models.encoded_image import EncodedImage, Thumbnail
+
+DecodedCallback = Callable[[], None]  # Called from the decode worker once the image is in the cache
+
+
+class ThumbnailDecoder:
+    """EncodedImage のデコードを専用スレッドで行い、デコード済みの画像を少数だけ保持する
+
+    画面に出す行の画像だけをデコードし、Tkスレッドはデコード済みの画素を CTkImage に包むだけにする。
+    保持するのは最近使った capacity 枚だけで、スクロールで見えなくなった行の画像は押し出される。
+    """
+
+    def __init__(self, capacity: int = 96):
+        self.capacity = capacity
+        self._decoded: "OrderedDict[int, Tuple[EncodedImage, Image.Image]]" = OrderedDict()  # id(image) ->
+        self._waiting: Dict[int, Tuple[EncodedImage, List[DecodedCallback]]] = {}  # Queued or being decoded
+        self._lock = Lock()
+        self._queue: "Queue[EncodedImage]" = Queue()
+        self._worker: Optional[Thread] = None
+
+    def get(self, image: Thumbnail) -> Optional[Image.Image]:
+        """デコード済みの画像を返す（まだデコードされていなければ None）"""
+        if not isinstance(image, EncodedImage):
+            return image  # Drafts are drawn with PIL and need no decoding
+        with self._lock:
+            entry = self._decoded.get(id(image))
+            if entry is None or entry[0] is not image:
+                return None
+            self._decoded.move_to_end(id(image))
+            return entry[1]
+
+    def request(self, image: EncodedImage, on_decoded: DecodedCallback) -> None:
+        """バックグラウンドでデコードし、終わったら on_decoded を呼ぶ（同じ画像の要求はまとめる）"""
+        with self._lock:
+            waiting = self._waiting.get(id(image))
+            if waiting is not None and waiting[0] is image:
+                waiting[1].append(on_decoded)
+                return
+            self._waiting[id(image)] = (image, [on_decoded])
+            self._queue.put(image)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, name="thumbnail-decode-worker", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            image = self._queue.get()
+            try:
+                decoded = image.decode()
+            except Exception as e:
+                print(f"Error decoding thumbnail: {e}")
+                decoded = None
+            with self._lock:
+                _, callbacks = self._waiting.pop(id(image), (image, []))
+                if decoded is not None:
+                    # The entry keeps the EncodedImage alive, so its id cannot be reused while cached.
+                    self._decoded[id(image)] = (image, decoded)
+                    self._decoded.move_to_end(id(image))
+                    while len(self._decoded) > self.capacity:
+                        self._decoded.popitem(last=False)
+            if decoded is not None:
+                for callback in callbacks:
+                    callback()
@@ -1,20 +1,47 @@
 
 import customtkinter as ctk
-from typing import TYPE_CHECKING, List, Optional
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import tkinter
-from PIL import Image
+from PIL import Image, ImageTk
 import io
+import time
+import webbrowser
 import tkinterweb
 
 from pygments.lexers.markup import MarkdownLexer
 from pygments.token import Token
 
+from src.models.encoded_image import Thumbnail
+from src.services.search_engine import TextSearchIndex
+
 # Avoid circular import for type hinting
 if TYPE_CHECKING:
     from src.controllers.app_controller import AppController
-    from src.models.app_state import SlideData
+    from src.models.app_state import DocumentSession, SlideData
+    from src.services.outline_index import OutlineIndex
+    from src.services.project_index import ProjectFileEntry
+    from src.services.project_search import SearchHit
+
+def _decoded_image(widget, image: Thumbnail, redraw) -> Optional[Image.Image]:
+    """Returns the decoded pixels of an image, or None after asking the decode worker to call redraw on the Tk thread."""
+    decoder = widget.controller.thumbnail_decoder
+    decoded = decoder.get(image)
+    if decoded is None:
+        decoder.request(image, lambda: widget.after(0, redraw))
+    return decoded
 
 class EditorPanel(ctk.CTkFrame):
+    # Large-file mode: text is inserted in idle-time chunks and only the viewport is highlighted.
+    LARGE_FILE_CHARS = 1_000_000
+    # Past this size syntax highlighting and search-as-you-type are switched off entirely.
+    HUGE_FILE_CHARS = 10_000_000
+    INSERT_CHUNK_CHARS = 64 * 1024
+    HIGHLIGHT_MARGIN_LINES = 50  # Lines highlighted beyond each edge of the viewport
+    LEX_LOOKBEHIND_LINES = 200  # How far before the viewport lexing may start to pick up context
+    MAX_DIAGNOSTICS = 500  # Lines tagged with validation results; the summary still counts all of them
+
     def __init__(self, parent, controller: 'AppController'):
         super().__init__(parent)
         self.controller = controller
@@ -28,6 +55,17 @@ class EditorPanel(ctk.CTkFrame):
         self.search_entry = ctk.CTkEntry(self.search_frame, placeholder_text="Find")
         self.search_entry.pack(side="left", padx=(0, 5), expand=True, fill="x")
         self.search_entry.bind("<Return>", lambda event: self._find_next())
+        self.search_entry.bind("<KeyRelease>", self._on_search_entry_changed)
+
+        self.match_case_var = ctk.BooleanVar(value=False)
+        self.whole_word_var = ctk.BooleanVar(value=False)
+        self.use_regex_var = ctk.BooleanVar(value=False)
+        for text, variable in (("Aa", self.match_case_var), ("W", self.whole_word_var), (".*", self.use_regex_var)):
+            ctk.CTkCheckBox(self.search_frame, text=text, width=50, variable=variable,
+                            command=self._find_text).pack(side="left", padx=(0, 5))
+
+        self.match_count_label = ctk.CTkLabel(self.search_frame, text="", width=80)
+        self.match_count_label.pack(side="left", padx=(0, 5))
 
         self.find_prev_button = ctk.CTkButton(self.search_frame, text="< Prev", width=60, command=self._find_prev)
         self.find_prev_button.pack(side="left", padx=(0, 5))
@@ -47,17 +85,28 @@ class EditorPanel(ctk.CTkFrame):
         self.close_search_button = ctk.CTkButton(self.search_frame, text="X", width=30, command=self._hide_search_bar)
         self.close_search_button.pack(side="right", padx=(5, 0))
 
+        # Load progress (shown while a large text is being inserted)
+        self.load_progress_frame = ctk.CTkFrame(self, height=30, corner_radius=0)
+        self.load_progress_label = ctk.CTkLabel(self.load_progress_frame, text="")
+        self.load_progress_label.pack(side="left", padx=(5, 10))
+        self.load_progress_bar = ctk.CTkProgressBar(self.load_progress_frame)
+        self.load_progress_bar.pack(side="left", expand=True, fill="x", padx=(0, 5))
+
+        # Validation message for the cursor line, or a summary (hidden while there is nothing to report)
+        self.diagnostics_label = ctk.CTkLabel(self, text="", anchor="w")
+
         # Text widget
         self.text_widget = ctk.CTkTextbox(self, wrap="none") # Set wrap to none
         self.text_widget.pack(expand=True, fill="both")
         self.text_widget.configure(font=("Consolas", 12)) # Set monospaced font and size to 12
-        self.text_widget.bind("<KeyRelease>", self._on_key_release)
         self.text_widget.bind("<<Modified>>", self._on_text_modified)
         self.text_widget.edit_modified(False)
         self.text_widget.bind("<Control-f>", lambda event: self._show_search_bar())
         self.text_widget.bind("<Control-h>", lambda event: self._show_search_bar())
+        self.text_widget.bind("<KeyRelease>", lambda event: self._update_diagnostics_label(), add="+")
+        self.text_widget.bind("<ButtonRelease-1>", lambda event: self._update_diagnostics_label(), add="+")
 
-        self.lexer = MarkdownLexer()
+        self.lexer = MarkdownLexer(stripnl=False) # Keep leading newlines so token positions match the text
 
         # Define tag configurations for syntax highlighting
         self.tag_configurations = {
@@ -79,118 +128,466 @@ class EditorPanel(ctk.CTkFrame):
         for token_type, config in self.tag_configurations.items():
             self.text_widget._textbox.tag_configure(str(token_type), **config)
         
+        # Validation results (created before the search tags so search highlights stay on top)
+        self.text_widget._textbox.tag_configure("diagnostic_error", background="#FFD6D6")
+        self.text_widget._textbox.tag_configure("diagnostic_warning", background="#FFF2C2")
+        self._diagnostic_messages: Dict[str, Tuple[str, str]] = {}  # Per-diagnostic tag -> (severity, message)
+        self._diagnostics_summary: Optional[Tuple[str, str]] = None
+
         # Configure search highlight tag
         self.text_widget._textbox.tag_configure("search_highlight", background="yellow")
-        self.last_search_index = "1.0"
-
-    def _on_key_release(self, event):
-        self.controller.on_content_changed(self.text_widget.get("1.0", "end-1c"))
+        self.text_widget._textbox.tag_configure("search_current", background="orange")
+        self.search_index = TextSearchIndex(self.document)
+        self.is_search_active = False
+        self._is_loading_content = False
+        self._dirty_lines: Optional[Tuple[int, int]] = None  # Lines edited since the last highlighting pass
+        self.current_match: Optional[int] = None
+        self._viewport_refresh_job: Optional[str] = None
+        self._pending_inserts: deque = deque()  # Text chunks waiting to be inserted at idle time
+        self._insert_job: Optional[str] = None
+        self._is_stream_open = False  # More chunks will still be appended by the controller
+        self._inserted_chars = 0
+        self._expected_chars = 0
+        self._is_query_stale = False  # Huge files search on Enter only, not on every keystroke
+
+        self._install_edit_hook()
+        # Re-tag search matches whenever the viewport scrolls; only visible matches carry tags.
+        self.text_widget._textbox.configure(yscrollcommand=self._on_text_yscroll)
+
+    @property
+    def document(self):
+        return self.controller.state.document
+
+    def _install_edit_hook(self):
+        """Routes the Tk text widget command through _dispatch_text_command so edits can be observed."""
+        textbox = self.text_widget._textbox
+        self._text_widget_path = str(textbox)
+        self._original_text_command = self._text_widget_path + "_original"
+        textbox.tk.call("rename", self._text_widget_path, self._original_text_command)
+        textbox.tk.createcommand(self._text_widget_path, self._dispatch_text_command)
+
+    def _dispatch_text_command(self, operation, *args):
+        tk = self.text_widget._textbox.tk
+        edit = None
+        # A disabled widget ignores edits, but Tk's <BackSpace>/<Delete> class bindings still issue them.
+        if operation in ("insert", "delete", "replace") and args and not self._is_text_disabled():
+            edit = self._describe_edit(operation, args)
+        try:
+            result = tk.call((self._original_text_command, operation) + args)
+        except tkinter.TclError:
+            return ""
+        if edit is not None:
+            self._on_buffer_edit(*edit)
+        return result
+
+    def _is_text_disabled(self) -> bool:
+        return str(self.text_widget._textbox.tk.call(self._original_text_command, "cget", "-state")) == "disabled"
+
+    def _text_index(self, index: str) -> str:
+        # Tk never edits past the final newline, so clamp indices the same way.
+        tk = self.text_widget._textbox.tk
+        resolved = str(tk.call(self._original_text_command, "index", index))
+        if tk.getboolean(tk.call(self._original_text_command, "compare", resolved, ">", "end-1c")):
+            return str(tk.call(self._original_text_command, "index", "end-1c"))
+        return resolved
+
+    def _describe_edit(self, operation: str, args: tuple):
+        """Returns (start index, end index, inserted text) of an edit before Tk applies it."""
+        tk = self.text_widget._textbox.tk
+        if operation == "insert":
+            start = self._text_index(args[0])
+            return start, start, "".join(args[1::2])
+        if operation == "delete":
+            if len(args) > 2:
+                return None  # Multi-range deletes are not issued by the editor
+            start = self._text_index(args[0])
+            end = self._text_index(args[1] if len(args) > 1 else f"{start}+1c")
+        else:
+            start = self._text_index(args[0])
+            end = self._text_index(args[1])
+        if tk.getboolean(tk.call(self._original_text_command, "compare", end, "<", start)):
+            end = start
+        return start, end, "".join(args[2::2]) if operation == "replace" else ""
+
+    def _on_buffer_edit(self, start_index: str, end_index: str, inserted_text: str):
+        """Forwards a single insert/delete as an offset delta; only real modifications get here."""
+        if self._is_loading_content or (start_index == end_index and not inserted_text):
+            return
+        start_line, start_column = map(int, start_index.split("."))
+        end_line, end_column = map(int, end_index.split("."))
+        start = self.document.index_to_offset(start_line, start_column)
+        end = self.document.index_to_offset(end_line, end_column)
+        self.controller.on_text_edited(start, end - start, inserted_text)
+        self._mark_lines_dirty(start_line, end_line, start_line + inserted_text.count("\n"))
+        if not self.is_search_active:
+            return
+        self.search_index.apply_edit(start, end - start, len(inserted_text))
+        self.current_match = None
+        self._update_match_count_label()
+        self._schedule_viewport_refresh()
+
+    def _on_text_yscroll(self, first, last):
+        self.text_widget._y_scrollbar.set(first, last)
+        self._schedule_viewport_refresh()
+
+    def _schedule_viewport_refresh(self):
+        if self._viewport_refresh_job is None:
+            self._viewport_refresh_job = self.after_idle(self._refresh_viewport)
+
+    def _refresh_viewport(self):
+        self._viewport_refresh_job = None
+        if self.is_large_file:
+            self._apply_syntax_highlighting()
+        if self.is_search_active:
+            self._highlight_visible_matches()
+
+    @property
+    def is_large_file(self) -> bool:
+        return self.controller.state.is_large_file_mode_enabled and self.document.char_count >= self.LARGE_FILE_CHARS
+
+    @property
+    def is_huge_file(self) -> bool:
+        return self.controller.state.is_large_file_mode_enabled and self.document.char_count >= self.HUGE_FILE_CHARS
+
+    @property
+    def is_loading(self) -> bool:
+        return self._is_stream_open or bool(self._pending_inserts)
+
+    def _mark_lines_dirty(self, first_line: int, old_last_line: int, new_last_line: int):
+        """Adds the lines of an edit to the range re-highlighted after it, moving the pending range along."""
+        if self._dirty_lines is not None:
+            def shift(line: int) -> int:
+                if line <= first_line:
+                    return line
+                return line + new_last_line - old_last_line if line > old_last_line else new_last_line
+            first, last = map(shift, self._dirty_lines)
+            first_line, new_last_line = min(first, first_line), max(last, new_last_line)
+        self._dirty_lines = (first_line, new_last_line)
 
     def _on_text_modified(self, event=None):
         if self.text_widget.edit_modified():
-            self._apply_syntax_highlighting()
+            if self.is_large_file:
+                self._dirty_lines = None
+                self._schedule_viewport_refresh()
+            else:
+                self._highlight_dirty_lines()
             self.text_widget.edit_modified(False)
 
+    def _highlight_dirty_lines(self):
+        """Re-highlights only the slides touched since the last pass (loads highlight everything instead)."""
+        dirty_lines, self._dirty_lines = self._dirty_lines, None
+        if dirty_lines is None or self.is_loading or self.is_huge_file:
+            return
+        document = self.document
+        line_count = document.line_count
+        first_line, last_line = (min(max(line, 1), line_count) for line in dirty_lines)
+        # Lex whole slides, so an edit inside fenced code or front matter keeps its context.
+        first_slide = document.slide_at(document.index_to_offset(first_line, 0))
+        last_slide = document.slide_at(document.index_to_offset(last_line, 0))
+        first_line = 1 if first_slide == 0 else min(first_line, document.line_at(document.slide_span(first_slide)[0]))
+        last_line = max(last_line, document.line_at(document.slide_span(last_slide)[1]))
+        self._highlight_lines(first_line, min(last_line, line_count))
+
     def _apply_syntax_highlighting(self):
-        text = self.text_widget.get("1.0", "end-1c")
-        for tag_name in self.text_widget._textbox.tag_names():
-            if tag_name not in ["sel", "insert", "search_highlight"]:
-                self.text_widget._textbox.tag_remove(tag_name, "1.0", "end")
-
-        current_index = "1.0"
-        for token_type, value in self.lexer.get_tokens(text):
-            tag_name = str(token_type)
-            if tag_name in self.tag_configurations:
-                start_index = self.text_widget._textbox.index(current_index)
-                end_index = self.text_widget._textbox.index(f"{start_index}+{len(value)}c")
-                self.text_widget._textbox.tag_add(tag_name, start_index, end_index)
-            current_index = f"{current_index}+{len(value)}c"
+        """Highlights the whole text, or in large-file mode only the lines around the viewport."""
+        if self.is_loading or self.is_huge_file:
+            return
+        line_count = self.document.line_count
+        if not self.is_large_file:
+            self._highlight_lines(1, line_count)
+            return
+        textbox = self.text_widget._textbox
+        first_visible = int(textbox.index("@0,0").split(".")[0])
+        last_visible = int(textbox.index(f"@0,{textbox.winfo_height()}").split(".")[0])
+        # Start lexing at the slide boundary when it is close, so fenced code keeps its context.
+        slide_start = self.document.slide_span(self.document.slide_at(self.document.index_to_offset(first_visible, 0)))[0]
+        first_line = max(self.document.line_at(slide_start), first_visible - self.LEX_LOOKBEHIND_LINES, 1)
+        last_line = min(last_visible + self.HIGHLIGHT_MARGIN_LINES, line_count)
+        self._highlight_lines(first_line, last_line)
+
+    def _highlight_lines(self, first_line: int, last_line: int):
+        textbox = self.text_widget._textbox
+        start_index, end_index = f"{first_line}.0", f"{last_line}.end"
+        for tag_name in self.tag_configurations:
+            textbox.tag_remove(str(tag_name), start_index, end_index)
+
+        # Track line/column in Python and add each tag's ranges in one call.
+        ranges = {}
+        line, column = first_line, 0
+        for token_type, value in self.lexer.get_tokens(textbox.get(start_index, end_index)):
+            newlines = value.count("\n")
+            end_line = line + newlines
+            end_column = len(value) - value.rfind("\n") - 1 if newlines else column + len(value)
+            if token_type in self.tag_configurations and value:
+                ranges.setdefault(str(token_type), []).extend((f"{line}.{column}", f"{end_line}.{end_column}"))
+            line, column = end_line, end_column
+        for tag_name, indices in ranges.items():
+            textbox.tag_add(tag_name, *indices)
+
+    def set_diagnostics(self, diagnostics: List[Tuple[int, str, str]]):
+        """Marks the lines of (line, severity, message) validation results; tags move with later edits."""
+        textbox = self.text_widget._textbox
+        for tag_name in self._diagnostic_messages:
+            textbox.tag_delete(tag_name)
+        textbox.tag_remove("diagnostic_error", "1.0", "end")
+        textbox.tag_remove("diagnostic_warning", "1.0", "end")
+        self._diagnostic_messages = {}
+        for number, (line, severity, message) in enumerate(diagnostics[:self.MAX_DIAGNOSTICS]):
+            tag_name = f"diagnostic_{number}"
+            textbox.tag_add(f"diagnostic_{severity}", f"{line}.0", f"{line + 1}.0")
+            textbox.tag_add(tag_name, f"{line}.0", f"{line + 1}.0")
+            self._diagnostic_messages[tag_name] = (severity, message)
+
+        error_count = sum(1 for _, severity, _ in diagnostics if severity == "error")
+        warning_count = len(diagnostics) - error_count
+        if not diagnostics:
+            self._diagnostics_summary = None
+        else:
+            self._diagnostics_summary = ("error" if error_count else "warning",
+                                         f"{error_count} error(s), {warning_count} warning(s)")
+        self._update_diagnostics_label()
+
+    def _update_diagnostics_label(self):
+        if self._diagnostics_summary is None:
+            self.diagnostics_label.pack_forget()
+            return
+        severity, message = self._diagnostics_summary
+        for tag_name in self.text_widget._textbox.tag_names("insert"):
+            if tag_name in self._diagnostic_messages:
+                severity, message = self._diagnostic_messages[tag_name]
+                break
+        self.diagnostics_label.configure(text=message, text_color="#E53935" if severity == "error" else "#FB8C00")
+        if not self.diagnostics_label.winfo_manager():
+            self.diagnostics_label.pack(side="bottom", fill="x", padx=5, before=self.text_widget)
 
     def set_content(self, content: str):
-        self.text_widget.delete("1.0", "end")
-        self.text_widget.insert("1.0", content)
+        # The controller already holds the new text; do not replay the load as edits.
+        self._cancel_pending_inserts()
+        self.search_index.document = self.document  # Another tab's buffer after a tab switch
+        self._is_loading_content = True
+        self.text_widget.configure(state="normal")
+        try:
+            self.text_widget.delete("1.0", "end")
+            if len(content) < self.LARGE_FILE_CHARS or not self.controller.state.is_large_file_mode_enabled:
+                self.text_widget.insert("1.0", content)
+        finally:
+            self._is_loading_content = False
+        if len(content) >= self.LARGE_FILE_CHARS and self.controller.state.is_large_file_mode_enabled:
+            self._expected_chars = len(content)
+            self._queue_insert(content)
+            return
+        self._on_content_loaded()
+
+    def _on_content_loaded(self):
+        if self.is_search_active:
+            self.search_index.rebuild()
+            self.current_match = None
         self._apply_syntax_highlighting()
 
+    def begin_streamed_content(self, expected_chars: int = 0):
+        """Clears the editor and keeps it read-only while a large file is appended chunk by chunk."""
+        self.set_content("")
+        self._is_stream_open = True
+        self._expected_chars = expected_chars
+        self.text_widget.configure(state="disabled")
+
+    def append_content(self, text: str):
+        self._queue_insert(text)
+
+    def end_streamed_content(self):
+        self._is_stream_open = False
+        if not self._pending_inserts and self._insert_job is None:
+            self._finish_chunked_insert()
+
+    def _queue_insert(self, text: str):
+        """Inserts text at the end of the editor in idle-time chunks, keeping the editor read-only meanwhile."""
+        for start in range(0, len(text), self.INSERT_CHUNK_CHARS):
+            self._pending_inserts.append(text[start:start + self.INSERT_CHUNK_CHARS])
+        self.text_widget.configure(state="disabled")
+        if not self.load_progress_frame.winfo_ismapped():
+            self.load_progress_frame.pack(side="bottom", fill="x", before=self.text_widget)
+        if self._insert_job is None:
+            self._insert_job = self.after(1, self._insert_next_chunk)
+
+    def _insert_next_chunk(self):
+        self._insert_job = None
+        if self._pending_inserts:
+            chunk = self._pending_inserts.popleft()
+            self._is_loading_content = True
+            self.text_widget.configure(state="normal")
+            try:
+                self.text_widget.insert("end-1c", chunk)
+            finally:
+                self.text_widget.configure(state="disabled")
+                self._is_loading_content = False
+            self._inserted_chars += len(chunk)
+            self._update_load_progress()
+        if self._pending_inserts:
+            self._insert_job = self.after(1, self._insert_next_chunk)
+        elif not self._is_stream_open:
+            self._finish_chunked_insert()
+
+    def _update_load_progress(self):
+        total = max(self._expected_chars, self.document.char_count, self._inserted_chars, 1)
+        self.load_progress_bar.set(self._inserted_chars / total)
+        self.load_progress_label.configure(text=f"Loading editor... {self._inserted_chars * 100 // total}%")
+
+    def _finish_chunked_insert(self):
+        self.load_progress_frame.pack_forget()
+        self._inserted_chars = 0
+        self._expected_chars = 0
+        self.text_widget.configure(state="normal")
+        self._on_content_loaded()
+
+    @property
+    def pending_insert_chars(self) -> int:
+        return sum(len(chunk) for chunk in self._pending_inserts)
+
+    def _cancel_pending_inserts(self):
+        if self._insert_job is not None:
+            self.after_cancel(self._insert_job)
+            self._insert_job = None
+        self._pending_inserts.clear()
+        self._is_stream_open = False
+        self._inserted_chars = 0
+        self.load_progress_frame.pack_forget()
+
     def _show_search_bar(self):
         self.search_frame.pack(side="top", fill="x", padx=5, pady=5)
         self.search_entry.focus_set()
+        self.is_search_active = True
         self._find_text()
 
     def _hide_search_bar(self):
         self.search_frame.pack_forget()
+        self.is_search_active = False
+        self.search_index.set_query("")
+        self.current_match = None
         self._clear_search_highlights()
 
     def _clear_search_highlights(self):
         self.text_widget._textbox.tag_remove("search_highlight", "1.0", "end")
+        self.text_widget._textbox.tag_remove("search_current", "1.0", "end")
 
-    def _find_text(self, start_index="1.0", direction="forward"):
-        self._clear_search_highlights()
-        search_term = self.search_entry.get()
-        if not search_term:
+    def _on_search_entry_changed(self, event=None):
+        if event is not None and event.keysym in ("Return", "KP_Enter"):
             return
+        if self.is_huge_file:
+            self._is_query_stale = True
+            return
+        self._find_text()
 
-        start_pos = self.text_widget._textbox.search(search_term, start_index, stopindex="end", nocase=True)
-        while start_pos:
-            end_pos = f"{start_pos}+{len(search_term)}c"
-            self.text_widget._textbox.tag_add("search_highlight", start_pos, end_pos)
-            start_pos = self.text_widget._textbox.search(search_term, end_pos, stopindex="end", nocase=True)
-
-        first_occurrence = self.text_widget._textbox.search(search_term, "1.0", stopindex="end", nocase=True)
-        if first_occurrence:
-            self.text_widget._textbox.see(first_occurrence)
-            self.last_search_index = first_occurrence
+    def _visible_offset_range(self):
+        textbox = self.text_widget._textbox
+        first_line = int(textbox.index("@0,0").split(".")[0])
+        last_line = int(textbox.index(f"@0,{textbox.winfo_height()}").split(".")[0])
+        start = self.document.index_to_offset(first_line, 0)
+        end = self.document.index_to_offset(last_line + 1, 0)
+        if last_line + 1 > self.document.line_count:
+            end = self.document.char_count
+        return start, end
+
+    def _highlight_visible_matches(self):
+        self._clear_search_highlights()
+        textbox = self.text_widget._textbox
+        start, end = self._visible_offset_range()
+        ranges = []
+        for match_start, match_end in self.search_index.matches_in_range(start, end):
+            ranges.extend((self.document.offset_to_index(match_start), self.document.offset_to_index(match_end)))
+        if ranges:
+            textbox.tag_add("search_highlight", *ranges)
+        if self.current_match is not None and self.current_match < self.search_index.match_count:
+            match_start, match_end = self.search_index.match_at(self.current_match)
+            textbox.tag_add("search_current", self.document.offset_to_index(match_start), self.document.offset_to_index(match_end))
+
+    def _update_match_count_label(self, error: Optional[str] = None):
+        if error:
+            self.match_count_label.configure(text="Invalid")
+        elif not self.search_entry.get():
+            self.match_count_label.configure(text="")
+        elif self.current_match is None:
+            self.match_count_label.configure(text=f"{self.search_index.match_count} found")
+        else:
+            self.match_count_label.configure(text=f"{self.current_match + 1}/{self.search_index.match_count}")
+
+    def _cursor_offset(self) -> int:
+        line, column = map(int, self.text_widget._textbox.index("insert").split("."))
+        return self.document.index_to_offset(line, column)
+
+    def _select_match(self, match_number: Optional[int]):
+        self.current_match = match_number
+        if match_number is not None:
+            match_start, _ = self.search_index.match_at(match_number)
+            self.text_widget._textbox.see(self.document.offset_to_index(match_start))
+        self._update_match_count_label()
+        self._highlight_visible_matches()
+
+    def _find_text(self):
+        self._is_query_stale = False
+        error = self.search_index.set_query(
+            self.search_entry.get(),
+            use_regex=self.use_regex_var.get(),
+            match_case=self.match_case_var.get(),
+            whole_word=self.whole_word_var.get()
+        )
+        if error:
+            self.current_match = None
+            self._clear_search_highlights()
+            self._update_match_count_label(error)
+            return
+        self._select_match(self.search_index.next_match(self._cursor_offset()))
 
     def _find_next(self):
-        search_term = self.search_entry.get()
-        if not search_term: return
-        
-        start_index = f"{self.last_search_index}+{len(search_term)}c"
-        next_occurrence = self.text_widget._textbox.search(search_term, start_index, stopindex="end", nocase=True)
-        
-        if next_occurrence:
-            end_pos = f"{next_occurrence}+{len(search_term)}c"
-            self._clear_search_highlights()
-            self.text_widget._textbox.tag_add("search_highlight", next_occurrence, end_pos)
-            self.text_widget._textbox.see(next_occurrence)
-            self.last_search_index = next_occurrence
+        if self._is_query_stale:
+            self._find_text()
+            return
+        if not self.search_entry.get(): return
+        if self.current_match is None:
+            self._select_match(self.search_index.next_match(self._cursor_offset()))
         else:
-            self._find_text(start_index="1.0")
+            match_start, _ = self.search_index.match_at(self.current_match)
+            self._select_match(self.search_index.next_match(match_start + 1))
 
     def _find_prev(self):
-        search_term = self.search_entry.get()
-        if not search_term: return
-
-        prev_occurrence = self.text_widget._textbox.search(search_term, self.last_search_index, stopindex="1.0", backwards=True, nocase=True)
-        if prev_occurrence:
-            end_pos = f"{prev_occurrence}+{len(search_term)}c"
-            self._clear_search_highlights()
-            self.text_widget._textbox.tag_add("search_highlight", prev_occurrence, end_pos)
-            self.text_widget._textbox.see(prev_occurrence)
-            self.last_search_index = prev_occurrence
+        if not self.search_entry.get(): return
+        if self.current_match is None:
+            self._select_match(self.search_index.previous_match(self._cursor_offset()))
         else:
-            self._find_text(start_index="end", direction="backward")
+            match_start, _ = self.search_index.match_at(self.current_match)
+            self._select_match(self.search_index.previous_match(match_start))
+
+    def _expand_replacement(self, match_start: int, replace_term: str) -> str:
+        if not self.use_regex_var.get():
+            return replace_term
+        match = self.search_index.pattern.match(self.search_index.text, match_start)
+        return match.expand(replace_term) if match else replace_term
 
     def _replace_text(self):
         search_term = self.search_entry.get()
         replace_term = self.replace_entry.get()
         if not search_term or not replace_term: return
 
-        current_selection = self.text_widget._textbox.tag_ranges("search_highlight")
-        if current_selection:
-            self.text_widget._textbox.delete(current_selection[0], current_selection[1])
-            self.text_widget._textbox.insert(current_selection[0], replace_term)
-            self.controller.on_content_changed(self.text_widget.get("1.0", "end-1c"))
-            self._find_next()
+        if self.current_match is not None and self.current_match < self.search_index.match_count:
+            match_start, match_end = self.search_index.match_at(self.current_match)
+            replacement = self._expand_replacement(match_start, replace_term)
+            start_index = self.document.offset_to_index(match_start)
+            end_index = self.document.offset_to_index(match_end)
+            self.text_widget._textbox.delete(start_index, end_index)
+            self.text_widget._textbox.insert(start_index, replacement)
+            self._select_match(self.search_index.next_match(match_start + len(replacement)))
 
     def _replace_all(self):
         search_term = self.search_entry.get()
         replace_term = self.replace_entry.get()
-        if not search_term or not replace_term: return
+        if not search_term or not replace_term or self.search_index.pattern is None: return
 
-        text_content = self.text_widget.get("1.0", "end")
-        updated_content = text_content.replace(search_term, replace_term)
-        self.set_content(updated_content)
+        if self.use_regex_var.get():
+            updated_content = self.search_index.pattern.sub(replace_term, self.search_index.text)
+        else:
+            updated_content = self.search_index.pattern.sub(lambda match: replace_term, self.search_index.text)
         self.controller.on_content_changed(updated_content)
+        self.set_content(updated_content)
+        self._find_text()
 
 class PreviewPanel(ctk.CTkScrollableFrame):
     def __init__(self, parent, controller: 'AppController'):
@@ -222,54 +619,315 @@ class PreviewPanel(ctk.CTkScrollableFrame):
                 error_label = ctk.CTkLabel(self, text=f"Error: {e}")
                 error_label.pack(padx=10, pady=10)
 
-# PreviewPanel class is no longer needed as its functionality is removed or replaced.
-# class PreviewPanel(ctk.CTkScrollableFrame):
-#     def __init__(self, parent, controller: 'AppController'):
-#         super().__init__(parent)
-#         self.controller = controller
-#         self.previews: List[ctk.CTkLabel] = []
-#
-#     def update_previews(self, image_data: List[bytes], aspect_ratio: str):
-#         for widget in self.winfo_children():
-#             widget.destroy()
-#         self.previews.clear()
-#
-#         if not image_data:
-#             ctk.CTkLabel(self, text="Preview not available.").pack(pady=20)
-#             return
-#
-#         base_width = 800
-#         width, height = (base_width, int(base_width * 3/4)) if aspect_ratio == "4:3" else (base_width, int(base_width * 9/16))
-#
-#         for data in image_data:
-#             try:
-#                 pil_image = Image.open(io.BytesIO(data))
-#                 ctk_image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(width, height))
-#                 label = ctk.CTkLabel(self, image=ctk_image, text="")
-#                 label.pack(padx=10, pady=10)
-#                 self.previews.append(label)
-#             except Exception as e:
-#                 print(f"Error displaying image: {e}")
-#                 error_label = ctk.CTkLabel(self, text=f"Error: {e}")
-#                 error_label.pack(padx=10, pady=10)
+
+class VirtualList(ctk.CTkFrame):
+    """Canvas-backed list of fixed-height rows: only the rows inside the viewport exist as canvas items.
+
+    Subclasses report their row count and draw and handle clicks on single rows.
+    """
+
+    ROW_HEIGHT = 22
+
+    def __init__(self, parent, controller: 'AppController'):
+        super().__init__(parent, fg_color="transparent")
+        self.controller = controller
+
+        self.canvas = tkinter.Canvas(self, highlightthickness=0, borderwidth=0,
+                                     bg=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"]))
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", expand=True, fill="both")
+        self.canvas.configure(yscrollcommand=self._on_canvas_yscroll)
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda event: self._scroll(-1 if event.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda event: self._scroll(-1))
+        self.canvas.bind("<Button-5>", lambda event: self._scroll(1))
+
+    def _scaling(self) -> float:
+        return ctk.ScalingTracker.get_widget_scaling(self)
+
+    def _row_height(self) -> int:
+        return int(self.ROW_HEIGHT * self._scaling())
+
+    def _row_count(self) -> int:
+        raise NotImplementedError
+
+    def _draw_rows(self, first: int, last: int, row_height: int):
+        """Draws rows first..last-1; row n starts at y = n * row_height."""
+        raise NotImplementedError
+
+    def _on_row_click(self, row_number: int, event):
+        raise NotImplementedError
+
+    def _rows_changed(self):
+        self.canvas.configure(scrollregion=(0, 0, 1, self._row_count() * self._row_height()))
+        self.redraw()
+
+    def _highlight_row(self, y: int, row_height: int):
+        self.canvas.create_rectangle(0, y, self.canvas.winfo_width(), y + row_height,
+                                     fill=self._apply_appearance_mode(("#90CAF9", "#1E88E5")), width=0)
+
+    def redraw(self):
+        self.canvas.delete("all")
+        row_count = self._row_count()
+        if not row_count:
+            return
+        row_height = self._row_height()
+        top = int(self.canvas.canvasy(0))
+        first = max(0, top // row_height)
+        last = min(row_count, (top + self.canvas.winfo_height()) // row_height + 1)
+        self._draw_rows(first, last, row_height)
+
+    def _on_canvas_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.redraw()
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+
+    def _scroll(self, units: int):
+        self.canvas.yview_scroll(units * 3, "units")
+
+    def _on_click(self, event):
+        row_number = int(self.canvas.canvasy(event.y)) // self._row_height()
+        if 0 <= row_number < self._row_count():
+            self._on_row_click(row_number, event)
+
+class OutlineView(VirtualList):
+    """Virtualized outline tree of the slides and their headings."""
+
+    ROW_HEIGHT = 22
+    INDENT = 14
+
+    def __init__(self, parent, controller: 'AppController'):
+        super().__init__(parent, controller)
+        self.rows: List[tuple] = []  # (kind, slide_index, level, text, line)
+        self.collapsed_slides = set()
+        self._index_version = -1
+        self._outline_index: Optional['OutlineIndex'] = None
+
+    def set_outline(self, outline_index: 'OutlineIndex'):
+        if outline_index is self._outline_index and outline_index.version == self._index_version:
+            return
+        self._outline_index = outline_index
+        self._index_version = outline_index.version
+        self._rebuild_rows()
+
+    def _rebuild_rows(self):
+        rows = []
+        outline_index = self._outline_index
+        for position in range(outline_index.slide_count if outline_index else 0):
+            entries = outline_index.entries(position)
+            slide_index = position + 1
+            title = entries[0].text if entries else "(untitled)"
+            marker = "▸" if slide_index in self.collapsed_slides else "▾"
+            rows.append(("slide", slide_index, 0, f"{marker if entries else ' '} {slide_index}. {title}", 0))
+            if slide_index not in self.collapsed_slides:
+                rows.extend(("heading", slide_index, entry.level, entry.text, entry.line) for entry in entries)
+        self.rows = rows
+        self._rows_changed()
+
+    def _row_count(self) -> int:
+        return len(self.rows)
+
+    def _draw_rows(self, first: int, last: int, row_height: int):
+        text_color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+        current_slide = self.controller.state.current_slide_index
+        for row_number in range(first, last):
+            kind, slide_index, level, text, _ = self.rows[row_number]
+            y = row_number * row_height
+            if kind == "slide" and slide_index == current_slide:
+                self._highlight_row(y, row_height)
+            x = 4 + (level * self.INDENT if kind == "heading" else 0)
+            font = ("Consolas", 10, "bold") if kind == "slide" else ("Consolas", 10)
+            self.canvas.create_text(x, y + row_height // 2, text=text, anchor="w", fill=text_color, font=font)
+
+    def _on_row_click(self, row_number: int, event):
+        kind, slide_index, _, _, line = self.rows[row_number]
+        if kind == "slide" and event.x < 16:
+            self.collapsed_slides.symmetric_difference_update({slide_index})
+            self._rebuild_rows()
+            return
+        self.controller.navigate_to_outline_entry(slide_index, line if kind == "heading" else None)
+
+class ProjectFileList(VirtualList):
+    """Virtualized list of the decks in a project: thumbnails are loaded only for the rows inside the viewport."""
+
+    ROW_HEIGHT = 52
+    THUMBNAIL_WIDTH = 72
+    MAX_CACHED_THUMBNAILS = 256
+
+    def __init__(self, parent, controller: 'AppController'):
+        super().__init__(parent, controller)
+        self.all_entries: List['ProjectFileEntry'] = []
+        self.entries: List['ProjectFileEntry'] = []  # all_entries after the filter
+        self.filter_text = ""
+        self._thumbnails: "OrderedDict[tuple, Optional[ImageTk.PhotoImage]]" = OrderedDict()
+
+    def set_entries(self, entries: List['ProjectFileEntry']):
+        self.all_entries = entries
+        self._apply_filter()
+
+    def set_filter(self, text: str):
+        text = text.strip().lower()
+        if text != self.filter_text:
+            self.filter_text = text
+            self._apply_filter()
+
+    def _apply_filter(self):
+        if self.filter_text:
+            self.entries = [entry for entry in self.all_entries
+                            if self.filter_text in entry.path.lower() or self.filter_text in (entry.title or "").lower()]
+        else:
+            self.entries = self.all_entries
+        self._rows_changed()
+
+    def _thumbnail(self, entry: 'ProjectFileEntry', width: int, height: int) -> Optional[ImageTk.PhotoImage]:
+        key = (entry.path, entry.mtime_ns, entry.is_thumbnail_rendered, width)
+        if key in self._thumbnails:
+            self._thumbnails.move_to_end(key)
+            return self._thumbnails[key]
+        try:
+            with Image.open(self.controller.project_index.thumbnail_path(entry)) as image:
+                image.thumbnail((width, height))
+                photo = ImageTk.PhotoImage(image, master=self.canvas)
+        except (OSError, ValueError):
+            photo = None  # Not drafted (empty deck) or removed from the cache
+        self._thumbnails[key] = photo
+        while len(self._thumbnails) > self.MAX_CACHED_THUMBNAILS:
+            self._thumbnails.popitem(last=False)
+        return photo
+
+    def _row_count(self) -> int:
+        return len(self.entries)
+
+    def _draw_rows(self, first: int, last: int, row_height: int):
+        thumbnail_width = int(self.THUMBNAIL_WIDTH * self._scaling())
+        text_color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+        detail_color = self._apply_appearance_mode(("gray40", "gray65"))
+        current_file_path = self.controller.state.current_file_path
+        for row_number in range(first, last):
+            entry = self.entries[row_number]
+            y = row_number * row_height
+            if current_file_path is not None and self.controller.project_index.absolute_path(entry) == current_file_path:
+                self._highlight_row(y, row_height)
+            photo = self._thumbnail(entry, thumbnail_width, row_height - 8)
+            if photo is not None:
+                self.canvas.create_image(4, y + row_height // 2, image=photo, anchor="w")
+            else:
+                self.canvas.create_rectangle(4, y + 4, 4 + thumbnail_width, y + row_height - 4, outline=detail_color)
+            x = thumbnail_width + 12
+            details = [f"{entry.slide_count} slides", entry.theme or "", entry.path]
+            self.canvas.create_text(x, y + row_height // 3, text=entry.title or entry.path, anchor="w",
+                                    fill=text_color, font=("Segoe UI", 10, "bold"))
+            self.canvas.create_text(x, y + row_height * 2 // 3, text=" · ".join(part for part in details if part),
+                                    anchor="w", fill=detail_color, font=("Segoe UI", 9))
+
+    def _on_row_click(self, row_number: int, event):
+        self.controller.open_project_file(self.entries[row_number])
+        self.redraw()
+
+class SearchResultList(VirtualList):
+    """Virtualized list of full-text search hits, one two-line row per matching slide."""
+
+    ROW_HEIGHT = 40
+
+    def __init__(self, parent, controller: 'AppController'):
+        super().__init__(parent, controller)
+        self.hits: List['SearchHit'] = []
+
+    def set_hits(self, hits: List['SearchHit']):
+        self.hits = hits
+        self.canvas.yview_moveto(0)
+        self._rows_changed()
+
+    def _row_count(self) -> int:
+        return len(self.hits)
+
+    def _draw_rows(self, first: int, last: int, row_height: int):
+        text_color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+        detail_color = self._apply_appearance_mode(("gray40", "gray65"))
+        for row_number in range(first, last):
+            hit = self.hits[row_number]
+            y = row_number * row_height
+            heading = f"{hit.path} · slide {hit.slide_index}" + (f" · {hit.title}" if hit.title else "")
+            self.canvas.create_text(4, y + row_height // 3, text=heading, anchor="w",
+                                    fill=text_color, font=("Segoe UI", 10, "bold"))
+            self.canvas.create_text(4, y + row_height * 3 // 4, text=hit.snippet.replace('\n', ' '), anchor="w",
+                                    fill=detail_color, font=("Segoe UI", 9))
+
+    def _on_row_click(self, row_number: int, event):
+        self.controller.open_search_hit(self.hits[row_number])
 
 class SidePanel(ctk.CTkTabview):
+    ADAPTIVE_DEBOUNCE_OPTION = "Adaptive"
+    RECENT_FILES_OPTION = "Recent Files"
+    SEARCH_DELAY_MS = 150  # Typing pause before the project search runs
+    THUMBNAIL_DECODE_MARGIN = 4  # Rows above and below the viewport whose thumbnails stay decoded
+    SLIDE_BUTTON_SIZE = (140, 28)  # CTkButton defaults, restored for text-only entries
+
     def __init__(self, parent, controller: 'AppController'):
-        super().__init__(master=parent)
+        super().__init__(master=parent, command=self._on_tab_changed)
         self.controller = controller
         self.add("Outline")
         self.add("Slides")
         self.add("Files")
+        self.add("Search")
         self.add("Themes")
 
-        ctk.CTkLabel(self.tab("Outline"), text="Outline content").pack(padx=20, pady=20)
+        self.outline_view = OutlineView(self.tab("Outline"), self.controller)
+        self.outline_view.pack(expand=True, fill="both")
         
         self.slides_frame = ctk.CTkScrollableFrame(self.tab("Slides"))
         self.slides_frame.pack(expand=True, fill="both")
         self.slide_buttons: List[ctk.CTkButton] = [] # Consider renaming to slide_widgets if they are not all buttons
-        # self.slide_thumbnails: List[ctk.CTkLabel] = [] # Alternative if using labels for images
-
-        ctk.CTkLabel(self.tab("Files"), text="Files content").pack(padx=20, pady=20)
+        self.slide_list_entries: List['SlideData'] = []
+        self.slide_thumbnails: List[Optional[Thumbnail]] = []  # Kept encoded; decoded only near the viewport
+        self.current_slide_index = 0
+        self.slide_diagnostic_severities: Dict[int, str] = {}  # 1-based slide index -> "error" or "warning"
+        self._shown_thumbnails: Dict[int, Thumbnail] = {}  # 0-based row -> thumbnail whose decoded pixels it shows
+        self._thumbnail_decode_job: Optional[str] = None
+        self._last_thumbnail_pixel_width = 0
+        self._thumbnail_resize_job: Optional[str] = None
+        self.slides_frame.bind("<Configure>", self._on_slides_frame_configure, add="+")
+        self.slides_frame._parent_canvas.configure(yscrollcommand=self._on_slides_yscroll)
+
+        # Files Tab: recent files and the indexed project folder
+        files_tab = self.tab("Files")
+        project_buttons_frame = ctk.CTkFrame(files_tab, fg_color="transparent")
+        project_buttons_frame.pack(padx=5, pady=(5, 0), fill="x")
+        ctk.CTkButton(project_buttons_frame, text="Open Folder...", width=110,
+                      command=self.controller.open_project).pack(side="left")
+        ctk.CTkButton(project_buttons_frame, text="Refresh", width=70,
+                      command=self.controller.refresh_project).pack(side="left", padx=(5, 0))
+
+        self.recent_file_paths: Dict[str, Path] = {}  # Option menu text -> file path
+        self.recent_files_menu = ctk.CTkOptionMenu(files_tab, values=[self.RECENT_FILES_OPTION],
+                                                   command=self._on_recent_file_selected)
+        self.recent_files_menu.set(self.RECENT_FILES_OPTION)
+        self.recent_files_menu.pack(padx=5, pady=(5, 0), fill="x")
+
+        self.project_label = ctk.CTkLabel(files_tab, text="No folder opened", anchor="w")
+        self.project_label.pack(padx=5, fill="x")
+        self.project_filter_entry = ctk.CTkEntry(files_tab, placeholder_text="Filter")
+        self.project_filter_entry.pack(padx=5, pady=(0, 5), fill="x")
+        self.project_filter_entry.bind("<KeyRelease>",
+                                       lambda event: self.project_file_list.set_filter(self.project_filter_entry.get()))
+        self.project_file_list = ProjectFileList(files_tab, self.controller)
+        self.project_file_list.pack(expand=True, fill="both")
+
+        # Search Tab: full-text search across the project's decks
+        search_tab = self.tab("Search")
+        self._project_search_job: Optional[str] = None
+        self.project_search_entry = ctk.CTkEntry(search_tab, placeholder_text="Search all decks")
+        self.project_search_entry.pack(padx=5, pady=(5, 0), fill="x")
+        self.project_search_entry.bind("<KeyRelease>", self._on_project_search_changed)
+        self.project_search_entry.bind("<Return>", lambda event: self._run_project_search())
+        self.search_summary_label = ctk.CTkLabel(search_tab, text="", anchor="w")
+        self.search_summary_label.pack(padx=5, fill="x")
+        self.search_result_list = SearchResultList(search_tab, self.controller)
+        self.search_result_list.pack(expand=True, fill="both")
 
         self.theme_option_menu = ctk.CTkOptionMenu(
             self.tab("Themes"),
@@ -278,6 +936,12 @@ class SidePanel(ctk.CTkTabview):
         )
         self.theme_option_menu.set(self.controller.state.selected_theme)
         self.theme_option_menu.pack(padx=20, pady=10, fill="x")
+        # Gallery: the current slide in every theme, rendered in the background while this tab is shown
+        self.theme_gallery_frame = ctk.CTkScrollableFrame(self.tab("Themes"))
+        self.theme_gallery_frame.pack(expand=True, fill="both")
+        self.theme_preview_buttons: Dict[str, ctk.CTkButton] = {}
+        self.theme_preview_images: Dict[str, Thumbnail] = {}  # Latest preview per theme, decoded off the Tk thread
+        self._rebuild_theme_gallery(self.controller.state.available_themes, self.controller.state.selected_theme)
 
         # Settings Tab
         self.add("Settings")
@@ -290,135 +954,516 @@ class SidePanel(ctk.CTkTabview):
                                                  command=self._on_live_preview_toggled)
         self.live_preview_switch.pack(padx=20, pady=10, anchor="w")
 
+        self.presentation_deck_switch_var = ctk.StringVar(value="on" if self.controller.state.is_presentation_deck_enabled else "off")
+        self.presentation_deck_switch = ctk.CTkSwitch(settings_tab, text="Single-Document Presentation",
+                                                      variable=self.presentation_deck_switch_var, onvalue="on", offvalue="off",
+                                                      command=self._on_presentation_deck_toggled)
+        self.presentation_deck_switch.pack(padx=20, pady=(0, 10), anchor="w")
+
+        self.large_file_mode_switch_var = ctk.StringVar(value="on" if self.controller.state.is_large_file_mode_enabled else "off")
+        self.large_file_mode_switch = ctk.CTkSwitch(settings_tab, text="Large File Mode",
+                                                    variable=self.large_file_mode_switch_var, onvalue="on", offvalue="off",
+                                                    command=self._on_large_file_mode_toggled)
+        self.large_file_mode_switch.pack(padx=20, pady=(0, 10), anchor="w")
+
+        self.parallel_rendering_switch_var = ctk.StringVar(value="on" if self.controller.state.is_parallel_rendering_enabled else "off")
+        self.parallel_rendering_switch = ctk.CTkSwitch(settings_tab, text="Parallel Rendering",
+                                                       variable=self.parallel_rendering_switch_var, onvalue="on", offvalue="off",
+                                                       command=self._on_parallel_rendering_toggled)
+        self.parallel_rendering_switch.pack(padx=20, pady=(0, 10), anchor="w")
+
+        self.draft_preview_switch_var = ctk.StringVar(value="on" if self.controller.state.is_draft_preview_enabled else "off")
+        self.draft_preview_switch = ctk.CTkSwitch(settings_tab, text="Draft Thumbnails",
+                                                  variable=self.draft_preview_switch_var, onvalue="on", offvalue="off",
+                                                  command=self._on_draft_preview_toggled)
+        self.draft_preview_switch.pack(padx=20, pady=(0, 10), anchor="w")
+
+        # Browser Preview Server
+        self.preview_server_switch_var = ctk.StringVar(value="on" if self.controller.state.is_preview_server_enabled else "off")
+        self.preview_server_switch = ctk.CTkSwitch(settings_tab, text="Browser Preview Server",
+                                                   variable=self.preview_server_switch_var, onvalue="on", offvalue="off",
+                                                   command=self._on_preview_server_toggled)
+        self.preview_server_switch.pack(padx=20, pady=(0, 2), anchor="w")
+        self.preview_server_url_button = ctk.CTkButton(settings_tab, text="", fg_color="transparent", anchor="w",
+                                                       text_color=("#1f538d", "#90CAF9"), command=self._on_preview_server_url_clicked)
+        self._update_preview_server_url_button()
+
         # Debounce Delay OptionMenu
         ctk.CTkLabel(settings_tab, text="Preview Debounce Time (seconds):").pack(padx=20, pady=(10,0), anchor="w")
         self.debounce_option_menu = ctk.CTkOptionMenu(
             settings_tab,
-            values=[str(d) for d in self.controller.state.available_debounce_delays],
+            values=[str(d) for d in self.controller.state.available_debounce_delays] + [self.ADAPTIVE_DEBOUNCE_OPTION],
             command=self._on_debounce_delay_selected
         )
-        self.debounce_option_menu.set(str(self.controller.state.debounce_delay))
-        self.debounce_option_menu.pack(padx=20, pady=(0,10), fill="x")
+        self.debounce_option_menu.set(self._debounce_option_text())
+        self.debounce_option_menu.pack(padx=20, pady=(0,2), fill="x")
+
+        self.effective_debounce_label = ctk.CTkLabel(settings_tab, text=self._effective_debounce_text())
+        self.effective_debounce_label.pack(padx=20, pady=(0,10), anchor="w")
 
 
     def _on_theme_selected(self, theme_name: str):
         self.controller.apply_theme(theme_name)
 
+    def _on_recent_file_selected(self, option: str):
+        self.recent_files_menu.set(self.RECENT_FILES_OPTION)
+        file_path = self.recent_file_paths.get(option)
+        if file_path is not None:
+            self.controller.open_document(file_path)
+
+    def update_recent_files(self, recent_files: List[Path]):
+        self.recent_file_paths = {f"{path.name}  ({path.parent})": path for path in recent_files}
+        self.recent_files_menu.configure(values=[self.RECENT_FILES_OPTION] + list(self.recent_file_paths))
+        self.recent_files_menu.set(self.RECENT_FILES_OPTION)
+
+    def _on_project_search_changed(self, event=None):
+        if self._project_search_job is not None:
+            self.after_cancel(self._project_search_job)
+        self._project_search_job = self.after(self.SEARCH_DELAY_MS, self._run_project_search)
+
+    def _run_project_search(self):
+        if self._project_search_job is not None:
+            self.after_cancel(self._project_search_job)
+            self._project_search_job = None
+        self.controller.search_project(self.project_search_entry.get())
+
+    def update_search_results(self, hits: List['SearchHit'], summary: str):
+        self.search_summary_label.configure(text=summary)
+        self.search_result_list.set_hits(hits)
+
+    def update_project_files(self, root: Optional[Path], entries: List['ProjectFileEntry'], is_scanning: bool):
+        if root is None:
+            self.project_label.configure(text="No folder opened")
+        else:
+            scanning = " (scanning...)" if is_scanning else ""
+            self.project_label.configure(text=f"{root.name}: {len(entries)} decks{scanning}")
+        self.project_file_list.set_entries(entries)
+
     def _on_live_preview_toggled(self):
         is_enabled = self.live_preview_switch_var.get() == "on"
         self.controller.toggle_live_preview(enabled=is_enabled)
 
+    def _on_large_file_mode_toggled(self):
+        self.controller.set_large_file_mode(self.large_file_mode_switch_var.get() == "on")
+
+    def _on_parallel_rendering_toggled(self):
+        self.controller.set_parallel_rendering(self.parallel_rendering_switch_var.get() == "on")
+
+    def _on_draft_preview_toggled(self):
+        self.controller.set_draft_preview(self.draft_preview_switch_var.get() == "on")
+
+    def _on_preview_server_toggled(self):
+        self.controller.toggle_preview_server(self.preview_server_switch_var.get() == "on")
+
+    def _on_preview_server_url_clicked(self):
+        if self.controller.state.preview_server_url:
+            webbrowser.open(self.controller.state.preview_server_url)
+
+    def _update_preview_server_url_button(self):
+        url = self.controller.state.preview_server_url
+        if url:
+            self.preview_server_url_button.configure(text=f"Open {url}")
+            self.preview_server_url_button.pack(padx=20, pady=(0, 10), anchor="w", after=self.preview_server_switch)
+        else:
+            self.preview_server_url_button.pack_forget()
+
+    def _on_presentation_deck_toggled(self):
+        self.controller.set_presentation_deck_enabled(self.presentation_deck_switch_var.get() == "on")
+
     def _on_debounce_delay_selected(self, delay_str: str):
-        self.controller.set_debounce_delay(float(delay_str))
+        if delay_str == self.ADAPTIVE_DEBOUNCE_OPTION:
+            self.controller.set_adaptive_debounce(True)
+        else:
+            self.controller.set_debounce_delay(float(delay_str))
+
+    def _debounce_option_text(self) -> str:
+        if self.controller.state.is_adaptive_debounce_enabled:
+            return self.ADAPTIVE_DEBOUNCE_OPTION
+        return str(self.controller.state.debounce_delay)
+
+    def _effective_debounce_text(self) -> str:
+        return f"Effective delay: {self.controller.state.effective_debounce_delay:.2f} s"
 
     def update_settings_ui(self):
         """Updates the settings UI elements based on AppState."""
         self.live_preview_switch_var.set("on" if self.controller.state.is_live_preview_enabled else "off")
-        self.debounce_option_menu.set(str(self.controller.state.debounce_delay))
+        self.presentation_deck_switch_var.set("on" if self.controller.state.is_presentation_deck_enabled else "off")
+        self.large_file_mode_switch_var.set("on" if self.controller.state.is_large_file_mode_enabled else "off")
+        self.parallel_rendering_switch_var.set("on" if self.controller.state.is_parallel_rendering_enabled else "off")
+        self.draft_preview_switch_var.set("on" if self.controller.state.is_draft_preview_enabled else "off")
+        self.preview_server_switch_var.set("on" if self.controller.state.is_preview_server_enabled else "off")
+        self._update_preview_server_url_button()
+        self.debounce_option_menu.set(self._debounce_option_text())
+        self.effective_debounce_label.configure(text=self._effective_debounce_text())
 
     def update_theme_selection(self, themes: list, selected_theme: str):
         self.theme_option_menu.configure(values=themes)
         self.theme_option_menu.set(selected_theme)
+        if list(self.theme_preview_buttons) != list(themes):
+            self._rebuild_theme_gallery(themes, selected_theme)
+        for theme_name, button in self.theme_preview_buttons.items():
+            self._apply_theme_preview_border(button, theme_name == selected_theme)
+
+    def _rebuild_theme_gallery(self, themes: list, selected_theme: str):
+        for button in self.theme_preview_buttons.values():
+            button.destroy()
+        self.theme_preview_buttons = {}
+        for theme_name in themes:
+            button = ctk.CTkButton(self.theme_gallery_frame, text=theme_name, compound="top", fg_color="transparent",
+                                   text_color=("gray10", "gray90"), hover_color=("gray75", "gray30"),
+                                   command=lambda name=theme_name: self.controller.apply_theme(name))
+            self._apply_theme_preview_border(button, theme_name == selected_theme)
+            button.pack(pady=2, padx=2, fill="x")
+            self.theme_preview_buttons[theme_name] = button
+
+    def _apply_theme_preview_border(self, button: ctk.CTkButton, is_selected: bool):
+        button.configure(border_width=2 if is_selected else 0, border_color=("#3a7ebf", "#1f538d"))
+
+    def update_theme_preview(self, theme_name: str, image: Thumbnail):
+        """Shows a theme's rendering of the current slide on its gallery button."""
+        button = self.theme_preview_buttons.get(theme_name)
+        if button is None:
+            return
+        self.theme_preview_images[theme_name] = image
+
+        def redraw():
+            if self.theme_preview_images.get(theme_name) is image:
+                self.update_theme_preview(theme_name, image)
+
+        decoded = _decoded_image(self, image, redraw)
+        if decoded is None:
+            return  # Shown once the decode worker is done
+        try:
+            # Previews arrive pre-scaled to device pixels; CTkImage sizes are in scaled units.
+            scaling = ctk.ScalingTracker.get_widget_scaling(self.theme_gallery_frame)
+            display_size = (max(1, round(image.width / scaling)), max(1, round(image.height / scaling)))
+            button.configure(image=ctk.CTkImage(light_image=decoded, dark_image=decoded, size=display_size))
+        except Exception as e:
+            print(f"Error displaying preview of theme '{theme_name}': {e}")
+
+    def _on_tab_changed(self):
+        self.controller.set_theme_gallery_visible(self.get() == "Themes")
 
-    def update_slide_list(self, slides: List['SlideData'], current_slide_index: int, slide_images: List[bytes]):
+    def update_slide_list(self, slides: List['SlideData'], current_slide_index: int, slide_thumbnails: List[Optional[Thumbnail]]):
         for widget in self.slide_buttons:
             widget.destroy()
         self.slide_buttons.clear()
+        self.slide_list_entries = list(slides)
+        self.current_slide_index = current_slide_index
+        self._shown_thumbnails.clear()
+
+        # Fallback to text if no thumbnails are provided or if there's a mismatch
+        if not slide_thumbnails or len(slide_thumbnails) != len(slides):
+            slide_thumbnails = [None] * len(slides)
+        self.slide_thumbnails = list(slide_thumbnails)
+
+        decoded_positions = self._thumbnail_decode_positions(len(slides))
+        for position, (slide, thumbnail) in enumerate(zip(slides, slide_thumbnails)):
+            widget = ctk.CTkButton(
+                self.slides_frame,
+                command=lambda idx=slide.index: self.controller.navigate_to_slide(idx)
+            )
+            self.slide_buttons.append(widget)
+            self._show_slide_widget(widget, slide, thumbnail, slide.index == current_slide_index,
+                                    is_decoded=position in decoded_positions)
+
+    def update_slide_entry(self, slide: 'SlideData', current_slide_index: int):
+        """Refreshes the metadata of one slide entry; its current thumbnail stays until re-rendered."""
+        position = slide.index - 1
+        if not 0 <= position < len(self.slide_buttons):
+            return
+        self.slide_list_entries[position] = slide
+        self.current_slide_index = current_slide_index
+        if self.slide_thumbnails[position] is None:
+            self._show_slide_widget(self.slide_buttons[position], slide, None, slide.index == current_slide_index)
+
+    def select_slide(self, current_slide_index: int):
+        """Moves the selection highlight; only the previously and newly selected entries are redrawn."""
+        previous_slide_index, self.current_slide_index = self.current_slide_index, current_slide_index
+        decoded_positions = self._thumbnail_decode_positions(len(self.slide_buttons))
+        for slide_index in {previous_slide_index, current_slide_index}:
+            position = slide_index - 1
+            if 0 <= position < len(self.slide_buttons):
+                self._show_slide_widget(self.slide_buttons[position], self.slide_list_entries[position],
+                                        self.slide_thumbnails[position], slide_index == current_slide_index,
+                                        is_decoded=position in decoded_positions)
+
+    def update_slide_image(self, slide_index: int, thumbnail: Thumbnail, current_slide_index: int):
+        """Replaces a single slide entry with its rendered thumbnail, leaving the rest untouched."""
+        position = slide_index - 1
+        if not 0 <= position < len(self.slide_buttons):
+            return
+        slide = self.slide_list_entries[position]
+        self.slide_thumbnails[position] = thumbnail
+        self.current_slide_index = current_slide_index
+        self._show_slide_widget(self.slide_buttons[position], slide, thumbnail, slide.index == current_slide_index,
+                                is_decoded=position in self._thumbnail_decode_positions(len(self.slide_buttons)))
+
+    def update_slide_diagnostics(self, severities: Dict[int, str]):
+        """Outlines the entries of slides that have validation errors (red) or warnings (orange)."""
+        changed = set(severities.items()) ^ set(self.slide_diagnostic_severities.items())
+        self.slide_diagnostic_severities = dict(severities)
+        for slide_index in {slide_index for slide_index, _ in changed}:
+            if 0 < slide_index <= len(self.slide_buttons):
+                self._apply_diagnostic_border(self.slide_buttons[slide_index - 1], slide_index)
+
+    def _apply_diagnostic_border(self, widget: ctk.CTkButton, slide_index: int):
+        severity = self.slide_diagnostic_severities.get(slide_index)
+        if severity is None:
+            widget.configure(border_width=0)
+        else:
+            widget.configure(border_width=2, border_color="#E53935" if severity == "error" else "#FB8C00")
 
-        # Determine thumbnail width dynamically
-        frame_width = self.slides_frame.winfo_width()
-        horizontal_padding = 10  # Total padding (left + right) - Reduced
+    def get_thumbnail_pixel_width(self) -> int:
+        """Thumbnail width in device pixels: the panel width minus padding, so HiDPI displays get sharp images."""
+        scaling = ctk.ScalingTracker.get_widget_scaling(self.slides_frame)
+        horizontal_padding = 10  # Total padding (left + right) plus the scrollbar allowance
         min_thumbnail_width = 80
-        default_thumbnail_width = 220 # Approx 1.7x of 128
-
-        if frame_width > (horizontal_padding + min_thumbnail_width): # Check if frame is wide enough
-            thumbnail_width = frame_width - horizontal_padding
-            if thumbnail_width < min_thumbnail_width: # Should not happen if previous check is correct, but as a safeguard
-                thumbnail_width = min_thumbnail_width
-        elif frame_width > min_thumbnail_width : # Frame is somewhat rendered but not very wide
-             thumbnail_width = frame_width - horizontal_padding # Allow smaller than default if frame is small
-             if thumbnail_width < min_thumbnail_width:
-                 thumbnail_width = min_thumbnail_width
-        else: # Frame is very small or not rendered (e.g. winfo_width is 1)
-            thumbnail_width = default_thumbnail_width
-
-        # Fallback to text if no images are provided or if there's a mismatch
-        if not slide_images or len(slide_images) != len(slides):
-            for slide in slides:
-                button_text = f"Slide {slide.index}"
-                # Try to get a title or the first line of content
-                title_or_content = ""
-                if slide.title:
-                    title_or_content = slide.title[:20]
-                elif slide.content:
-                    first_line = slide.content.strip().splitlines()[0] if slide.content.strip() else ""
-                    title_or_content = first_line[:20]
-                if title_or_content:
-                     button_text += f": {title_or_content}..."
+        default_thumbnail_width = 128
+
+        frame_width = self.slides_frame.winfo_width() # Already in device pixels
+        if frame_width > (horizontal_padding + min_thumbnail_width) * scaling:
+            return int(frame_width - horizontal_padding * scaling)
+        # Frame is very small or not rendered yet (e.g. winfo_width is 1)
+        return int(default_thumbnail_width * scaling)
+
+    def _on_slides_frame_configure(self, event=None):
+        # Re-render thumbnails once the panel width settles at a noticeably different size.
+        if self._thumbnail_resize_job is not None:
+            self.after_cancel(self._thumbnail_resize_job)
+        self._thumbnail_resize_job = self.after(300, self._apply_thumbnail_width)
+
+    def _apply_thumbnail_width(self):
+        self._thumbnail_resize_job = None
+        pixel_width = self.get_thumbnail_pixel_width()
+        if abs(pixel_width - self._last_thumbnail_pixel_width) > 8:
+            self._last_thumbnail_pixel_width = pixel_width
+            self.controller.on_thumbnail_width_changed()
+
+    def get_visible_slide_indices(self) -> List[int]:
+        """Returns the 1-based indices of the slides currently scrolled into view in the Slides tab."""
+        return [position + 1 for position in self._visible_slide_positions(len(self.slide_buttons))]
+
+    def _visible_slide_positions(self, slide_total: int) -> range:
+        if slide_total == 0:
+            return range(0)
+        try:
+            top, bottom = self.slides_frame._parent_canvas.yview()
+        except (AttributeError, tkinter.TclError):
+            return range(0)
+        return range(int(top * slide_total), min(slide_total, int(bottom * slide_total) + 1))
+
+    def _thumbnail_decode_positions(self, slide_total: int) -> range:
+        visible = self._visible_slide_positions(slide_total)
+        if not visible:
+            visible = range(0, 1)  # Not laid out yet; the list starts at the top
+        return range(max(0, visible.start - self.THUMBNAIL_DECODE_MARGIN),
+                     min(slide_total, visible.stop + self.THUMBNAIL_DECODE_MARGIN))
+
+    def _on_slides_yscroll(self, first, last):
+        self.slides_frame._scrollbar.set(first, last)
+        self._schedule_thumbnail_decode()
+
+    def _schedule_thumbnail_decode(self):
+        if self._thumbnail_decode_job is None:
+            self._thumbnail_decode_job = self.after_idle(self._decode_visible_thumbnails)
+
+    def _decode_visible_thumbnails(self):
+        """Shows the decoded thumbnails of rows scrolled into view and releases the ones scrolled away."""
+        self._thumbnail_decode_job = None
+        wanted = set(self._thumbnail_decode_positions(len(self.slide_buttons)))
+        for position in sorted(wanted | set(self._shown_thumbnails)):
+            thumbnail = self.slide_thumbnails[position] if position < len(self.slide_thumbnails) else None
+            if thumbnail is None or position >= len(self.slide_buttons):
+                self._shown_thumbnails.pop(position, None)
+                continue
+            if (position in wanted) == (self._shown_thumbnails.get(position) is thumbnail):
+                continue  # Already showing what it should
+            slide = self.slide_list_entries[position]
+            self._show_slide_widget(self.slide_buttons[position], slide, thumbnail,
+                                    slide.index == self.current_slide_index, is_decoded=position in wanted)
+
+    def _slide_button_text(self, slide: 'SlideData') -> str:
+        button_text = f"Slide {slide.index}"
+        # Try to get a title or the first line of content
+        title_or_content = ""
+        if slide.title:
+            title_or_content = slide.title[:20]
+        elif slide.content:
+            first_line = slide.content.strip().splitlines()[0] if slide.content.strip() else ""
+            title_or_content = first_line[:20]
+        if title_or_content:
+            button_text += f": {title_or_content}..."
+        else:
+            button_text += "..."
+        return button_text
+
+    def _show_slide_widget(self, widget: ctk.CTkButton, slide: 'SlideData', thumbnail: Optional[Thumbnail], is_current: bool,
+                           is_decoded: bool = True):
+        self._apply_diagnostic_border(widget, slide.index)
+        position = slide.index - 1
+        if thumbnail is not None:
+            try:
+                # Thumbnails arrive pre-scaled to device pixels; CTkImage sizes are in scaled units.
+                scaling = ctk.ScalingTracker.get_widget_scaling(self.slides_frame)
+                display_size = (max(1, round(thumbnail.width / scaling)), max(1, round(thumbnail.height / scaling)))
+                fg_color = ("#90CAF9", "#1E88E5") if is_current else "transparent" # Example selected color (light blueish)
+                # Pixels are decoded by the decode worker; until they arrive the row keeps a sized placeholder.
+                image = _decoded_image(self, thumbnail, self._schedule_thumbnail_decode) if is_decoded else None
+                if image is not None:
+                    ctk_image = ctk.CTkImage(light_image=image, dark_image=image, size=display_size)
+                    widget.configure(image=ctk_image, text="", fg_color=fg_color)
+                    self._shown_thumbnails[position] = thumbnail
+                elif is_decoded and position in self._shown_thumbnails:
+                    widget.configure(fg_color=fg_color)  # The previous image stays until the new one is decoded
                 else:
-                    button_text += "..."
-
-
-                button = ctk.CTkButton(
-                    self.slides_frame,
-                    text=button_text,
-                    command=lambda idx=slide.index: self.controller.navigate_to_slide(idx)
-                )
-                if slide.index == current_slide_index:
-                    button.configure(fg_color=("#3a7ebf", "#1f538d"))
-                button.pack(fill="x", pady=2, padx=5)
-                self.slide_buttons.append(button)
+                    # Rows away from the viewport hold no pixels but keep the image's size, so the list does not jump.
+                    widget.configure(image=None, text=f"Slide {slide.index}", width=display_size[0],
+                                     height=display_size[1], fg_color=fg_color)
+                    self._shown_thumbnails.pop(position, None)
+                widget.pack_configure(fill="none", padx=2, pady=2) # padx/pady Reduced
+                return
+            except Exception as e:
+                print(f"Error displaying slide thumbnail {slide.index}: {e}")
+
+        self._shown_thumbnails.pop(position, None)
+        widget.configure(image=None, text=self._slide_button_text(slide),
+                         width=self.SLIDE_BUTTON_SIZE[0], height=self.SLIDE_BUTTON_SIZE[1],
+                         fg_color=("#3a7ebf", "#1f538d") if is_current else ctk.ThemeManager.theme["CTkButton"]["fg_color"])
+        widget.pack_configure(fill="x", pady=2, padx=5)
+
+class PresenterView(ctk.CTkToplevel):
+    """Presenter window: current slide, upcoming slide, speaker notes and an elapsed-time timer."""
+    CURRENT_SLIDE_WIDTH = 800  # Logical pixels; images are rendered at this width times the display scaling
+    NEXT_SLIDE_WIDTH = 360
+
+    def __init__(self, parent, controller: 'AppController'):
+        super().__init__(parent)
+        self.controller = controller
+        self.title("Presenter View")
+        self.geometry("1280x760")
+        self.protocol("WM_DELETE_WINDOW", lambda: self.controller.toggle_speaker_notes(False))
+        for sequence in ("<Right>", "<Down>", "<Next>", "<space>"):
+            self.bind(sequence, lambda e: self.controller.navigate_slide("next"))
+        for sequence in ("<Left>", "<Up>", "<Prior>", "<BackSpace>"):
+            self.bind(sequence, lambda e: self.controller.navigate_slide("prev"))
+        self.bind("<Escape>", lambda e: self.controller.toggle_speaker_notes(False))
+
+        self.grid_columnconfigure(0, weight=3)
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.current_slide_label = ctk.CTkLabel(self, text="Rendering...")
+        self.current_slide_label.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        side_frame = ctk.CTkFrame(self)
+        side_frame.grid(row=0, column=1, sticky="nsew", padx=(0, 10), pady=10)
+        ctk.CTkLabel(side_frame, text="Next", anchor="w").pack(side="top", fill="x", padx=5, pady=(5, 0))
+        self.next_slide_label = ctk.CTkLabel(side_frame, text="")
+        self.next_slide_label.pack(side="top", padx=5, pady=5)
+        ctk.CTkLabel(side_frame, text="Notes", anchor="w").pack(side="top", fill="x", padx=5, pady=(5, 0))
+        self.notes_textbox = ctk.CTkTextbox(side_frame, wrap="word", font=("Arial", 16))
+        self.notes_textbox.pack(side="top", expand=True, fill="both", padx=5, pady=5)
+        self.notes_textbox.configure(state="disabled")
+
+        status_frame = ctk.CTkFrame(self, height=40, corner_radius=0)
+        status_frame.grid(row=1, column=0, columnspan=2, sticky="ew")
+        self.position_label = ctk.CTkLabel(status_frame, text="")
+        self.position_label.pack(side="left", padx=10, pady=5)
+        ctk.CTkButton(status_frame, text="Reset", width=70, command=self.reset_timer).pack(side="right", padx=10, pady=5)
+        self.timer_label = ctk.CTkLabel(status_frame, text="00:00:00", font=("Arial", 20))
+        self.timer_label.pack(side="right", padx=10, pady=5)
+
+        self._notes: Optional[str] = None
+        self._current_image: Optional[Thumbnail] = None
+        self._next_image: Optional[Thumbnail] = None
+        self._started_at = time.monotonic()
+        self._timer_job: Optional[str] = None
+        self._tick()
+        self.focus_set()
+
+    def get_slide_pixel_width(self) -> int:
+        return int(self.CURRENT_SLIDE_WIDTH * ctk.ScalingTracker.get_window_scaling(self))
+
+    def show_slides(self, current_slide_index: int, slide_count: int, notes: Optional[str],
+                    current_image: Optional[Thumbnail], next_image: Optional[Thumbnail], has_next: bool):
+        self.position_label.configure(text=f"Slide {current_slide_index} / {slide_count}" if slide_count else "No slides")
+        if current_image is not self._current_image or current_image is None:
+            self._current_image = current_image
+            self._show_image(self.current_slide_label, current_image, self.CURRENT_SLIDE_WIDTH,
+                             "Rendering..." if slide_count else "No slides to display.")
+        if next_image is not self._next_image or next_image is None:
+            self._next_image = next_image
+            self._show_image(self.next_slide_label, next_image, self.NEXT_SLIDE_WIDTH,
+                             "Rendering..." if has_next else "End of presentation")
+        if notes != self._notes:
+            self._notes = notes
+            self.notes_textbox.configure(state="normal")
+            self.notes_textbox.delete("1.0", "end")
+            self.notes_textbox.insert("1.0", notes or "")
+            self.notes_textbox.configure(state="disabled")
+
+    def _show_image(self, label: ctk.CTkLabel, image: Optional[Thumbnail], width: int, placeholder: str):
+        if image is None:
+            label.configure(image=None, text=placeholder)
             return
 
-        thumbnail_width = 128  # Thumbnail width
-
-        for i, slide in enumerate(slides):
-            if i < len(slide_images) and slide_images[i]:
-                try:
-                    img_data = slide_images[i]
-                    pil_image = Image.open(io.BytesIO(img_data))
-
-                    aspect_ratio = pil_image.height / pil_image.width
-                    thumbnail_height = int(thumbnail_width * aspect_ratio)
-
-                    ctk_image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(thumbnail_width, thumbnail_height))
-
-                    image_widget = ctk.CTkButton(
-                        self.slides_frame,
-                        image=ctk_image,
-                        text="",
-                        command=lambda idx=slide.index: self.controller.navigate_to_slide(idx),
-                        fg_color="transparent"
-                    )
-
-                    if slide.index == current_slide_index:
-                        image_widget.configure(fg_color=("#90CAF9", "#1E88E5")) # Example selected color (light blueish)
-
-                    image_widget.pack(padx=2, pady=2) # padx/pady Reduced
-                    self.slide_buttons.append(image_widget)
-
-                except Exception as e:
-                    print(f"Error displaying slide thumbnail {slide.index}: {e}")
-                    error_button = ctk.CTkButton(
-                        self.slides_frame,
-                        text=f"Slide {slide.index} (Error)",
-                        command=lambda idx=slide.index: self.controller.navigate_to_slide(idx)
-                    )
-                    if slide.index == current_slide_index:
-                        error_button.configure(fg_color=("#3a7ebf", "#1f538d"))
-                    error_button.pack(fill="x", pady=2, padx=5)
-                    self.slide_buttons.append(error_button)
-            else:
-                # Fallback for missing image for a specific slide
-                fallback_button = ctk.CTkButton(
-                    self.slides_frame,
-                    text=f"Slide {slide.index} (No image data)",
-                    command=lambda idx=slide.index: self.controller.navigate_to_slide(idx)
-                )
-                if slide.index == current_slide_index:
-                    fallback_button.configure(fg_color=("#3a7ebf", "#1f538d"))
-                fallback_button.pack(fill="x", pady=2, padx=5)
-                self.slide_buttons.append(fallback_button)
+        def redraw():
+            if (self._current_image if label is self.current_slide_label else self._next_image) is image:
+                self._show_image(label, image, width, placeholder)
+
+        decoded = _decoded_image(self, image, redraw)
+        if decoded is None:
+            return  # The previous image stays until the decode worker is done
+        size = (width, max(1, round(width * image.height / image.width)))
+        label.configure(image=ctk.CTkImage(light_image=decoded, dark_image=decoded, size=size), text="")
+
+    def reset_timer(self):
+        self._started_at = time.monotonic()
+        self._update_timer_label()
+
+    def _update_timer_label(self):
+        elapsed = int(time.monotonic() - self._started_at)
+        self.timer_label.configure(text=f"{elapsed // 3600:02d}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}")
+
+    def _tick(self):
+        self._update_timer_label()
+        self._timer_job = self.after(1000, self._tick)
+
+    def destroy(self):
+        if self._timer_job:
+            self.after_cancel(self._timer_job)
+            self._timer_job = None
+        super().destroy()
+
+class DocumentTabBar(ctk.CTkFrame):
+    """One button per open document, with a close button each and a button for a new tab."""
+
+    def __init__(self, parent, controller: 'AppController'):
+        super().__init__(parent, height=32, corner_radius=0, fg_color="transparent")
+        self.controller = controller
+        self.tab_frames: List[ctk.CTkFrame] = []
+        self.new_tab_button = ctk.CTkButton(self, text="+", width=28, command=self.controller.new_tab)
+        self.new_tab_button.pack(side="right", padx=(5, 0), pady=2)
+
+    def update_tabs(self, sessions: List['DocumentSession'], active_session_id: int):
+        for frame in self.tab_frames:
+            frame.destroy()
+        self.tab_frames = []
+        for session in sessions:
+            is_active = session.session_id == active_session_id
+            frame = ctk.CTkFrame(self, corner_radius=6, fg_color=("gray75", "gray30") if is_active else "transparent")
+            select_button = ctk.CTkButton(frame, text=session.display_name, width=80, fg_color="transparent",
+                                          text_color=("gray10", "gray90"), hover_color=("gray70", "gray35"),
+                                          command=lambda session_id=session.session_id: self.controller.switch_document(session_id))
+            select_button.pack(side="left", padx=(2, 0), pady=2)
+            close_button = ctk.CTkButton(frame, text="x", width=20, fg_color="transparent",
+                                         text_color=("gray10", "gray90"), hover_color=("gray70", "gray35"),
+                                         command=lambda session_id=session.session_id: self.controller.close_tab(session_id))
+            close_button.pack(side="left", padx=(0, 2), pady=2)
+            frame.pack(side="left", padx=(0, 2), pady=2)
+            self.tab_frames.append(frame)
+
 
 class MainAppView(ctk.CTk):
     def __init__(self, controller: 'AppController'):
@@ -429,8 +1474,10 @@ class MainAppView(ctk.CTk):
         self.presentation_html_frame: Optional[tkinterweb.HtmlFrame] = None
         self.popup_window: Optional[ctk.CTkToplevel] = None
         self.popup_html_frame: Optional[tkinterweb.HtmlFrame] = None
+        self.presenter_view: Optional[PresenterView] = None
         self.setup_window()
         self.create_widgets()
+        self.after_idle(self.controller.restore_session)
 
     def setup_window(self):
         self.title("Marp Editor")
@@ -476,15 +1523,20 @@ class MainAppView(ctk.CTk):
         self.main_content_frame = ctk.CTkFrame(self, corner_radius=0)
         self.main_content_frame.grid(row=2, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
         self.main_content_frame.grid_columnconfigure(1, weight=1)
-        self.main_content_frame.grid_rowconfigure(0, weight=1) # Only one row needed for editor now
+        self.main_content_frame.grid_rowconfigure(1, weight=1) # Document tabs above the editor
 
         # SidePanel
         self.side_panel = SidePanel(self.main_content_frame, self.controller)
-        self.side_panel.grid(row=0, column=0, sticky="nsw", padx=5, pady=5) # Spans the single row
+        self.side_panel.grid(row=0, column=0, rowspan=2, sticky="nsw", padx=5, pady=5) # Spans the tabs and the editor
+
+        # Document Tabs
+        self.document_tab_bar = DocumentTabBar(self.main_content_frame, self.controller)
+        self.document_tab_bar.grid(row=0, column=1, sticky="ew", padx=5, pady=(5, 0))
+        self.document_tab_bar.update_tabs(self.controller.state.sessions, self.controller.state.active_session_id)
 
         # Editor Panel
         self.editor_panel = EditorPanel(self.main_content_frame, self.controller)
-        self.editor_panel.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
+        self.editor_panel.grid(row=1, column=1, sticky="nsew", padx=5, pady=5)
 
         # self.preview_panel = PreviewPanel(self.main_content_frame, self.controller) # Preview panel removed
         # self.preview_panel.grid(row=1, column=1, sticky="nsew", padx=5, pady=5) # Preview panel removed
@@ -514,12 +1566,55 @@ class MainAppView(ctk.CTk):
         if self.presentation_html_frame:
             self.presentation_html_frame.load_html(html_content)
 
+    def show_presentation_slide(self, hidden_section_id: str, visible_section_id: str) -> bool:
+        """Switches the visible section of the loaded deck. Returns False if the DOM could not be updated."""
+        if not self.presentation_html_frame:
+            return False
+        try:
+            document = self.presentation_html_frame.document
+            if hidden_section_id != visible_section_id:
+                document.getElementById(hidden_section_id).style.display = "none"
+            document.getElementById(visible_section_id).style.display = "block"
+        except Exception as e:
+            print(f"Error switching presentation slide: {e}")
+            return False
+        return True
+
+    def patch_presentation_slide(self, section_id: str, section_class: str, section_style: str, fragment_html: str) -> bool:
+        """Replaces one slide section of the loaded deck in place. Returns False if the DOM could not be updated."""
+        if not self.presentation_html_frame:
+            return False
+        try:
+            element = self.presentation_html_frame.document.getElementById(section_id)
+            display = element.style.display
+            element.setAttribute("class", section_class)
+            element.setAttribute("style", section_style)
+            element.style.display = display
+            element.innerHTML = fragment_html
+        except Exception as e:
+            print(f"Error patching presentation slide {section_id}: {e}")
+            return False
+        return True
+
     def get_editor_content(self) -> str:
         return self.editor_panel.text_widget.get("1.0", "end-1c")
 
     def set_editor_content(self, content: str):
         self.editor_panel.set_content(content)
 
+    def begin_editor_stream(self, expected_chars: int = 0):
+        self.editor_panel.begin_streamed_content(expected_chars)
+
+    def get_editor_pending_chars(self) -> int:
+        """Characters handed to the editor that it has not inserted yet."""
+        return self.editor_panel.pending_insert_chars
+
+    def append_editor_content(self, text: str):
+        self.editor_panel.append_content(text)
+
+    def end_editor_stream(self):
+        self.editor_panel.end_streamed_content()
+
     def _on_aspect_ratio_change(self, aspect_ratio: str):
         self.controller.set_aspect_ratio(aspect_ratio)
 
@@ -529,11 +1624,15 @@ class MainAppView(ctk.CTk):
     def _show_file_menu(self):
         menu = tkinter.Menu(self, tearoff=0)
         menu.add_command(label="New", command=self.controller.create_new_document)
+        menu.add_command(label="New Tab", command=self.controller.new_tab)
         menu.add_command(label="Open...", command=self.controller.open_document)
         menu.add_command(label="Save", command=self.controller.save_document)
         menu.add_command(label="Save As...", command=lambda: self.controller.save_document(file_path=None))
+        menu.add_command(label="Close Tab", command=lambda: self.controller.close_tab(self.controller.state.active_session_id))
         export_menu = tkinter.Menu(menu, tearoff=0)
         export_menu.add_command(label="Export as HTML...", command=self.controller.export_html)
+        export_menu.add_command(label="Export as Images...", command=self.controller.export_images)
+        export_menu.add_command(label="Cancel Image Export", command=self.controller.cancel_image_export)
         menu.add_cascade(label="Export", menu=export_menu)
         try:
             menu.tk_popup(self.file_menu_button.winfo_rootx(), self.file_menu_button.winfo_rooty() + self.file_menu_button.winfo_height())
@@ -543,6 +1642,8 @@ class MainAppView(ctk.CTk):
     def _show_view_menu(self):
         menu = tkinter.Menu(self, tearoff=0)
         menu.add_command(label="Toggle Presentation Mode", command=self.toggle_presentation_mode)
+        menu.add_command(label="Presenter View",
+                         command=lambda: self.controller.toggle_speaker_notes(not self.controller.state.is_presenter_view_open))
         try:
             menu.tk_popup(self.view_menu_button.winfo_rootx(), self.view_menu_button.winfo_rooty() + self.view_menu_button.winfo_height())
         finally:
@@ -551,8 +1652,72 @@ class MainAppView(ctk.CTk):
     def update_theme_selection(self, themes: list, selected_theme: str):
         self.side_panel.update_theme_selection(themes, selected_theme)
 
-    def update_slide_list(self, slides: List['SlideData'], current_slide_index: int, slide_images: List[bytes]):
-        self.side_panel.update_slide_list(slides, current_slide_index, slide_images)
+    def update_slide_list(self, slides: List['SlideData'], current_slide_index: int, slide_thumbnails: List[Optional[Thumbnail]]):
+        self.side_panel.update_slide_list(slides, current_slide_index, slide_thumbnails)
+
+    def update_slide_image(self, slide_index: int, thumbnail: Thumbnail, current_slide_index: int):
+        self.side_panel.update_slide_image(slide_index, thumbnail, current_slide_index)
+
+    def get_thumbnail_pixel_width(self) -> int:
+        return self.side_panel.get_thumbnail_pixel_width()
+
+    def get_visible_slide_indices(self) -> List[int]:
+        return self.side_panel.get_visible_slide_indices()
+
+    def get_cursor_offset(self) -> Optional[int]:
+        """Returns the editor cursor position as a character offset into the document."""
+        try:
+            line, column = map(int, self.editor_panel.text_widget._textbox.index("insert").split("."))
+        except tkinter.TclError:
+            return None
+        return self.controller.state.document.index_to_offset(line, column)
+
+    def set_cursor_offset(self, offset: int):
+        """Moves the editor cursor to a character offset into the document and scrolls it into view."""
+        textbox = self.editor_panel.text_widget._textbox
+        index = self.controller.state.document.offset_to_index(offset)
+        textbox.mark_set("insert", index)
+        textbox.see(index)
+
+    def update_document_tabs(self, sessions: List['DocumentSession'], active_session_id: int):
+        self.document_tab_bar.update_tabs(sessions, active_session_id)
+
+    def show_diagnostics(self, diagnostics: List[Tuple[int, str, str]]):
+        self.editor_panel.set_diagnostics(diagnostics)
+
+    def update_slide_diagnostics(self, severities: Dict[int, str]):
+        self.side_panel.update_slide_diagnostics(severities)
+
+    def update_slide_entry(self, slide: 'SlideData', current_slide_index: int):
+        self.side_panel.update_slide_entry(slide, current_slide_index)
+
+    def select_slide(self, current_slide_index: int):
+        self.side_panel.select_slide(current_slide_index)
+
+    def update_outline(self, outline_index: 'OutlineIndex'):
+        self.side_panel.outline_view.set_outline(outline_index)
+
+    def update_project_files(self, root: Optional[Path], entries: List['ProjectFileEntry'], is_scanning: bool):
+        self.side_panel.update_project_files(root, entries, is_scanning)
+
+    def update_recent_files(self, recent_files: List[Path]):
+        self.side_panel.update_recent_files(recent_files)
+
+    def update_search_results(self, hits: List['SearchHit'], summary: str):
+        self.side_panel.update_search_results(hits, summary)
+
+    def update_theme_preview(self, theme_name: str, image: Thumbnail):
+        self.side_panel.update_theme_preview(theme_name, image)
+
+    def refresh_outline_selection(self):
+        self.side_panel.outline_view.redraw()
+
+    def scroll_editor_to_line(self, line: int):
+        """Moves the editor cursor to the start of a 1-based document line and scrolls it into view."""
+        textbox = self.editor_panel.text_widget._textbox
+        textbox.mark_set("insert", f"{line}.0")
+        textbox.see(f"{line}.0")
+        textbox.focus_set()
 
     def toggle_presentation_mode(self):
         if self.presentation_window is None or not self.presentation_window.winfo_exists():
@@ -609,3 +1774,24 @@ class MainAppView(ctk.CTk):
     def update_popup_window_content(self, html_content: str):
         if self.popup_html_frame and self.popup_window and self.popup_window.winfo_exists():
             self.popup_html_frame.load_html(html_content)
+
+    def open_presenter_view(self):
+        if self.presenter_view is None or not self.presenter_view.winfo_exists():
+            self.presenter_view = PresenterView(self, self.controller)
+        else:
+            self.presenter_view.focus()
+
+    def close_presenter_view(self):
+        if self.presenter_view and self.presenter_view.winfo_exists():
+            self.presenter_view.destroy()
+        self.presenter_view = None
+
+    def update_presenter_view(self, current_slide_index: int, slide_count: int, notes: Optional[str],
+                              current_image: Optional[Thumbnail], next_image: Optional[Thumbnail], has_next: bool):
+        if self.presenter_view and self.presenter_view.winfo_exists():
+            self.presenter_view.show_slides(current_slide_index, slide_count, notes, current_image, next_image, has_next)
+
+    def get_presenter_pixel_width(self) -> int:
+        if self.presenter_view and self.presenter_view.winfo_exists():
+            return self.presenter_view.get_slide_pixel_width()
+        return PresenterView.CURRENT_SLIDE_WIDTH
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The application is run from the repository root and imports its modules as "src.…".
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
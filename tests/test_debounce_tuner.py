@@ -0,0 +1,44 @@
+import pytest
+
+from src.services.debounce_tuner import AdaptiveDebounceTuner
+
+
+def test_fallback_without_measurements():
+    assert AdaptiveDebounceTuner().compute_delay(fallback=3.0) == 3.0
+
+
+def test_delay_follows_typing_cadence():
+    tuner = AdaptiveDebounceTuner()
+    for keystroke in range(20):
+        tuner.record_keystroke(timestamp=keystroke * 0.2)
+    assert tuner.compute_delay(fallback=1.0) == 0.3  # 1.5 x the typical gap
+
+
+def test_pauses_are_not_typing_gaps():
+    tuner = AdaptiveDebounceTuner()
+    for timestamp in (0.0, 0.1, 10.0, 10.1):
+        tuner.record_keystroke(timestamp=timestamp)
+    assert list(tuner.typing_gaps) == pytest.approx([0.1, 0.1])
+
+
+def test_expensive_renders_raise_the_delay_and_it_is_clamped():
+    tuner = AdaptiveDebounceTuner(min_delay=0.2, max_delay=5.0)
+    tuner.record_keystroke(timestamp=0.0)
+    tuner.record_keystroke(timestamp=0.1)
+    tuner.record_render(1.2)
+    assert tuner.compute_delay(fallback=1.0) == 1.2
+    for _ in range(20):
+        tuner.record_render(30.0)
+    assert tuner.compute_delay(fallback=1.0) == 5.0
+    tuner.reset()
+    tuner.record_render(0.01)
+    assert tuner.compute_delay(fallback=1.0) == 0.2
+
+
+def test_render_cost_estimate_follows_recent_renders():
+    tuner = AdaptiveDebounceTuner()
+    for duration in (4.0, 4.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0):
+        tuner.record_render(duration)
+    assert tuner.compute_delay(fallback=1.0) < 1.5
+    tuner.record_render(-1.0)  # Ignored
+    assert len(tuner.render_durations) == 8
@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip("playwright")  # The watcher shares the engine's Chromium for PNG and PDF output
+
+from src.services.deck_watcher import DeckWatcher
+from src.services.file_manager import FileManager
+from src.services.marp_engine import MarpEngine
+
+
+class FailingFileManager(FileManager):
+    def __init__(self):
+        self.failing = set()
+
+    def read_text(self, file_path):
+        if file_path in self.failing:
+            raise OSError(f"cannot read {file_path.name}")
+        return super().read_text(file_path)
+
+
+def _watcher(tmp_path, sources, file_manager=None):
+    return DeckWatcher(MarpEngine(), file_manager or FileManager(), sources, tmp_path / "out", formats=("html",))
+
+
+def test_discovery_is_recursive_and_skips_hidden_and_output_folders(tmp_path):
+    source = tmp_path / "decks"
+    (source / "talks").mkdir(parents=True)
+    (source / ".git").mkdir()
+    (source / "node_modules").mkdir()
+    (source / "intro.md").write_text("# Intro")
+    (source / "talks" / "deep.markdown").write_text("# Deep")
+    (source / "notes.txt").write_text("not a deck")
+    (source / ".git" / "hidden.md").write_text("# Hidden")
+    (source / "node_modules" / "readme.md").write_text("# Package")
+    watcher = DeckWatcher(MarpEngine(), FileManager(), [source], source / "out", formats=("html",))
+    (source / "out").mkdir()
+    (source / "out" / "generated.md").write_text("# Output")
+    found = watcher._discover()
+    assert found == {(source / "intro.md").resolve(): (source / "out" / "intro").resolve(),
+                     (source / "talks" / "deep.markdown").resolve(): (source / "out" / "talks" / "deep").resolve()}
+
+
+def test_colliding_output_folders_get_stable_distinct_names(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "deck.md").write_text("# One")
+    (tmp_path / "a" / "deck.markdown").write_text("# Two")
+    (tmp_path / "b.md").write_text("# Single")
+    watcher = _watcher(tmp_path, [tmp_path / "a", tmp_path / "b.md"])
+    found = watcher._discover()
+    assert len(set(found.values())) == 3
+    assert found[(tmp_path / "b.md").resolve()] == (tmp_path / "out" / "b").resolve()
+    assert all(output_dir.name.startswith("deck-") for path, output_dir in found.items() if path.stem == "deck")
+    assert watcher._discover() == found
+
+
+def test_only_changed_decks_are_rebuilt(tmp_path):
+    deck = tmp_path / "deck.md"
+    deck.write_text("# One\n\n---\n\n# Two")
+    watcher = _watcher(tmp_path, [deck])
+    reports = watcher.poll()
+    assert len(reports) == 1 and reports[0].slide_count == 2 and not reports[0].errors
+    html_path = tmp_path / "out" / "deck" / "deck.html"
+    assert reports[0].written == [html_path.resolve()] and html_path.exists()
+    assert watcher.poll() == []
+    deck.write_text("# One\n\n---\n\n# Two, edited")
+    assert [report.slide_count for report in watcher.poll()] == [2]
+
+
+def test_failed_deck_is_skipped_until_it_changes(tmp_path):
+    file_manager = FailingFileManager()
+    deck = tmp_path / "deck.md"
+    deck.write_text("# One")
+    file_manager.failing.add(deck.resolve())
+    watcher = _watcher(tmp_path, [deck], file_manager)
+    reports = watcher.poll()
+    assert len(reports) == 1 and "cannot read" in reports[0].errors[0]
+    assert watcher.poll() == []  # Same version, not retried
+    file_manager.failing.clear()
+    deck.write_text("# One, fixed")
+    reports = watcher.poll()
+    assert len(reports) == 1 and not reports[0].errors and reports[0].written
@@ -0,0 +1,73 @@
+from src.models.app_state import SlideData
+from src.services.directives import (DirectiveResolver, check_directive, iter_comment_directive_lines,
+                                     parse_slide_directives, resolve_directives, slide_directives_of)
+
+
+def _slides(*contents: str):
+    return [SlideData(index, content=content) for index, content in enumerate(contents, 1)]
+
+
+def test_comments_are_split_into_directives_and_notes():
+    parsed = parse_slide_directives("# Title\n<!-- paginate: true -->\n<!-- _class: lead -->\n<!-- Say hello -->")
+    assert parsed.local_directives == (("paginate", "true"),)
+    assert parsed.spot_directives == (("class", "lead"),)
+    assert parsed.notes == "Say hello"
+    assert parse_slide_directives("# Plain") == parse_slide_directives("# Other")
+
+
+def test_parsed_directives_are_shared_by_slides_with_the_same_content():
+    first, copy, other = _slides("# A\n<!-- _class: lead -->", "# A\n<!-- _class: lead -->", "# B\n<!-- _class: lead -->")
+    assert slide_directives_of(first) is slide_directives_of(copy)  # Keyed on the digest, not the slide object
+    assert slide_directives_of(other) == slide_directives_of(first)
+    assert slide_directives_of(first).spot_directives == (("class", "lead"),)
+
+
+def test_local_directives_are_inherited_and_spot_directives_are_not():
+    resolved = resolve_directives("header: Top", _slides(
+        "# One",
+        "# Two\n<!-- paginate: true -->\n<!-- _backgroundColor: red -->",
+        "# Three",
+    ))
+    assert resolved.slide_directives == [
+        {"header": "Top"},
+        {"header": "Top", "paginate": "true", "backgroundColor": "red"},
+        {"header": "Top", "paginate": "true"},
+    ]
+
+
+def test_global_directives_become_metadata_and_style_reaches_every_slide():
+    resolved = resolve_directives("title: Deck\ntheme: gaia", _slides("# One", "# Two\n<!-- style: h1 { color: red } -->"))
+    assert resolved.metadata.title == "Deck"
+    assert resolved.metadata.theme == "gaia"
+    assert resolved.metadata.custom_directives == {"style": "h1 { color: red }"}
+    assert all(directives["style"] == "h1 { color: red }" for directives in resolved.slide_directives)
+
+
+def test_unchanged_runs_share_one_directive_dict():
+    resolved = resolve_directives("paginate: true", _slides("# A", "# B", "# C"))
+    assert resolved.slide_directives[0] is resolved.slide_directives[2]
+
+
+def test_resolver_extends_slide_by_slide_like_a_full_resolution():
+    slides = _slides("# A\n<!-- paginate: true -->", "# B\n<!-- _class: lead -->", "# C\n<!-- footer: F -->", "# D")
+    resolver = DirectiveResolver("header: H")
+    streamed = resolver.extend(slides[:2])
+    assert resolver.peek(slides[2]) == {"header": "H", "paginate": "true", "footer": "F"}
+    streamed += resolver.extend(slides[2:])
+    assert resolver.slide_count == 4
+    assert streamed == resolve_directives("header: H", slides).slide_directives
+
+
+def test_check_directive():
+    themes = ["default", "gaia"]
+    assert check_directive("paginate", "true", themes) is None
+    assert check_directive("paginate", "yes", themes)[0] == "error"
+    assert check_directive("theme", "missing", themes)[0] == "error"
+    assert "paginate" in check_directive("paginat", "true", themes)[1]
+    assert check_directive("Note", "remember this", themes) is None  # Speaker notes are not flagged
+    assert check_directive("_theme", "gaia", themes)[0] == "warning"
+
+
+def test_comment_directive_lines_are_numbered_inside_the_slide():
+    content = "# Title\n\n<!--\npaginate: true\n_class: lead\n-->"
+    assert list(iter_comment_directive_lines(content)) == [(3, "paginate", "true"), (4, "_class", "lead")]
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from src.models.document_buffer import DocumentBuffer
+
+
+def _assert_same_index(document: DocumentBuffer) -> None:
+    expected = DocumentBuffer(document.text)
+    assert document.line_starts == expected.line_starts
+    assert document.slide_delimiters == expected.slide_delimiters
+    assert document.has_front_matter == expected.has_front_matter
+    assert document.slide_count == expected.slide_count
+    assert [document.slide_span(p) for p in range(document.slide_count)] == \
+           [expected.slide_span(p) for p in range(expected.slide_count)]
+
+
+def test_split_matches_str_split():
+    text = "# One\n---\n# Two\n---\n---\n# Four"
+    document = DocumentBuffer(text)
+    assert [document.slide_content(p) for p in range(document.slide_count)] == \
+           [part.strip() for part in text.split("\n---\n")]
+
+
+def test_front_matter_is_not_a_slide():
+    document = DocumentBuffer("---\ntheme: gaia\n---\n# One\n---\n# Two")
+    assert document.has_front_matter
+    assert document.front_matter() == "theme: gaia"
+    assert document.slide_count == 2
+    assert document.slide_content(0) == "# One"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_keep_index_consistent(seed):
+    rng = random.Random(seed)
+    document = DocumentBuffer("---\ntitle: x\n---\n# A\n\ntext\n---\n# B\n---\n\n# C\n" * 3)
+    for _ in range(400):
+        offset = rng.randrange(document.char_count + 1)
+        removed = rng.randrange(min(6, document.char_count - offset) + 1)
+        inserted = "".join(rng.choice(["-", "\n", "a", "#", " ", "\n---\n"]) for _ in range(rng.randrange(4)))
+        document.apply_edit(offset, removed, inserted)
+        _assert_same_index(document)
+
+
+def test_edit_reports_dirty_slide_only():
+    document = DocumentBuffer("# A\n---\n# B\n---\n# C")
+    document.take_slide_changes()
+    document.apply_edit(document.slide_span(1)[0] + 3, 0, "!")
+    restructured, dirty, front_matter_changed = document.take_slide_changes()
+    assert not restructured and dirty == {1} and not front_matter_changed
+    document.apply_edit(0, 0, "\n---\n")
+    restructured, _, _ = document.take_slide_changes()
+    assert restructured
+
+
+def test_coordinates_round_trip():
+    document = DocumentBuffer("ab\ncd\n\nef")
+    for offset in range(document.char_count + 1):
+        line, column = map(int, document.offset_to_index(offset).split("."))
+        assert document.index_to_offset(line, column) == offset
+        assert document.line_at(offset) == line
+    assert document.line_start(4) == 7
+    document.apply_edit(1, 0, "\nX")
+    assert document.line_starts == [0, 2, 5, 8, 9]
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+import tkinter
+
+import pytest
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("tkinterweb")
+
+from src.models.document_buffer import DocumentBuffer
+from src.views.main_app_view import EditorPanel
+
+
+class RecordingController:
+    def __init__(self, text: str):
+        self.state = SimpleNamespace(document=DocumentBuffer(text))
+        self.edits = []
+
+    def on_text_edited(self, offset, removed_length, inserted_text):
+        self.edits.append((offset, removed_length, inserted_text))
+        self.state.document.apply_edit(offset, removed_length, inserted_text)
+
+
+@pytest.fixture
+def panel():
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        pytest.skip("no display")
+    # Only the edit hook is exercised, on a plain Text widget instead of the whole panel.
+    panel = EditorPanel.__new__(EditorPanel)
+    panel.controller = RecordingController("# One\n---\n# Two")
+    panel.text_widget = SimpleNamespace(_textbox=tkinter.Text(root))
+    panel.text_widget._textbox.insert("1.0", panel.document.text)
+    panel._is_loading_content = False
+    panel._dirty_lines = None
+    panel.is_search_active = False
+    panel._install_edit_hook()
+    yield panel
+    root.destroy()
+
+
+def test_edits_are_forwarded_as_offsets(panel):
+    panel.text_widget._textbox.delete("1.0", "1.2")
+    panel.text_widget._textbox.insert("end-1c", "!")
+    assert panel.controller.edits == [(0, 2, ""), (13, 0, "!")]
+    assert panel.document.text == panel.text_widget._textbox.get("1.0", "end-1c")
+
+
+def test_delete_in_a_disabled_widget_is_not_reported(panel):
+    textbox = panel.text_widget._textbox
+    textbox.configure(state="disabled")
+    textbox.delete("1.0", "1.2")  # What the <Delete> class binding does during a load
+    textbox.insert("1.0", "x")
+    assert panel.controller.edits == []
+    assert panel.document.text == textbox.get("1.0", "end-1c") == "# One\n---\n# Two"
+
+
+def test_edits_mark_only_their_lines_for_highlighting(panel):
+    textbox = panel.text_widget._textbox
+    textbox.insert("3.0", "a\nb\n")  # Two lines added before the last slide
+    assert panel._dirty_lines == (3, 5)
+    textbox.delete("1.0", "2.0")  # The first line removed; the pending range moves up with it
+    assert panel._dirty_lines == (1, 4)
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+pytest.importorskip("playwright")  # The engine module imports Playwright for slide screenshots
+
+from src.models.app_state import SlideData
+from src.services.marp_engine import MarpEngine
+
+
+def test_key_depends_on_content_and_directives_only():
+    engine = MarpEngine()
+    slide = SlideData(1, content="# Title")
+    assert engine.fragment_key(slide) == engine.fragment_key(SlideData(1, content="# Title"))
+    assert engine.fragment_key(slide) != engine.fragment_key(SlideData(1, content="# Other"))
+    assert engine.fragment_key(slide) != engine.fragment_key(slide.with_directives({"class": "lead"}))
+    # The theme and size are not part of the fragment; they only enter the full render key.
+    assert engine.slide_render_key(slide, "default", "16:9") != engine.slide_render_key(slide, "gaia", "16:9")
+
+
+def test_slide_number_only_matters_when_paginated():
+    engine = MarpEngine()
+    assert engine.fragment_key(SlideData(1, content="# A")) == engine.fragment_key(SlideData(2, content="# A"))
+    paginated = {"paginate": "true"}
+    assert engine.fragment_key(SlideData(1, content="# A", directives=paginated)) != \
+           engine.fragment_key(SlideData(2, content="# A", directives=paginated))
+
+
+def test_local_image_change_invalidates_the_key(tmp_path):
+    image = tmp_path / "figure.png"
+    image.write_bytes(b"first")
+    engine = MarpEngine()
+    engine.asset_resolver.set_document_path(tmp_path / "deck.md")
+    slide = SlideData(1, content="![](figure.png)")
+    key = engine.fragment_key(slide)
+    assert engine.fragment_key(slide) == key
+    image.write_bytes(b"second version")
+    stat = image.stat()
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+    assert engine.fragment_key(slide) != key
+
+
+def test_fragments_are_rendered_once_per_key():
+    engine = MarpEngine()
+    slide = SlideData(1, content="# Cached")
+    fragment = engine.render_slide_fragment(slide)
+    assert "Cached" in fragment
+    assert engine._cached_fragment(engine.fragment_key(slide)) == fragment
+    assert engine.render_slide_fragment(SlideData(1, content="# Cached")) is fragment
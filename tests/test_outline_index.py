@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("playwright")  # The engine module imports Playwright for slide screenshots
+
+from src.models.app_state import SlideData
+from src.services.marp_engine import MarpEngine
+from src.services.outline_index import OutlineIndex
+
+
+class CountingEngine(MarpEngine):
+    def __init__(self):
+        super().__init__()
+        self.parsed = []
+
+    def extract_headings(self, content, max_level):
+        self.parsed.append(content)
+        return super().extract_headings(content, max_level)
+
+
+def _slides(*contents: str):
+    return [SlideData(index, content=content) for index, content in enumerate(contents, 1)]
+
+
+def test_headings_per_slide():
+    index = OutlineIndex(MarpEngine())
+    index.rebuild(_slides("# One\n\n## Sub\n\n#### Too deep", "text only", "```\n# not a heading\n```\n### Three"))
+    assert index.slide_count == 3
+    assert [(entry.level, entry.text, entry.line) for entry in index.entries(0)] == [(1, "One", 0), (2, "Sub", 2)]
+    assert index.entries(1) == []
+    assert [(entry.slide_index, entry.text) for entry in index.entries(2)] == [(3, "Three")]
+
+
+def test_rebuild_reuses_headings_of_moved_slides():
+    engine = CountingEngine()
+    index = OutlineIndex(engine)
+    index.rebuild(_slides("# A", "# B", "# C"))
+    engine.parsed.clear()
+    index.rebuild(_slides("# New", "# A", "# B", "# C"))
+    assert engine.parsed == ["# New"]
+    assert [entry.slide_index for entry in index.entries(3)] == [4]  # Renumbered without re-parsing
+
+
+def test_update_only_reparses_changed_slides_and_bumps_version_on_change():
+    engine = CountingEngine()
+    index = OutlineIndex(engine)
+    slides = _slides("# A", "# B")
+    index.rebuild(slides)
+    version = index.version
+    engine.parsed.clear()
+    index.update(slides, [0, 1])
+    assert engine.parsed == [] and index.version == version
+    slides[1] = SlideData(2, content="# B\n\ntext")
+    index.update(slides, [1])
+    assert engine.parsed == ["# B\n\ntext"]
+    assert index.version == version  # Same headings, nothing to redraw
+    slides[1] = SlideData(2, content="# Renamed")
+    index.update(slides, [1])
+    assert index.entries(1)[0].text == "Renamed" and index.version == version + 1
+
+
+def test_replace_tail_matches_a_rebuild():
+    engine = CountingEngine()
+    index = OutlineIndex(engine)
+    index.rebuild(_slides("# A", "# B (partial"))
+    engine.parsed.clear()
+    slides = _slides("# A", "# B (complete)", "# C")
+    index.replace_tail(slides, 1)
+    assert engine.parsed == ["# B (complete)", "# C"]
+    expected = OutlineIndex(MarpEngine())
+    expected.rebuild(slides)
+    assert [index.entries(p) for p in range(3)] == [expected.entries(p) for p in range(3)]
@@ -0,0 +1,94 @@
+import http.client
+import json
+import time
+from threading import Thread
+
+import pytest
+
+pytest.importorskip("playwright")  # Workers keep a Chromium per thread
+
+from src.services.marp_engine import MarpEngine
+from src.services.render_service import RenderRequest, RenderService, RenderServiceServer, ServiceBusyError
+
+DECK = "# One\n\n---\n\n# Two"
+
+
+@pytest.fixture
+def service():
+    service = RenderService(MarpEngine(), workers=1, queue_size=2, job_timeout=30.0)
+    yield service
+    if service._threads:
+        service.stop()
+
+
+def test_invalid_requests_are_rejected_before_queueing(service):
+    for request in (RenderRequest(DECK, output_format="gif"), RenderRequest(DECK, theme_name="missing"),
+                    RenderRequest(DECK, aspect_ratio="1:1")):
+        with pytest.raises(ValueError):
+            service.submit(request)
+    assert service.metrics()["accepted"] == 0
+
+
+def test_full_queue_rejects_instead_of_blocking(service):
+    # No workers are running, so the queue fills up.
+    service.submit(RenderRequest(DECK))
+    service.submit(RenderRequest(DECK + "\n\n---\n\n# Three"))
+    with pytest.raises(ServiceBusyError):
+        service.submit(RenderRequest("# Other"))
+    metrics = service.metrics()
+    assert (metrics["accepted"], metrics["rejected"], metrics["queued"]) == (2, 1, 2)
+
+
+def test_html_render_and_cache_hit(service):
+    service.start(warm=False)  # HTML output does not need the browser
+    result = service.render(RenderRequest(DECK))
+    assert result.content_type.startswith("text/html")
+    assert result.body.count(b"<section") == 2 and b"One" in result.body
+    assert result.metrics.slide_count == 2 and not result.metrics.is_cache_hit
+
+    ticket = service.submit(RenderRequest(DECK))
+    assert ticket.done.is_set()  # Answered from the cache without queueing
+    assert ticket.wait(0).body == result.body and ticket.metrics.is_cache_hit
+    metrics = service.metrics()
+    assert metrics["cache_hits"] == 1 and metrics["done"] == 2
+
+
+def test_jobs_past_their_deadline_expire_in_the_queue():
+    service = RenderService(MarpEngine(), workers=1, job_timeout=0.01)
+    ticket = service.submit(RenderRequest(DECK))
+    time.sleep(0.05)
+    service.start(warm=False)
+    try:
+        with pytest.raises(TimeoutError):
+            ticket.wait(5)
+        assert ticket.metrics.status == "expired"
+    finally:
+        service.stop()
+
+
+def _post(address, body: bytes):
+    host, port = address[len("http://"):].rstrip("/").split(":")
+    connection = http.client.HTTPConnection(host, int(port), timeout=10)
+    try:
+        connection.request("POST", "/render", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_http_status_codes(service):
+    server = RenderServiceServer(service)
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        status, _, body = _post(server.address, b"[1, 2]")
+        assert status == 400 and b"JSON object" in body
+        status, _, _ = _post(server.address, json.dumps({"markdown": DECK, "format": "gif"}).encode())
+        assert status == 400
+        # Workers are not started, so two jobs fill the queue and the next request is turned away.
+        service.submit(RenderRequest("# A"))
+        service.submit(RenderRequest("# B"))
+        status, headers, _ = _post(server.address, json.dumps({"markdown": DECK}).encode())
+        assert status == 503 and headers["Retry-After"] == str(RenderServiceServer.RETRY_AFTER_SECONDS)
+    finally:
+        server.shutdown()
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from src.models.document_buffer import DocumentBuffer
+from src.services.search_engine import TextSearchIndex, pattern_spans_lines
+
+
+def _edit(document: DocumentBuffer, index: TextSearchIndex, offset: int, removed: int, inserted: str) -> None:
+    document.apply_edit(offset, removed, inserted)
+    index.apply_edit(offset, removed, len(inserted))
+
+
+def _full_scan(document: DocumentBuffer, query: str, **options):
+    fresh = TextSearchIndex(document)
+    fresh.set_query(query, **options)
+    return fresh.match_starts, fresh.match_ends
+
+
+def test_multiline_match_survives_edit():
+    document = DocumentBuffer(' aa aaab\n\nbaab\na')
+    index = TextSearchIndex(document)
+    index.set_query(r'a\s*b', use_regex=True)
+    _edit(document, index, 7, 1, "")
+    assert (index.match_starts, index.match_ends) == _full_scan(document, r'a\s*b', use_regex=True)
+    assert index.match_starts == [6, 11]
+
+
+@pytest.mark.parametrize("query, options", [
+    ("ab", {}),
+    ("a", {"whole_word": True}),
+    (r"a+b?", {"use_regex": True}),
+    (r"^b", {"use_regex": True}),
+    (r"a\s*b", {"use_regex": True}),
+    (r"[^a]b", {"use_regex": True}),
+    (r"(?s)a.b", {"use_regex": True}),
+    (r"b\na", {"use_regex": True}),
+])
+def test_incremental_matches_equal_full_rescan(query, options):
+    rng = random.Random(query)
+    document = DocumentBuffer("ab a\nb\n\naab b\na b\n" * 5)
+    index = TextSearchIndex(document)
+    index.set_query(query, **options)
+    for _ in range(300):
+        offset = rng.randrange(document.char_count + 1)
+        removed = rng.randrange(min(4, document.char_count - offset) + 1)
+        inserted = "".join(rng.choice("ab \n") for _ in range(rng.randrange(4)))
+        _edit(document, index, offset, removed, inserted)
+        assert (index.match_starts, index.match_ends) == _full_scan(document, query, **options)
+
+
+@pytest.mark.parametrize("expression, spans", [
+    (r"abc", False),
+    (r"\bword\b", False),
+    (r"^#+ .*$", False),
+    (r"[a-z]+\S", False),
+    (r"a\s*b", True),
+    (r"a\nb", True),
+    (r"[^x]", True),
+    (r"\W", True),
+    (r"(?s)a.b", True),
+    (r"(a)\1", True),
+])
+def test_pattern_spans_lines(expression, spans):
+    import re
+    assert pattern_spans_lines(re.compile(expression, re.MULTILINE)) is spans
+
+
+def test_navigation_wraps_around():
+    document = DocumentBuffer("x foo y foo z")
+    index = TextSearchIndex(document)
+    index.set_query("foo")
+    assert index.match_count == 2
+    assert index.next_match(5) == 1
+    assert index.next_match(100) == 0
+    assert index.previous_match(0) == 1
+    assert index.matches_in_range(0, 4) == [(2, 5)]
+
+
+def test_invalid_regex_reports_error():
+    index = TextSearchIndex(DocumentBuffer("abc"))
+    assert index.set_query("(", use_regex=True)
+    assert index.pattern is None and index.match_count == 0
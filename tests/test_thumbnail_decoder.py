@@ -0,0 +1,41 @@
+from threading import Event, current_thread
+
+from PIL import Image
+
+from src.models.encoded_image import EncodedImage
+from src.services.thumbnail_decoder import ThumbnailDecoder
+
+
+def _encoded(color) -> EncodedImage:
+    return EncodedImage.encode(Image.new("RGB", (8, 6), color))
+
+
+def test_pil_images_need_no_decoding():
+    image = Image.new("RGB", (4, 4))
+    assert ThumbnailDecoder().get(image) is image
+
+
+def test_decodes_on_the_worker_and_keeps_the_result():
+    decoder = ThumbnailDecoder()
+    image = _encoded("red")
+    assert decoder.get(image) is None
+    done = Event()
+    threads = []
+    decoder.request(image, lambda: (threads.append(current_thread().name), done.set()))
+    assert done.wait(5)
+    assert threads == ["thumbnail-decode-worker"]
+    decoded = decoder.get(image)
+    assert decoded.size == (8, 6) and decoded.getpixel((0, 0)) == (255, 0, 0)
+    assert decoder.get(image) is decoded  # Redrawing the row does not decode again
+    assert decoder.get(_encoded("red")) is None  # Cached per image object
+
+
+def test_only_the_most_recent_images_are_kept():
+    decoder = ThumbnailDecoder(capacity=2)
+    images = [_encoded(color) for color in ("red", "green", "blue")]
+    for image in images:
+        done = Event()
+        decoder.request(image, done.set)
+        assert done.wait(5)
+    assert decoder.get(images[0]) is None
+    assert decoder.get(images[1]) is not None and decoder.get(images[2]) is not None